@@ -0,0 +1,70 @@
+"""Evaluation of the example models and of synthetic networks of varying depth, fan-in and diamond density."""
+import time
+
+from .models import MODELS, synthetic
+
+NSIM = [1_000, 100_000, 1_000_000, 10_000_000]
+
+
+def draws_per_second(project, goal):
+    """Evaluates the goal from scratch, returning the random draws per second."""
+    project.invalidate_values()
+    start = time.perf_counter()
+    project.eval(goal)
+    elapsed = time.perf_counter() - start
+    return project.nsim * len(project.random_nodes()) / elapsed
+
+
+class ExampleModels:
+    params = (list(MODELS), NSIM)
+    param_names = ["model", "nsim"]
+    timeout = 600
+
+    def setup(self, model, nsim):
+        build, self.goal = MODELS[model]
+        self.project = build(nsim)
+
+    def time_eval(self, model, nsim):
+        self.project.invalidate_values()
+        self.project.eval(self.goal)
+
+    def time_eval_cached(self, model, nsim):
+        self.project.eval(self.goal)
+
+    def time_eval_streaming(self, model, nsim):
+        self.project.eval_streaming(self.goal, chunk_size=250_000)
+
+    def peakmem_eval(self, model, nsim):
+        self.project.invalidate_values()
+        self.project.eval(self.goal)
+
+    def track_draws_per_second(self, model, nsim):
+        return draws_per_second(self.project, self.goal)
+
+    track_draws_per_second.unit = "draws/s"
+
+
+class SyntheticNetworks:
+    params = ([2, 8, 32], [1, 4], [0.0, 0.5], NSIM[:3])
+    param_names = ["depth", "fan_in", "diamond", "nsim"]
+    timeout = 600
+
+    def setup(self, depth, fan_in, diamond, nsim):
+        self.project = synthetic(nsim, depth=depth, fan_in=fan_in, diamond=diamond)
+
+    def time_eval(self, depth, fan_in, diamond, nsim):
+        self.project.invalidate_values()
+        self.project.eval("goal")
+
+    def time_compile_plan(self, depth, fan_in, diamond, nsim):
+        self.project.invalidate_plan()
+        self.project.plan.cone("goal")
+
+    def peakmem_eval(self, depth, fan_in, diamond, nsim):
+        self.project.invalidate_values()
+        self.project.eval("goal")
+
+    def track_draws_per_second(self, depth, fan_in, diamond, nsim):
+        return draws_per_second(self.project, "goal")
+
+    track_draws_per_second.unit = "draws/s"
@@ -0,0 +1,33 @@
+"""Latency of the Markdown report of the example models."""
+import os
+import shutil
+import tempfile
+
+from .models import MODELS
+
+NSIM = [1_000, 100_000, 1_000_000]
+
+
+class Report:
+    params = (list(MODELS), NSIM, [False, True])
+    param_names = ["model", "nsim", "images"]
+    timeout = 600
+
+    def setup(self, model, nsim, images):
+        build, goal = MODELS[model]
+        self.project = build(nsim)
+        for node in self.project.plan.cone(goal):
+            if node.kind != "input":
+                self.project.eval(node.name)
+                self.project.generate_stats(node.name)
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        self.project.output_directory = self.directory
+        os.chdir(self.directory)
+
+    def teardown(self, model, nsim, images):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def time_report(self, model, nsim, images):
+        self.project.generate_report("report", images=images)
@@ -0,0 +1,43 @@
+"""Sampling of the registered distributions and sampling strategies."""
+from skrisk import RiskProject
+
+NSIM = [1_000, 100_000, 1_000_000, 10_000_000]
+
+PARAMETERS = {
+    "normal": {"loc": 0, "scale": 1},
+    "uniform": {"low": 0, "high": 1},
+    "triangular": {"left": 0, "mode": 1, "right": 3},
+    "pert": {"minimum": 0, "mode": 1, "maximum": 3},
+    "gamma": {"shape": 2, "scale": 1},
+    "binomial": {"n": 10, "p": 0.3},
+}
+
+
+class Distributions:
+    params = (list(PARAMETERS), NSIM)
+    param_names = ["distribution", "nsim"]
+
+    def setup(self, distribution, nsim):
+        self.project = RiskProject(nsim=nsim)
+
+    def time_sample(self, distribution, nsim):
+        self.project.sample(distribution, **PARAMETERS[distribution])
+
+    def peakmem_sample(self, distribution, nsim):
+        self.project.sample(distribution, **PARAMETERS[distribution])
+
+
+class Strategies:
+    params = (["random", "lhs", "sobol", "antithetic"], [1, 16], NSIM[:3])
+    param_names = ["sampling", "nodes", "nsim"]
+
+    def setup(self, sampling, nodes, nsim):
+        self.project = RiskProject(nsim=nsim)
+        self.project.sampling = sampling
+        for i in range(nodes):
+            self.project.add_random(f"r{i}", "triangular", PARAMETERS["triangular"])
+        self.project.add_goal("goal", f"({' + '.join(self.project.random_nodes())})")
+
+    def time_draw(self, sampling, nodes, nsim):
+        self.project.invalidate_values()
+        self.project.eval("goal")
@@ -0,0 +1,43 @@
+"""Statistics and histograms of a node."""
+import numpy as np
+
+from skrisk import RiskProject
+
+NSIM = [1_000, 100_000, 1_000_000, 10_000_000]
+
+
+class Stats:
+    params = NSIM
+    param_names = ["nsim"]
+
+    def setup(self, nsim):
+        self.project = RiskProject(nsim=nsim)
+        self.project.add_random("value", "lognormal", {"mean": 0, "sigma": 1})
+        self.project.eval("value")
+
+    def time_generate_stats(self, nsim):
+        self.project.generate_stats("value")
+
+    def time_risk_metrics(self, nsim):
+        self.project.risk_metrics("value")
+
+    def time_histogram(self, nsim):
+        self.project.nodes["value"].pop("bin_counts", None)
+        self.project.histogram("value", 30)
+
+    def peakmem_generate_stats(self, nsim):
+        self.project.generate_stats("value")
+
+
+class Accumulators:
+    params = NSIM[:3]
+    param_names = ["nsim"]
+
+    def setup(self, nsim):
+        self.values = np.random.default_rng(42).lognormal(size=nsim)
+
+    def time_streaming_accumulators(self, nsim):
+        from skrisk.base import _new_accumulators
+
+        for accumulator in _new_accumulators(2048).values():
+            accumulator.update(self.values)
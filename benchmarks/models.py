@@ -0,0 +1,174 @@
+"""
+Models used by the benchmarks: the contract-bidding and camera-warranty examples, written against
+RiskProject.sample_size so they can also be evaluated in chunks, and synthetic layered networks.
+"""
+import numpy as np
+
+from skrisk import RiskProject
+from skrisk.ragged import RaggedArray
+
+
+class ContractBidding(RiskProject):
+    def num_competing_bids(self, num_competitors, prob_competitors):
+        return self.binomial(num_competitors, prob_competitors)
+
+    def competing_bids(self, param_competitors, num_competing_bids, estimated_cost):
+        return (
+            self.sample_segments("triangular", num_competing_bids, **param_competitors)
+            * estimated_cost
+        )
+
+    def win_contract(self, competing_bids, my_bid):
+        return competing_bids.min(empty=np.inf) > my_bid
+
+    def profit(self, win_contract, my_bid, project_cost, bid_cost):
+        return (win_contract * (my_bid - project_cost)) - bid_cost
+
+
+def contract_bidding(nsim=1000, seed=42):
+    """Returns the contract-bidding model of examples/contract_bidding.py. Its goal is "profit"."""
+    cb = ContractBidding(seed=seed, nsim=nsim)
+    cb.add_input("num_competitors", 4, "Number of Potential Competitors")
+    cb.add_input("prob_competitors", 0.5, "Probability a given competitor bids")
+    cb.add_input(
+        "param_competitors",
+        {"left": 0.9, "mode": 1.3, "right": 1.8},
+        "Base competitors parameters",
+    )
+    cb.add_input(
+        "estimated_cost", 10000, "Estimated project cost the competitors bid against"
+    )
+    cb.add_input("my_bid", 10500, "Miller's bid")
+    cb.add_random(
+        "bid_cost",
+        "triangular",
+        {"left": 300, "mode": 350, "right": 500},
+        "Cost to prepare a bid",
+    )
+    cb.add_random(
+        "project_cost",
+        "triangular",
+        {"left": 9000, "mode": 10000, "right": 15000},
+        "Cost to complete project",
+    )
+    cb.add_operation(
+        "num_competing_bids",
+        "num_competing_bids",
+        ("num_competitors", "prob_competitors"),
+        "Number of competing bids",
+    )
+    cb.add_operation(
+        "competing_bids",
+        "competing_bids",
+        ("param_competitors", "num_competing_bids", "estimated_cost"),
+        "Competing Bids",
+    )
+    cb.add_operation(
+        "win_contract",
+        "win_contract",
+        ("competing_bids", "my_bid"),
+        "Miller wins contract?",
+        "pie",
+    )
+    cb.add_goal(
+        "profit",
+        "profit",
+        ("win_contract", "my_bid", "project_cost", "bid_cost"),
+        "profit",
+    )
+    return cb
+
+
+class CameraWarranty(RiskProject):
+    def failure_times(self, camera_lifetime, warranty_period):
+        """Times of the failures covered by the warranty: each one is replaced by a camera with a new warranty."""
+        parameters = self.nodes["camera_lifetime"]["parameters"]
+        sims, times = [], []
+        index = np.arange(camera_lifetime.size)
+        failure = np.asarray(camera_lifetime)
+        covered = failure < warranty_period
+        while covered.any():
+            index, failure = index[covered], failure[covered]
+            sims.append(index)
+            times.append(failure)
+            lifetime = self.sample("gamma", index.size, **parameters)
+            covered = lifetime < warranty_period
+            failure = failure + lifetime
+        sims, times = np.concatenate(sims), np.concatenate(times)
+        order = np.argsort(sims, kind="stable")
+        return RaggedArray(
+            times[order], np.bincount(sims, minlength=camera_lifetime.size)
+        )
+
+    def failures_within_warranty(self, failure_times):
+        return failure_times.counts
+
+    def discounted_cost(self, failure_times, replacement_cost, discount_rate):
+        factors = RaggedArray(
+            (1 + discount_rate) ** -failure_times.values, failure_times.counts
+        )
+        return (factors * replacement_cost).sum()
+
+
+def camera_warranty(nsim=1000, seed=42):
+    """Returns a complete version of the camera-warranty model of examples/camera_warranty.py. Its goal is "npv_of_profit"."""
+    cw = CameraWarranty(seed=seed, nsim=nsim)
+    cw.add_input("warranty_period", 1.5, "Years covered by the warranty")
+    cw.add_input("replacement_cost", 225, "Cost of replacing a camera")
+    cw.add_input("cost_for_customer", 400, "Price paid by the customer")
+    cw.add_input("manufacturing_cost", 250, "Cost of making the first camera")
+    cw.add_input("discount_rate", 0.08, "Yearly discount rate")
+    cw.add_random(
+        "camera_lifetime", "gamma", {"shape": 2, "scale": 1.25}, "Years until failure"
+    )
+    cw.add_operation(
+        "failure_times", "failure_times", ("camera_lifetime", "warranty_period")
+    )
+    cw.add_operation(
+        "failures_within_warranty",
+        "failures_within_warranty",
+        ("failure_times",),
+        "Replacements",
+        "pie",
+    )
+    cw.add_operation(
+        "discounted_cost",
+        "discounted_cost",
+        ("failure_times", "replacement_cost", "discount_rate"),
+    )
+    cw.add_goal(
+        "npv_of_profit",
+        "cost_for_customer - manufacturing_cost - discounted_cost",
+        description="NPV of the profit of a sale",
+    )
+    return cw
+
+
+def synthetic(nsim=1000, depth=4, width=8, fan_in=2, diamond=0.0, seed=42):
+    """
+    Returns a layered network of expression nodes over width normal random nodes. Each of the depth layers has width
+    nodes averaging fan_in nodes of the previous layer; with probability diamond a node also reads a node two layers
+    back, which closes diamonds (shared ancestors reached by several paths). Its goal is "goal".
+    """
+    rng = np.random.default_rng(seed)
+    project = RiskProject(seed=seed, nsim=nsim)
+    previous = [f"r{i}" for i in range(width)]
+    for name in previous:
+        project.add_random(name, "normal", {"loc": 0, "scale": 1})
+    before = []
+    for layer in range(depth):
+        current = [f"n{layer}_{i}" for i in range(width)]
+        for name in current:
+            inputs = list(rng.choice(previous, min(fan_in, width), replace=False))
+            if before and rng.random() < diamond:
+                inputs.append(str(rng.choice(before)))
+            project.add_operation(name, f"({' + '.join(inputs)}) / {len(inputs)}")
+        before, previous = previous, current
+    project.add_goal("goal", " + ".join(previous))
+    return project
+
+
+MODELS = {
+    "contract_bidding": (contract_bidding, "profit"),
+    "camera_warranty": (camera_warranty, "npv_of_profit"),
+}
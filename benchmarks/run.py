@@ -0,0 +1,143 @@
+"""
+Runs the benchmark suite without any extra dependency and appends the results to a JSON lines file,
+so they can be compared across commits.
+
+The bench_*.py modules follow the conventions of airspeed velocity (asv): classes with params, param_names,
+setup/teardown and time_* (seconds, best of several runs), peakmem_* (peak bytes allocated, traced with
+tracemalloc here) and track_* (the returned value) methods, so they can also be run with asv.
+
+Usage:
+    python -m benchmarks.run [--filter NAME] [--max-nsim N] [--repeat N] [--output FILE]
+"""
+import argparse
+import contextlib
+import importlib
+import inspect
+import io
+import itertools
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+MODULES = ["bench_evaluation", "bench_sampling", "bench_stats", "bench_report"]
+
+
+def parameter_sets(cls):
+    """Yields a dictionary for every combination of the params of a benchmark class."""
+    params = getattr(cls, "params", [])
+    names = getattr(cls, "param_names", [])
+    if not names:
+        yield {}
+        return
+    if len(names) == 1:
+        params = [params]
+    for values in itertools.product(*params):
+        yield dict(zip(names, values))
+
+
+def measure(instance, name, kwargs, repeat):
+    """Runs one benchmark method, returning its result and unit."""
+    method = getattr(instance, name)
+    args = list(kwargs.values())
+    if name.startswith("time_"):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            method(*args)
+            times.append(time.perf_counter() - start)
+        return min(times), "seconds"
+    if name.startswith("peakmem_"):
+        tracemalloc.start()
+        try:
+            method(*args)
+            return tracemalloc.get_traced_memory()[1], "bytes"
+        finally:
+            tracemalloc.stop()
+    return method(*args), getattr(method, "unit", "unit")
+
+
+def run(filter_="", max_nsim=None, repeat=3):
+    """Yields a record for every benchmark whose name contains filter_ and whose nsim is at most max_nsim."""
+    for module_name in MODULES:
+        module = importlib.import_module(f".{module_name}", __package__)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            methods = [
+                name
+                for name in dir(cls)
+                if name.startswith(("time_", "peakmem_", "track_"))
+            ]
+            for kwargs in parameter_sets(cls):
+                if max_nsim and kwargs.get("nsim", 0) > max_nsim:
+                    continue
+                for name in methods:
+                    benchmark = f"{module_name}.{class_name}.{name}"
+                    if filter_ not in benchmark:
+                        continue
+                    instance = cls()
+                    args = list(kwargs.values())
+                    # Charts and reports print the files they write
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        if hasattr(instance, "setup"):
+                            instance.setup(*args)
+                        try:
+                            value, unit = measure(instance, name, kwargs, repeat)
+                        finally:
+                            if hasattr(instance, "teardown"):
+                                instance.teardown(*args)
+                    yield {
+                        "benchmark": benchmark,
+                        "params": kwargs,
+                        "value": value,
+                        "unit": unit,
+                    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", default="", help="run only matching benchmarks")
+    parser.add_argument("--max-nsim", type=int, help="skip larger simulations")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of time_*")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(__file__).parent / "results.jsonl",
+        help="JSON lines file the results are appended to",
+    )
+    options = parser.parse_args()
+
+    header = environment()
+    with options.output.open("a") as output:
+        for record in run(options.filter, options.max_nsim, options.repeat):
+            params = ", ".join(f"{k}={v}" for k, v in record["params"].items())
+            print(
+                f"{record['benchmark']:<55} {params:<50} {record['value']:>14.6g} {record['unit']}"
+            )
+            output.write(json.dumps({**header, **record}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
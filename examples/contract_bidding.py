@@ -5,7 +5,6 @@ import seaborn as sns
 
 # %%
 import numpy as np
-import pandas as pd
 
 # %%
 from skrisk import RiskProject
@@ -15,19 +14,16 @@ from skrisk import RiskProject
 
 class ContractBiding(RiskProject):
     def num_competing_bids(self, num_competitors, prob_competitors):
-        return pd.DataFrame(self.binomial(num_competitors, prob_competitors))
+        return self.binomial(num_competitors, prob_competitors)
 
-    def competing_bids(self, param_competitors, num_competing_bids):
-        return num_competing_bids.apply(
-            lambda x: self.rng.triangular(**param_competitors, size=x)
-            * self.nodes["project_cost"]["parameters"]["mode"],
-            axis=1,
+    def competing_bids(self, param_competitors, num_competing_bids, estimated_cost):
+        return (
+            self.sample_segments("triangular", num_competing_bids, **param_competitors)
+            * estimated_cost
         )
 
     def win_contract(self, competing_bids, my_bid):
-        competitors_best_bid = competing_bids.apply(
-            lambda x: x.min() if x.size else np.inf
-        )
+        competitors_best_bid = competing_bids.min(empty=np.inf)
         return competitors_best_bid > my_bid
 
     def profit(self, win_contract, my_bid, project_cost, bid_cost):
@@ -45,6 +41,9 @@ cb.add_input(
     {"left": 0.9, "mode": 1.3, "right": 1.8},
     "Base competitors parameters",
 )
+cb.add_input(
+    "estimated_cost", 10000, "Estimated project cost the competitors bid against"
+)
 cb.add_random(
     "bid_cost",
     "triangular",
@@ -66,7 +65,7 @@ cb.add_operation(
 cb.add_operation(
     "competing_bids",
     "competing_bids",
-    ("param_competitors", "num_competing_bids"),
+    ("param_competitors", "num_competing_bids", "estimated_cost"),
     "Competing Bids",
 )
 cb.add_input("my_bid", 10500, "Miller's bid")
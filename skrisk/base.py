@@ -1,15 +1,42 @@
-import matplotlib.pyplot as plt
+import contextvars
+import inspect
+import os
+import sys
+import tempfile
+import weakref
+from contextlib import contextmanager
+from functools import cached_property, partial
+
 import networkx as nx
 import numpy as np
-import seaborn as sns
-from numpy.random import default_rng
-from scipy.stats import skew, kurtosis
+from numpy.random import SeedSequence, default_rng
+
+from .distributions import DISTRIBUTIONS, SAMPLING_STRATEGIES, Distribution
+from .distributions import block_sizes, uniform_matrix
+from .correlation import CORRELATION_METHODS, correlation_matrix
+from .correlation import gaussian_copula, iman_conover
+from .cache import ResultCache, callable_identity, content_hash, name_key
+from .expressions import Expression, is_expression
+from .plan import EvaluationPlan
+from .ragged import RaggedArray
+from .store import load_results, save_results
+from .stats import MomentAccumulator, QuantileSketch, StreamingHistogram, ValueCounts
+from .stats import partition_quantiles
+from .stats import risk_metrics as _risk_metrics
+from .sensitivity import sensitivity as _sensitivity
+from .output import OutputManager
+from .profiling import Profiler
+from .utils import nbytes
+from .utils import DEFAULT_PLOT_PALETTE, DEFAULT_PLOT_STYLE
+
 
-from .utils import generate_repeats
-from .utils import incremental_filename
-from .utils import check_path
-from .report import skrisk_report
-from .report import DEFAULT_PLOT_PALETTE, DEFAULT_PLOT_STYLE
+RETENTION_POLICIES = ("keep", "drop", "stats", "disk")
+
+STREAMS = ("shared", "node")
+
+# Stream of the node being drawn or evaluated, as a (project, generator) pair. Being a context variable,
+# it is local to each thread and asyncio task, so concurrent operations each see their own stream.
+_NODE_STREAM = contextvars.ContextVar("skrisk_node_stream", default=None)
 
 
 class RiskProject(nx.DiGraph):
@@ -19,16 +46,303 @@ class RiskProject(nx.DiGraph):
     Attributes:
         seed(int): Establishes the seed with which to perform all random operations.
         nsim(int): Number of simulations to perform when evaluating the entire network.
+        sampling(str): Strategy used to draw the random nodes: "random", "lhs", "sobol", "halton" or "antithetic".
+        replicates(int): Number of independent blocks drawn by the "lhs", "sobol" and "halton" strategies.
+        streams(str): "shared" (every random node draws from RiskProject.rng) or "node" (each node has its own stream).
+        output_directory(str): Directory where charts are saved by default.
+        spill_directory(str): Directory where the values of nodes with the "disk" retention policy are saved (a temporary directory by default).
     """
 
     def __init__(self, seed=42, nsim=1000):
+        self._plan = None
+        self._fresh = set()
+        self._chunk_size = None
         super(RiskProject, self).__init__()
         self._seed = seed
         self.rng = default_rng(seed)
         self.nsim = nsim
+        self._sampling = "random"
+        self._replicates = 8
+        self._correlations = []
+        self._streams = "shared"
+        self._stream_key = ()
+        self._cache = None
+        self._cache_nodes = None
+        self.spill_directory = None
+        self.output_directory = "/tmp/skrisk/"
+        self._outputs = {}
+        self._profiler = None
         self.plot_palette = DEFAULT_PLOT_PALETTE
         self.plot_style = DEFAULT_PLOT_STYLE
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in list(state):
+            if isinstance(getattr(type(self), name, None), cached_property):
+                del state[name]
+        state["_plan"] = None
+        state["_fresh"] = set()
+        state["_outputs"] = {}
+        state["_profiler"] = None
+        state["_cache"] = None
+        # Cached bin counts are tied (by weak reference) to the values of this process
+        state["_node"] = {
+            node: {key: value for key, value in attrs.items() if key != "bin_counts"}
+            for node, attrs in self._node.items()
+        }
+        return state
+
+    def _worker_template(self):
+        """Returns a shallow copy of the project without the values of its random and operation nodes."""
+        state = self.__getstate__()
+        state["_node"] = {
+            node: attrs if attrs["node_type"] == "input" else {**attrs, "value": None}
+            for node, attrs in state["_node"].items()
+        }
+        template = object.__new__(type(self))
+        template.__dict__.update(state)
+        return template
+
+    @property
+    def plan(self):
+        """
+        Compiled evaluation plan of the network, rebuilt whenever nodes or edges are added or removed.
+        """
+        if self._plan is None:
+            self._plan = EvaluationPlan(self)
+        return self._plan
+
+    def invalidate_plan(self):
+        """
+        Discards the compiled evaluation plan, so it is rebuilt on the next evaluation.
+        """
+        self._plan = None
+
+    def invalidate_values(self, node=None):
+        """
+        Marks the cached value of a node, and of every node depending on it, as outdated,
+        so they are recomputed (and random nodes resampled) on the next evaluation.
+
+        Parameters:
+            node
+                Name of the node. If None, every node in the network is marked as outdated.
+        """
+        if node is None:
+            self._fresh.clear()
+        else:
+            self._fresh.difference_update(nx.descendants(self, node))
+            self._fresh.discard(node)
+
+    def update_input(self, name: str, value):
+        """
+        Changes the value of an input node in place.
+        Only the nodes downstream of the input are recomputed on the next evaluation,
+        the values of all the other nodes (including random samples) are kept.
+
+        Parameters:
+            name
+                Name of the input node.
+            value
+                New value returned when the node is evaluated.
+        """
+        if self.nodes[name]["node_type"] != "input":
+            raise ValueError(f"{name} is not an input node")
+        self.nodes[name]["value"] = value
+        self._fresh.difference_update(self.plan.downstream(name))
+
+    def add_node(self, node_for_adding, **attr):
+        self.invalidate_plan()
+        if node_for_adding in self:
+            self.invalidate_values(node_for_adding)
+        super().add_node(node_for_adding, **attr)
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().add_nodes_from(nodes_for_adding, **attr)
+
+    def remove_node(self, n):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().remove_node(n)
+
+    def remove_nodes_from(self, nodes):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().remove_nodes_from(nodes)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        self.invalidate_plan()
+        if v_of_edge in self:
+            self.invalidate_values(v_of_edge)
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().add_edges_from(ebunch_to_add, **attr)
+
+    def remove_edge(self, u, v):
+        self.invalidate_plan()
+        self.invalidate_values(v)
+        super().remove_edge(u, v)
+
+    def remove_edges_from(self, ebunch):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().remove_edges_from(ebunch)
+
+    def clear(self):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().clear()
+
+    def clear_edges(self):
+        self.invalidate_plan()
+        self.invalidate_values()
+        super().clear_edges()
+
+    def set_retention(self, policy: str, nodes=None):
+        """
+        Sets what happens to the value of random and operation nodes once every node consuming it
+        during an evaluation has been evaluated. Goal nodes (and any other evaluated target) keep their value.
+
+        Parameters:
+            policy
+                "keep" (the default: the value stays in the node), "drop" (the value is released and recomputed if needed again),
+                "stats" (the value is replaced by its stats and online accumulators, see RiskProject.eval_streaming)
+                or "disk" (the value is saved in RiskProject.spill_directory and replaced by a read-only memory map of the file).
+                Released random nodes are drawn again when needed, which outdates the values computed from their previous samples.
+            nodes
+                Name of a node, or a list with the names of several nodes. If None, the policy applies to every node.
+        """
+        if policy not in RETENTION_POLICIES:
+            raise ValueError(
+                f"Unknown retention policy: {policy}, use one of {RETENTION_POLICIES}"
+            )
+        if nodes is None:
+            nodes = list(self.nodes)
+        elif isinstance(nodes, str):
+            nodes = [nodes]
+        for node in nodes:
+            self.nodes[node]["retention"] = policy
+
+    def _retire(self, node, value):
+        """Applies the retention policy of a node whose last consumer has been evaluated."""
+        attrs = self.nodes[node]
+        policy = attrs.get("retention", "keep")
+        if policy == "keep" or value is None:
+            return
+        if policy == "drop":
+            attrs["value"] = None
+            self._fresh.discard(node)
+        elif policy == "stats":
+            accumulators = _new_accumulators(2048)
+            for accumulator in accumulators.values():
+                accumulator.update(value)
+            self._store_accumulators(node, accumulators)
+        elif isinstance(value, np.ndarray) and not isinstance(value, np.memmap):
+            attrs["value"] = self._spill(node, value)
+
+    def _spill(self, node, value):
+        """Saves the value of a node in RiskProject.spill_directory, returning a read-only memory map of it."""
+        if self.spill_directory is None:
+            self.spill_directory = tempfile.mkdtemp(prefix="skrisk-")
+        descriptor, path = tempfile.mkstemp(suffix=".npy", dir=self.spill_directory)
+        with os.fdopen(descriptor, "wb") as file:
+            np.save(file, value)
+        previous = self.nodes[node].get("spill_path")
+        if previous is not None and os.path.exists(previous):
+            os.remove(previous)
+        self.nodes[node]["spill_path"] = path
+        return np.load(path, mmap_mode="r")
+
+    @property
+    def nsim(self):
+        return self._nsim
+
+    @nsim.setter
+    def nsim(self, new_nsim):
+        self._nsim = new_nsim
+        self.invalidate_values()
+
+    @property
+    def sampling(self):
+        return self._sampling
+
+    @sampling.setter
+    def sampling(self, strategy):
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Unknown sampling strategy: {strategy}")
+        self._sampling = strategy
+        self.invalidate_values()
+
+    @property
+    def replicates(self):
+        return self._replicates
+
+    @replicates.setter
+    def replicates(self, replicates):
+        self._replicates = replicates
+        self.invalidate_values()
+
+    @property
+    def streams(self):
+        """
+        How random numbers are seeded: "shared" draws every random node from RiskProject.rng, in evaluation order.
+        "node" gives each random node (or set of correlated nodes) and each operation its own stream, derived from
+        RiskProject.seed and the name of the node, which RiskProject.rng is set to while the node is drawn or evaluated.
+        Node values then don't depend on the evaluation order, and a node drawn again gets the same values.
+        The "lhs", "sobol" and "halton" strategies are then applied to each set of correlated nodes separately.
+        """
+        return self._streams
+
+    @streams.setter
+    def streams(self, streams):
+        if streams not in STREAMS:
+            raise ValueError(f"Unknown streams: {streams}")
+        if streams == "shared" and self._cache is not None:
+            raise ValueError(
+                "The result cache requires node streams, call disable_cache first"
+            )
+        self._streams = streams
+        self.invalidate_values()
+
+    @property
+    def rng(self):
+        """
+        numpy.random.Generator used to draw random numbers: the stream of the node being drawn or evaluated
+        with per-node streams (see RiskProject.streams), or otherwise the generator of the project.
+        """
+        stream = _NODE_STREAM.get()
+        if stream is not None and stream[0] is self:
+            return stream[1]
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng):
+        self._rng = rng
+
+    @contextmanager
+    def _node_stream(self, names):
+        """Sets RiskProject.rng to the stream of the given nodes in the current thread or task."""
+        rng = default_rng(
+            SeedSequence(self.seed, spawn_key=self._stream_key + name_key(names))
+        )
+        token = _NODE_STREAM.set((self, rng))
+        try:
+            yield rng
+        finally:
+            _NODE_STREAM.reset(token)
+
+    @property
+    def sample_size(self):
+        """
+        Size of the arrays drawn by the distribution methods: RiskProject.nsim, or the size of the current chunk
+        while running RiskProject.eval_streaming. Operations drawing random numbers themselves should use it.
+        """
+        return self.nsim if self._chunk_size is None else self._chunk_size
+
     @property
     def seed(self):
         return self._seed
@@ -37,10 +351,77 @@ class RiskProject(nx.DiGraph):
     def seed(self, new_seed):
         self._seed = new_seed
         self.rng = default_rng(new_seed)
+        self.invalidate_values()
+
+    def sample(self, distribution: str, size=None, **parameters):
+        """
+        Returns an array of samples drawn from a registered distribution (see skrisk.distributions) with RiskProject.rng.
+
+        Parameters:
+            distribution
+                Name of the distribution in skrisk.distributions.DISTRIBUTIONS.
+            size
+                Size or shape of the returned array. Defaults to RiskProject.sample_size.
+            **parameters
+                Parameters of the distribution. With the default size, parameters with more than one dimension
+                (e.g. an input swept by RiskProject.sweep, held as a column) broadcast the returned array,
+                and every row is drawn by the inverse CDF from the same uniforms (common random numbers).
+        """
+        sample = DISTRIBUTIONS[distribution].sample
+        if size is None:
+            size = self.sample_size
+            shapes = [
+                np.shape(value) for value in parameters.values() if np.ndim(value) > 1
+            ]
+            if shapes:
+                sample = partial(_sample_rows, DISTRIBUTIONS[distribution])
+                size = np.broadcast_shapes(*shapes, (size,))
+        if self._profiler is not None:
+            return self._profiler.rng(sample, self.rng, size, **parameters)
+        return sample(self.rng, size, **parameters)
+
+    def sample_segments(self, distribution: str, counts, **parameters):
+        """
+        Returns a RaggedArray with a variable number of samples for each simulation (e.g. one bid per competitor),
+        drawn from a registered distribution in a single call for all the simulations.
 
-    def binomial(self, n: int, p: float):  # TODO Add distributions as mixins
+        Parameters:
+            distribution
+                Name of the distribution in skrisk.distributions.DISTRIBUTIONS.
+            counts
+                Array with the number of samples of each simulation.
+            **parameters
+                Parameters of the distribution. Arrays with one value per simulation are applied to every
+                sample of their simulation. Parameters with more than one dimension (e.g. an input swept by
+                RiskProject.sweep, held as a column) broadcast the counts to (points, simulations) segments, and
+                every point is drawn by the inverse CDF from the same uniforms (common random numbers).
         """
-        Returns a RiskProject.nsim-sized array of samples drawn from a binomial distribution.
+        counts = np.asarray(counts, dtype=np.int64)
+        per_segment = [
+            name
+            for name, value in parameters.items()
+            if np.ndim(value) > 1
+            or (np.ndim(value) and np.shape(value)[-1:] == counts.shape[-1:])
+        ]
+        shape = np.broadcast_shapes(
+            counts.shape, *(np.shape(parameters[name]) for name in per_segment)
+        )
+        drawn = int(counts.sum())
+        repeats = int(np.prod(shape)) // max(counts.size, 1)
+        counts = np.broadcast_to(counts, shape)
+        for name in per_segment:
+            parameters[name] = np.repeat(
+                np.broadcast_to(parameters[name], shape).ravel(), counts.ravel()
+            )
+        if repeats > 1:
+            # Every point of the sweep transforms the same uniforms (common random numbers)
+            u = np.tile(self.rng.random(drawn), repeats)
+            return RaggedArray(DISTRIBUTIONS[distribution].ppf(u, **parameters), counts)
+        return RaggedArray(self.sample(distribution, drawn, **parameters), counts)
+
+    def binomial(self, n: int, p: float):
+        """
+        Returns a RiskProject.sample_size-sized array of samples drawn from a binomial distribution.
 
         Parameters:
             n
@@ -48,11 +429,11 @@ class RiskProject(nx.DiGraph):
             p
                 Probability of success for each trial.
         """
-        return self.rng.binomial(n, p, self.nsim)
+        return self.sample("binomial", n=n, p=p)
 
     def triangular(self, left: float, mode: float, right: float):
         """
-        Returns a RiskProject.nsim-sized array of randomly generated numbers using a triangular distribution.
+        Returns a RiskProject.sample_size-sized array of randomly generated numbers using a triangular distribution.
 
         Parameters:
             left
@@ -62,20 +443,180 @@ class RiskProject(nx.DiGraph):
             right
                 Upper limit of the distribution.
         """
-        return self.rng.triangular(left, mode, right, self.nsim)
+        return self.sample("triangular", left=left, mode=mode, right=right)
 
     def gamma(self, shape, scale):
         """
-        Returns a RiskProject.nsim-sized array of randomly generated numbers using a gamma distribution.
+        Returns a RiskProject.sample_size-sized array of randomly generated numbers using a gamma distribution.
 
         Parameters:
             shape
-                Lower limit of the distribution. # TODO: Change this description!
+                Shape of the distribution.
             scale
-                Most likely value of the distribution.
+                Scale of the distribution.
 
         """
-        return self.rng.gamma(shape, scale, self.nsim)
+        return self.sample("gamma", shape=shape, scale=scale)
+
+    def _resolve_distribution(self, name: str):
+        """
+        Returns the registered Distribution with the given name, unless a subclass defines a method with
+        that name, in which case the bound method is returned.
+        """
+        method = getattr(type(self), name, None)
+        if name in DISTRIBUTIONS and method is getattr(RiskProject, name, None):
+            return DISTRIBUTIONS[name]
+        return getattr(self, name)
+
+    def _sample_random(self, steps):
+        """
+        Draws the values of the given random plan steps. With per-node streams (see RiskProject.streams)
+        each set of correlated nodes is drawn separately, along with the members of its correlation groups.
+        """
+        if self._streams == "shared":
+            return self._sample_group(steps)
+        values = {}
+        for unit in self._draw_units(steps):
+            with self._node_stream([step.name for step in unit]):
+                values.update(self._sample_group(unit))
+        return values
+
+    def _draw_units(self, steps):
+        """
+        Splits random plan steps into the sets of nodes sharing a stream: single nodes, or whole correlation groups
+        (including the members missing from steps).
+        """
+        units = {}
+        for step in steps:
+            members = (step.name,)
+            for group in self._correlations:
+                if step.name in group["nodes"]:
+                    members = tuple(
+                        sorted(
+                            name for name in group["nodes"] if name in self.plan.steps
+                        )
+                    )
+            units[members] = [self.plan.steps[name] for name in members]
+        return [units[members] for members in sorted(units)]
+
+    def _sample_group(self, steps):
+        """
+        Draws the values of the given random plan steps from RiskProject.rng. Nodes sharing a registered distribution
+        are sampled together in a single call into a (nodes, RiskProject.sample_size) array.
+        """
+        copula = {
+            name
+            for group in self._correlations
+            if group["method"] == "copula"
+            for name in group["nodes"]
+        }
+        inverse = [
+            step for step in steps if self.sampling != "random" or step.name in copula
+        ]
+        values = {}
+        batches = {}
+        for step in steps:
+            if self.sampling != "random" or step.name in copula:
+                continue
+            if isinstance(step.func, Distribution):
+                batches.setdefault(step.func, []).append(step)
+            else:
+                values[step.name] = step.func(**self.nodes[step.name]["parameters"])
+        for distribution, batch in batches.items():
+            samples = distribution.sample_batch(
+                self.rng,
+                self.sample_size,
+                [self.nodes[step.name]["parameters"] for step in batch],
+            )
+            values.update(zip([step.name for step in batch], samples))
+        if inverse:
+            values.update(self._sample_inverse(inverse))
+        for group, members in self._correlation_groups(values, "iman-conover"):
+            samples = []
+            for name in members:
+                sample = np.asarray(values[name])
+                if not sample.flags.writeable:
+                    sample = sample.copy()
+                values[name] = sample
+                samples.append(sample)
+            iman_conover(samples, self._submatrix(group, members), self.rng)
+        if any(step.attrs.get("retention", "keep") != "keep" for step in steps):
+            # Rows of a batch share one buffer, which stays alive while any of them does:
+            # give each node its own array so that retiring it frees its memory.
+            for name, value in values.items():
+                if isinstance(value, np.ndarray) and value.base is not None:
+                    values[name] = value.copy()
+        return values
+
+    def _correlation_groups(self, names, method):
+        """Yields the correlation groups using the method, with their members among the given names (if two or more)."""
+        for group in self._correlations:
+            members = [name for name in group["nodes"] if name in names]
+            if group["method"] == method and len(members) > 1:
+                yield group, members
+
+    @staticmethod
+    def _submatrix(group, members):
+        index = [group["nodes"].index(name) for name in members]
+        return group["matrix"][np.ix_(index, index)]
+
+    def _sample_inverse(self, steps):
+        """
+        Draws the values of the given random plan steps by inverse transform of a probability matrix
+        laid out according to RiskProject.sampling, with one row per node.
+        """
+        for step in steps:
+            if not isinstance(step.func, Distribution):
+                raise ValueError(
+                    f"{step.name} must use a registered distribution for {self.sampling} sampling"
+                )
+        probabilities = uniform_matrix(
+            self.sampling, self.rng, len(steps), self.sample_size, self.replicates
+        )
+        rows = {step.name: row for row, step in enumerate(steps)}
+        for group, members in self._correlation_groups(rows, "copula"):
+            index = [rows[name] for name in members]
+            probabilities[index] = gaussian_copula(
+                probabilities[index], self._submatrix(group, members)
+            )
+        batches = {}
+        for row, step in enumerate(steps):
+            batches.setdefault(step.func, []).append((row, step.name))
+        values = {}
+        for distribution, batch in batches.items():
+            rows, names = zip(*batch)
+            samples = distribution.ppf_batch(
+                probabilities[list(rows)],
+                [self.nodes[name]["parameters"] for name in names],
+            )
+            values.update(zip(names, samples))
+        return values
+
+    def _draw_random(self, steps):
+        """Samples every outdated random node among the given plan steps, storing their values."""
+        outdated = [
+            step
+            for step in steps
+            if step.kind == "random" and step.name not in self._fresh
+        ]
+        requested = {step.name for step in outdated}
+        names = set(requested)
+        for group in self._correlations:
+            if names.intersection(group["nodes"]):
+                for name in group["nodes"]:
+                    if name not in names and name in self.plan.steps:
+                        names.add(name)
+                        outdated.append(self.plan.steps[name])
+        drawn = self._draw(outdated)
+        for name in drawn:
+            # Values computed from previous samples (of a released random node, or of a node
+            # redrawn along with its correlation group) are outdated too. A node drawn again
+            # from its own stream gets the same values, unless its group changed.
+            if self._streams == "shared" or name not in requested:
+                self._fresh.difference_update(self.plan.downstream(name))
+        for name, value in drawn.items():
+            self.nodes[name]["value"] = value
+            self._fresh.add(name)
 
     def add_input(self, name: str, value: float, description=""):
         """
@@ -108,7 +649,9 @@ class RiskProject(nx.DiGraph):
             name
                 Name of the node.
             distribution
-                Name of the function whose result will be saved inside this node value attribute when this node is evaluated.
+                Name of a distribution registered in skrisk.distributions.DISTRIBUTIONS (normal, lognormal, uniform,
+                triangular, pert, beta, gamma, exponential, binomial, poisson, discrete, empirical...), or of a method
+                of the project returning a RiskProject.sample_size-sized array.
             parameters
                 Parameters passed to the distribution.
             description
@@ -127,6 +670,38 @@ class RiskProject(nx.DiGraph):
             },
         )
 
+    def correlate(self, nodes: tuple[str, ...], correlation, method="iman-conover"):
+        """
+        Correlates the samples of a group of random nodes. The correlation is applied every time the nodes are drawn:
+        "iman-conover" reorders the independently drawn samples to match the rank correlation (any distribution),
+        while "copula" draws them through a Gaussian copula by inverse transform (registered distributions only,
+        compatible with every RiskProject.sampling strategy). A node can belong to a single group.
+
+        Parameters:
+            nodes
+                Tuple with the names of the random nodes to be correlated.
+            correlation
+                Correlation matrix between the nodes, in the same order, or a single number for a pair of nodes.
+            method
+                "iman-conover" or "copula".
+        """
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unknown correlation method: {method}")
+        nodes = tuple(nodes)
+        for node in nodes:
+            if self.nodes[node]["node_type"] != "random":
+                raise ValueError(f"{node} is not a random node")
+        matrix = correlation_matrix(correlation, len(nodes))
+        self._correlations = [
+            group for group in self._correlations if group["nodes"] != nodes
+        ]
+        for group in self._correlations:
+            if set(nodes).intersection(group["nodes"]):
+                raise ValueError(f"{group['nodes']} are already correlated")
+        self._correlations.append({"nodes": nodes, "matrix": matrix, "method": method})
+        for node in nodes:
+            self.invalidate_values(node)
+
     def add_decision(
         self,
         name: str,
@@ -166,9 +741,10 @@ class RiskProject(nx.DiGraph):
         self,
         name: str,
         operation: str,
-        incoming_nodes: tuple[str, ...] | dict[str, str],
+        incoming_nodes: tuple[str, ...] | dict[str, str] | None = None,
         description="",
         graphtype="histogram",
+        fuse=False,
     ):
         """
         Creates a node that performs an operation on incoming nodes when evaluated.
@@ -177,36 +753,26 @@ class RiskProject(nx.DiGraph):
             name
                 Name of the node.
             operation
-                Name of the function (in the form of a string) whose result will be saved inside this node's value attribute when this node is evaluated.
+                Name of the function (in the form of a string) whose result will be saved inside this node's value attribute when this node is evaluated,
+                or an arithmetic expression over the incoming nodes (a string such as "revenue - cost", or its ast tree). See skrisk.expressions.Expression.
             incoming_nodes
                 Tuple with names for the input nodes whose value(s) will be taken as parameters for the function.
+                It can be omitted for expressions, whose incoming nodes are the names they use.
             description
                 Comprehensive summary about the node.
+            fuse
+                If True and operation is an expression, it is inlined into its only successor (when that is an expression too)
+                instead of being evaluated and stored on its own.
         """
-        self.add_node(
-            name,
-            **{
-                "value": None,
-                "operation": operation,
-                "incoming_nodes": incoming_nodes,
-                "description": description,
-                "node_type": "operation",
-                "stats": None,
-                "graphtype": graphtype,
-            },
+        self._add_operation_node(
+            name, "operation", operation, incoming_nodes, description, graphtype, fuse
         )
-        if isinstance(incoming_nodes, dict):
-            for param, node in incoming_nodes.items():
-                self.add_edge(node, name, param=param)
-        else:
-            for node in incoming_nodes:
-                self.add_edge(node, name)
 
     def add_goal(
         self,
         name: str,
         operation: str,
-        incoming_nodes: tuple[str],
+        incoming_nodes: tuple[str] | None = None,
         description="",
         graphtype="histogram",
     ):
@@ -217,12 +783,34 @@ class RiskProject(nx.DiGraph):
             name
                 Name of the node.
             operation
-                Name of the function (in the form of a string) whose result will be saved inside this node's value attribute when this node is evaluated.
+                Name of the function (in the form of a string) whose result will be saved inside this node's value attribute when this node is evaluated,
+                or an arithmetic expression over the incoming nodes (see RiskProject.add_operation).
             incoming_nodes
                 Tuple with names for the input nodes whose value(s) will be taken as parameters for the function.
+                It can be omitted for expressions.
             description
                 Comprehensive summary about the node.
         """
+        self._add_operation_node(
+            name, "goal", operation, incoming_nodes, description, graphtype
+        )
+
+    def _add_operation_node(
+        self,
+        name,
+        node_type,
+        operation,
+        incoming_nodes,
+        description,
+        graphtype,
+        fuse=False,
+    ):
+        if is_expression(operation):
+            expression = Expression(operation)
+            if incoming_nodes is None:
+                incoming_nodes = expression.names
+        elif incoming_nodes is None:
+            raise ValueError(f"The incoming nodes of {name} must be given")
         self.add_node(
             name,
             **{
@@ -230,13 +818,18 @@ class RiskProject(nx.DiGraph):
                 "operation": operation,
                 "incoming_nodes": incoming_nodes,
                 "description": description,
-                "node_type": "goal",
+                "node_type": node_type,
                 "stats": None,
                 "graphtype": graphtype,
+                "fuse": fuse,
             },
         )
-        for node in incoming_nodes:
-            self.add_edge(node, name)
+        if isinstance(incoming_nodes, dict):
+            for param, node in incoming_nodes.items():
+                self.add_edge(node, name, param=param)
+        else:
+            for node in incoming_nodes:
+                self.add_edge(node, name)
 
     def validate_inputs(self):
         """
@@ -267,61 +860,955 @@ class RiskProject(nx.DiGraph):
         """
         Fills out the "value" attribute of a node, doing the same for all other nodes pointing to it if necessary.
         This method uses the function name and parameters stored in the attributes of each node to generate the relevant RiskProject.nsim-sized arrays.
+        Nodes are evaluated following the compiled plan, so each one is evaluated exactly once per call.
+        Values computed by previous calls are reused unless an upstream node changed since then
+        (see RiskProject.update_input and RiskProject.invalidate_values).
+        The retention policy of every intermediate node is applied as soon as its last consumer has been evaluated
+        (see RiskProject.set_retention).
 
         Parameters
             node
                 Name of the node to be evaluated (usually a goal node).
         """
-        if node in self.input_nodes():
-            return self.nodes[node]["value"]
-        elif node in self.random_nodes():
-            func = getattr(self, self.nodes[node]["distribution"])
-            self.nodes[node]["value"] = func(**(self.nodes[node]["parameters"]))
-            return self.nodes[node]["value"]
+        plan = self.plan
+        hashes = None
+        if self._cache is not None:
+            hashes = self._node_hashes(plan.cone(node))
+            steps, release = self._load_cached(node, hashes)
         else:
-            param_map = {
-                pred: self.get_edge_data(pred, node).get("param")
-                for pred in self.predecessors(node)
-                if self.get_edge_data(pred, node).get("param")
+            steps, release = self._pending(node)
+        outdated = {step.name for step in steps if step.name not in self._fresh}
+        self._draw_random(steps)
+        values = plan.table()
+        for step, released in zip(steps, release):
+            values[step.id] = self._eval_step(step, values)
+            if hashes is not None and step.name in outdated and self._cacheable(step):
+                self._cache.put(hashes[step.name], values[step.id])
+            for pred in released:
+                self._retire(pred.name, values[pred.id])
+                values[pred.id] = None
+        return values[plan.index[node]]
+
+    def _pending(self, targets, recompute=frozenset()):
+        """
+        Returns the plan steps (and their releases) needed to evaluate the target node(s): nothing upstream
+        of an up to date value is visited, so dropped or unsaved nodes feeding it are not drawn or computed again.
+        The nodes in recompute are evaluated even if they are up to date.
+        """
+        plan = self.plan
+        fresh = {
+            step.id
+            for step in plan.cone(targets)
+            if step.name in self._fresh and step.name not in recompute
+        }
+        if not fresh:
+            return plan.cone(targets), plan.releases(targets)
+        return plan.prune(targets, fresh)
+
+    def _eval_step(self, step, values):
+        attrs = step.attrs
+        if step.kind == "input" or step.name in self._fresh:
+            return attrs["value"]
+        if step.kind == "random":
+            attrs["value"] = self._draw([step])[step.name]
+        else:
+            attrs["value"] = self._operate(
+                step, {param: values[pred] for pred, param in step.inputs}
+            )
+        self._fresh.add(step.name)
+        return attrs["value"]
+
+    def _operate(self, step, kwargs):
+        """Evaluates the operation of a plan step, through the profiler if it is enabled."""
+        if self._streams == "node" and not isinstance(step.func, Expression):
+            with self._node_stream([step.name]):
+                value = self._call(step, kwargs)
+        else:
+            value = self._call(step, kwargs)
+        if inspect.iscoroutine(value):
+            value.close()
+            raise TypeError(
+                f"The operation of {step.name} is a coroutine, use RiskProject.eval_async"
+            )
+        return value
+
+    def _call(self, step, kwargs):
+        if self._profiler is None:
+            return step.func(**kwargs)
+        return self._profiler.call(step.name, step.func, kwargs)
+
+    async def _operate_async(self, step, kwargs):
+        """Awaits the coroutine operation of a plan step, with the stream of the node if streams are per node."""
+        if self._streams == "node":
+            with self._node_stream([step.name]):
+                return await self._call_async(step, kwargs)
+        return await self._call_async(step, kwargs)
+
+    async def _call_async(self, step, kwargs):
+        if self._profiler is None:
+            return await step.func(**kwargs)
+        return await self._profiler.call_async(step.name, step.func, kwargs)
+
+    async def eval_async(self, goals, max_concurrency=None, executor=None):
+        """
+        Evaluates one or more goal nodes like RiskProject.eval, running the independent branches of the network
+        concurrently on the running asyncio event loop: each operation starts as soon as the nodes it depends on
+        have been evaluated. Operation methods may be coroutine functions (async def, e.g. to fetch data from
+        a service), which are awaited on the loop. The other operations run in a thread pool, as NumPy releases
+        the GIL for most of its work. Random nodes are drawn on the loop thread before any operation starts.
+        Use asyncio.run(project.eval_async(goals)) from synchronous code.
+
+        Operations sharing state other than their inputs must be thread safe. With per-node streams
+        (see RiskProject.streams) each operation sees its own RiskProject.rng; with the shared stream,
+        operations drawing random numbers are not reproducible. While profiling, the RNG time of concurrent
+        operations may be attributed to the wrong node.
+
+        Parameters:
+            goals
+                Name of the node to be evaluated, or a tuple with the names of several nodes.
+            max_concurrency
+                Maximum number of operations running at once. Defaults to the number of CPUs plus 4 (at most 32).
+            executor
+                concurrent.futures.Executor running the synchronous operations. Defaults to the default executor
+                of the event loop.
+
+        Returns the value of the goal, or a dictionary with the values of each goal.
+        """
+        import asyncio
+
+        plan = self.plan
+        targets = goals if isinstance(goals, tuple) else (goals,)
+        hashes = None
+        if self._cache is not None:
+            hashes = self._node_hashes(plan.cone(targets))
+            steps, _ = self._load_cached(targets, hashes)
+        else:
+            steps, _ = self._pending(targets)
+        outdated = {step.name for step in steps if step.name not in self._fresh}
+        self._draw_random(steps)
+
+        computed = [
+            step
+            for step in steps
+            if step.kind not in ("input", "random") and step.name not in self._fresh
+        ]
+        consumers = {}
+        for step in computed:
+            for pred, _ in step.inputs:
+                consumers[pred] = consumers.get(pred, 0) + 1
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency or min(32, os.cpu_count() + 4))
+        values = plan.table()
+        tasks = {}
+
+        async def evaluate(step):
+            if step.kind in ("input", "random") or step.name in self._fresh:
+                values[step.id] = step.attrs["value"]
+                return
+            await asyncio.gather(*(tasks[pred] for pred, _ in step.inputs))
+            kwargs = {param: values[pred] for pred, param in step.inputs}
+            async with semaphore:
+                if inspect.iscoroutinefunction(step.func):
+                    value = await self._operate_async(step, kwargs)
+                else:
+                    value = await loop.run_in_executor(
+                        executor, self._operate, step, kwargs
+                    )
+            step.attrs["value"] = values[step.id] = value
+            self._fresh.add(step.name)
+            if hashes is not None and step.name in outdated and self._cacheable(step):
+                self._cache.put(hashes[step.name], value)
+            for pred, _ in step.inputs:
+                consumers[pred] -= 1
+                released = plan.by_id[pred]
+                if not consumers[pred] and released.kind != "input":
+                    if released.name not in targets:
+                        self._retire(released.name, values[pred])
+                        values[pred] = None
+
+        for step in steps:
+            tasks[step.id] = asyncio.ensure_future(evaluate(step))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        results = {goal: values[plan.index[goal]] for goal in targets}
+        return results if isinstance(goals, tuple) else results[goals]
+
+    def _draw(self, steps):
+        """Draws the given random plan steps, through the profiler if it is enabled."""
+        if self._profiler is None:
+            return self._sample_random(steps)
+        return self._profiler.draw(self._sample_random, steps)
+
+    def enable_profiling(self, callback=None):
+        """
+        Starts recording, for each node, the number of evaluations, wall time (split into time drawing random numbers
+        and operation time) and bytes of the produced values (see skrisk.profiling.Profiler). Previous records are discarded.
+        When profiling is disabled (the default) evaluation is not instrumented at all.
+
+        Parameters:
+            callback
+                Function called with a dictionary (node, kind, wall_time, rng_time, bytes) after each evaluation of a node.
+        """
+        self._profiler = Profiler(callback)
+
+    def disable_profiling(self):
+        """
+        Stops recording the evaluation of the nodes.
+        """
+        self._profiler = None
+
+    def profile(self):
+        """
+        Returns a DataFrame with the profiling records of each node (evaluations, wall_time, rng_time,
+        operation_time and bytes), slowest first. See RiskProject.enable_profiling.
+        """
+        if self._profiler is None:
+            raise ValueError(
+                "Profiling is not enabled, see RiskProject.enable_profiling"
+            )
+        return self._profiler.table()
+
+    def enable_cache(self, directory=None, max_bytes=2**30, nodes=None):
+        """
+        Saves the value of every evaluated node in an on-disk cache (see skrisk.cache.ResultCache) under its content hash
+        (see RiskProject.node_hash), so that later evaluations, in this or any other process, load the nodes whose hash
+        is in the cache instead of computing them, skipping everything upstream of them that isn't needed otherwise.
+        Random streams are switched to "node" (see RiskProject.streams), so cached values don't depend on the
+        evaluation order, and can't be set back to "shared" until the cache is disabled.
+        Operations must only depend on their inputs, RiskProject.rng and RiskProject.sample_size: anything else
+        they read (e.g. the parameters of another node through RiskProject.nodes) is not part of the hash,
+        so a change to it returns stale cached values. Pass such values in through an input node instead.
+
+        Parameters:
+            directory
+                Path of the cache directory. Defaults to a "cache" subdirectory of RiskProject.output_directory.
+            max_bytes
+                Maximum total size of the cache. The least recently used values are evicted beyond it.
+            nodes
+                List with the names of the nodes whose values are cached. Defaults to every node but the input nodes.
+
+        Returns the ResultCache.
+        """
+        if self.seed is None:
+            raise ValueError("The result cache requires a fixed seed")
+        self.streams = "node"
+        self._cache = ResultCache(
+            directory or os.path.join(self.output_directory, "cache"), max_bytes
+        )
+        self._cache_nodes = None if nodes is None else set(nodes)
+        return self._cache
+
+    def disable_cache(self):
+        """
+        Stops saving and loading node values in the result cache. The cached files are kept.
+        """
+        self._cache = None
+
+    def node_hash(self, node: str) -> str:
+        """
+        Returns the content hash of a node: a digest of its distribution or operation, its parameters, the hashes
+        of the nodes it depends on, RiskProject.seed, RiskProject.streams and RiskProject.nsim (plus the sampling
+        strategy and the correlations of random nodes). With per-node streams nodes with the same hash have the same value.
+
+        Parameters:
+            node
+                Name of the node.
+        """
+        return self._node_hashes(self.plan.cone(node))[node]
+
+    def _node_hashes(self, steps):
+        """Returns a dictionary with the content hash of each of the given plan steps, which must include their inputs."""
+        run = (self.seed, self._streams, self._stream_key, self.nsim)
+        hashes = {}
+        for step in steps:
+            attrs = step.attrs
+            if step.kind == "input":
+                parts = (step.kind, attrs["value"])
+            elif step.kind == "random":
+                (unit,) = self._draw_units([step])
+                names = {member.name for member in unit}
+                parts = (
+                    step.kind,
+                    step.name,
+                    run,
+                    self.sampling,
+                    self.replicates,
+                    [
+                        (
+                            member.name,
+                            callable_identity(member.func),
+                            member.attrs["parameters"],
+                        )
+                        for member in unit
+                    ],
+                    [
+                        (group["method"], group["nodes"], group["matrix"])
+                        for group in self._correlations
+                        if names.intersection(group["nodes"])
+                    ],
+                )
+            else:
+                parts = (
+                    step.kind,
+                    step.name,
+                    run,
+                    callable_identity(step.func),
+                    [(param, hashes[pred]) for pred, param in step.args],
+                )
+            hashes[step.name] = content_hash(*parts)
+        return hashes
+
+    def _cacheable(self, step):
+        return step.kind != "input" and (
+            self._cache_nodes is None or step.name in self._cache_nodes
+        )
+
+    def _load_cached(self, targets, hashes):
+        """
+        Loads from the result cache the outdated nodes of the cone of the targets whose hash it holds,
+        returning the plan steps (and releases) still needed to evaluate the targets (see RiskProject._pending).
+        """
+        plan = self.plan
+        fresh = {step.id for step in plan.cone(targets) if step.name in self._fresh}
+        hits = {
+            step.id
+            for step in plan.cone(targets)
+            if step.id not in fresh
+            and self._cacheable(step)
+            and hashes[step.name] in self._cache
+        }
+        while True:
+            steps, release = plan.prune(targets, hits | fresh)
+            missed = set()
+            for step in steps:
+                if step.id in hits and step.name not in self._fresh:
+                    value = self._cache.get(hashes[step.name])
+                    if value is None:  # Evicted since the lookup
+                        missed.add(step.id)
+                    else:
+                        step.attrs["value"] = value
+                        self._fresh.add(step.name)
+            if not missed:
+                return steps, release
+            hits -= missed
+
+    def sweep(self, goals, grid: dict, product=False, as_frame=False):
+        """
+        Evaluates one or more goal nodes over a grid of values for some input nodes in a single pass.
+        Each swept input is broadcast as a column, so the nodes downstream of it hold a (points x RiskProject.nsim) array,
+        while the random nodes are drawn once and shared by every point of the grid (common random numbers).
+        The operations downstream of the swept inputs must therefore support NumPy broadcasting.
+
+        Parameters:
+            goals
+                Name of the node to be evaluated, or a tuple with the names of several nodes.
+            grid
+                Dictionary whose keys are names of input nodes and whose values are the sequences of values to sweep.
+            product
+                If True, every combination of the values in grid is evaluated. Otherwise the sequences are
+                paired element-wise and must have the same length.
+            as_frame
+                If True, results are returned as pandas DataFrames indexed by the points of the grid.
+
+        Returns an array with shape (points, RiskProject.nsim) for a single goal, or a dictionary of them for several goals.
+        Goals holding a RaggedArray are returned as they are, with counts of shape (points, RiskProject.nsim)
+        when they depend on a swept input.
+        """
+        names = tuple(grid)
+        if not names:
+            raise ValueError("The grid must contain at least one input node")
+        for name in names:
+            if self.nodes[name]["node_type"] != "input":
+                raise ValueError(f"{name} is not an input node")
+        columns = [np.asarray(grid[name]) for name in names]
+        if product:
+            columns = [
+                column.ravel() for column in np.meshgrid(*columns, indexing="ij")
+            ]
+        elif len({len(column) for column in columns}) > 1:
+            raise ValueError("All the swept sequences must have the same length")
+        npoints = len(columns[0]) if columns else 1
+
+        plan = self.plan
+        targets = goals if isinstance(goals, tuple) else (goals,)
+        swept = frozenset().union(*(plan.downstream(name) for name in names))
+        values = plan.table()
+        for name, column in zip(names, columns):
+            values[plan.index[name]] = column[:, None]
+        fixed = {plan.index[name] for name in names}
+        steps, release = self._pending(targets, swept)
+        self._draw_random(steps)
+        for step, released in zip(steps, release):
+            if step.id in fixed:
+                continue
+            if step.name not in swept:
+                values[step.id] = self._eval_step(step, values)
+            else:
+                values[step.id] = self._operate(
+                    step, {param: values[pred] for pred, param in step.inputs}
+                )
+            for pred in released:
+                if pred.name not in swept:
+                    self._retire(pred.name, values[pred.id])
+                values[pred.id] = None
+
+        results = {}
+        for goal in targets:
+            value = values[plan.index[goal]]
+            if isinstance(value, RaggedArray):
+                results[goal] = value
+                continue
+            value = np.broadcast_to(value, (npoints, self.nsim))
+            if as_frame:
+                import pandas as pd
+
+                index = pd.MultiIndex.from_arrays(columns, names=names)
+                value = pd.DataFrame(value, index=index)
+            results[goal] = value
+        return results if isinstance(goals, tuple) else results[goals]
+
+    def run_scenarios(
+        self, scenarios, goals=None, workers=1, levels=None, percentiles=None
+    ):
+        """
+        Evaluates the goals and generates their stats (see RiskProject.generate_stats) for a batch of scenarios,
+        each one a set of overrides of the values of input nodes and of the parameters of random nodes.
+        Scenarios are run one after the other on the same project, applying only the overrides that differ
+        from the previous scenario, so the samples of the random nodes whose parameters don't change and
+        the values of the nodes not depending on any change are computed once and shared by every scenario.
+        Sorting the scenarios so consecutive ones differ in few nodes therefore makes the batch cheaper.
+        With per-node streams (see RiskProject.streams) the results don't depend on the order of the scenarios,
+        and random nodes with overridden parameters use common random numbers.
+
+        Parameters:
+            scenarios
+                pandas DataFrame with one row per scenario (named by its index), or dictionary mapping the names of
+                the scenarios to dictionaries of overrides. Columns (or keys) are names of input nodes, or
+                "node.parameter" for the parameters of random nodes. Missing values (NaN) keep the value of the project.
+            goals
+                Name of the node to be evaluated, or a tuple with the names of several nodes. Defaults to every goal node.
+            workers
+                Number of processes the scenarios are split across (the project must be picklable). None uses
+                the number of CPUs. The random nodes are drawn, and the nodes not affected by any override evaluated,
+                once before the batch is split, and shared by every worker. More than one worker requires per-node
+                streams, so that the results don't depend on how the batch is split.
+            levels
+                Confidence levels of the value at risk metrics to be added to the stats (see RiskProject.risk_metrics).
+            percentiles
+                Percentiles to be added to the stats (see RiskProject.risk_metrics).
+
+        Returns a DataFrame with one row per scenario and goal: the name of the scenario, the overridden values,
+        the name of the goal and its stats.
+        """
+        import pandas as pd
+
+        if isinstance(scenarios, pd.DataFrame):
+            scenarios = scenarios.to_dict("index")
+        scenarios = [
+            (
+                name,
+                {
+                    column: value
+                    for column, value in overrides.items()
+                    if not (isinstance(value, float) and np.isnan(value))
+                },
+            )
+            for name, overrides in scenarios.items()
+        ]
+        columns = {}
+        for _, overrides in scenarios:
+            for column in overrides:
+                if column not in columns:
+                    columns[column] = self._override_target(column)
+        if goals is None:
+            goals = tuple(
+                node for node in self.nodes if self.nodes[node]["node_type"] == "goal"
+            )
+        targets = goals if isinstance(goals, tuple) else (goals,)
+        options = (targets, columns, levels, percentiles)
+
+        workers = min(workers or os.cpu_count(), len(scenarios))
+        if workers > 1 and self._streams != "node":
+            raise ValueError(
+                'Running scenarios on several workers requires streams = "node"'
+            )
+        if workers <= 1:
+            records = self._scenario_batch(scenarios, *options)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            for goal in targets:
+                self.eval(goal)
+            batches = [
+                [scenarios[i] for i in batch]
+                for batch in np.array_split(np.arange(len(scenarios)), workers)
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = executor.map(
+                    _scenario_worker,
+                    [self] * workers,
+                    [set(self._fresh)] * workers,
+                    batches,
+                    [options] * workers,
+                )
+                records = [record for part in parts for record in part]
+        return pd.DataFrame.from_records(records)
+
+    def _override_target(self, column):
+        """Returns the (node, parameter) overridden by a column of a scenario table, with None as the parameter of input nodes."""
+        if column in self.nodes:
+            if self.nodes[column]["node_type"] != "input":
+                raise ValueError(f"{column} is not an input node")
+            return column, None
+        node, _, param = column.rpartition(".")
+        if node not in self.nodes or self.nodes[node]["node_type"] != "random":
+            raise ValueError(
+                f"{column} is neither an input node nor a parameter of a random node"
+            )
+        return node, param
+
+    def _scenario_batch(self, scenarios, goals, columns, levels, percentiles):
+        """
+        Evaluates the goals for each (name, overrides) pair in turn, applying only the overrides that change
+        from one scenario to the next, and restores the project afterwards. Returns the records of the stats.
+        """
+        base = {}
+        for column, (node, param) in columns.items():
+            attrs = self.nodes[node]
+            base[column] = (
+                attrs["value"] if param is None else attrs["parameters"][param]
+            )
+        originals = {}
+        current = dict(base)
+        records = []
+        for name, overrides in scenarios + [(None, {})]:
+            settings = {**base, **overrides}
+            for column, value in settings.items():
+                if not _same(value, current[column]):
+                    self._override(*columns[column], value, originals)
+            current = settings
+            if name is None:  # Back to the values of the project
+                break
+            for goal in goals:
+                self.eval(goal)
+                stats = self.generate_stats(
+                    goal, levels=levels, percentiles=percentiles
+                )
+                records.append({"scenario": name, **settings, "goal": goal, **stats})
+        return records
+
+    def _override(self, node, param, value, originals):
+        """
+        Changes the value of an input node, or a parameter of a random node, marking what depends on it as outdated.
+        The sample of a random node drawn with its original parameters is kept in originals, and restored
+        (instead of drawn again) when the node gets back to them.
+        """
+        if param is None:
+            self.update_input(node, value)
+            return
+        attrs = self.nodes[node]
+        if node not in originals:
+            sample = attrs["value"] if node in self._fresh else None
+            originals[node] = (attrs["parameters"], sample)
+        parameters = {**attrs["parameters"], param: value}
+        attrs["parameters"] = parameters
+        self._fresh.difference_update(self.plan.downstream(node))
+        original, sample = originals[node]
+        correlated = any(node in group["nodes"] for group in self._correlations)
+        if sample is not None and not correlated:
+            if all(_same(parameters[key], original.get(key)) for key in parameters):
+                attrs["value"] = sample
+                self._fresh.add(node)
+
+    def eval_streaming(self, goals, chunk_size=1_000_000, resolution=2048):
+        """
+        Evaluates one or more goal nodes in chunks of at most chunk_size simulations, so that RiskProject.nsim
+        can exceed the available memory. Intermediate arrays are dropped as soon as the nodes consuming them
+        have been evaluated, and the goal arrays are never stored: their statistics and histogram are accumulated
+        online and saved in the "stats", "moments" (MomentAccumulator), "sketch" (QuantileSketch)
+        and "histogram" (StreamingHistogram) attributes of each goal node.
+
+        Parameters:
+            goals
+                Name of the node to be evaluated, or a tuple with the names of several nodes.
+            chunk_size
+                Maximum number of simulations evaluated at once.
+            resolution
+                Number of fine bins of the histogram accumulated for each goal (see StreamingHistogram).
+
+        Returns the stats of the goal, or a dictionary with the stats of each goal.
+        """
+        plan = self.plan
+        targets = goals if isinstance(goals, tuple) else (goals,)
+        steps = plan.cone(targets)
+        release = plan.releases(targets)
+        random_steps = [step for step in steps if step.kind == "random"]
+        keys = None
+        if self._cache is not None:
+            hashes = self._node_hashes(steps)
+            keys = {
+                goal: content_hash("streaming", hashes[goal], chunk_size, resolution)
+                for goal in targets
             }
-            param = {pred: self.eval(pred) for pred in self.predecessors(node)}
-            param = {param_map.get(key, key): param[key] for key in param}
-            func = getattr(self, self.nodes[node]["operation"])
-            self.nodes[node]["value"] = func(**param)
-            return self.nodes[node]["value"]
+            cached = {goal: self._cache.get(key) for goal, key in keys.items()}
+            if all(value is not None for value in cached.values()):
+                results = {
+                    goal: self._store_accumulators(goal, cached[goal])
+                    for goal in targets
+                }
+                return results if isinstance(goals, tuple) else results[goals]
+        accumulators = {goal: _new_accumulators(resolution) for goal in targets}
+        stream_key = self._stream_key
+        try:
+            for chunk, start in enumerate(range(0, self.nsim, chunk_size)):
+                self._chunk_size = min(chunk_size, self.nsim - start)
+                # With per-node streams, each chunk draws from its own streams
+                self._stream_key = stream_key + (chunk,)
+                values = plan.table()
+                for name, value in self._draw(random_steps).items():
+                    values[plan.index[name]] = value
+                for step, released in zip(steps, release):
+                    if step.kind == "input":
+                        values[step.id] = step.attrs["value"]
+                    elif step.kind != "random":
+                        values[step.id] = self._operate(
+                            step, {param: values[pred] for pred, param in step.inputs}
+                        )
+                    for pred in released:
+                        values[pred.id] = None
+                for goal in targets:
+                    for accumulator in accumulators[goal].values():
+                        accumulator.update(values[plan.index[goal]])
+        finally:
+            self._chunk_size = None
+            self._stream_key = stream_key
+        if keys is not None:
+            for goal in targets:
+                self._cache.put(keys[goal], accumulators[goal])
+
+        results = {
+            goal: self._store_accumulators(goal, accumulators[goal]) for goal in targets
+        }
+        return results if isinstance(goals, tuple) else results[goals]
+
+    def _store_accumulators(self, node, accumulators):
+        """Replaces the value of a node by the online accumulators of its observations and generates its stats."""
+        self.nodes[node].update(accumulators)
+        self.nodes[node]["value"] = None
+        self._fresh.discard(node)
+        return self.generate_stats(node)
 
-    def generate_stats(self, node: str, ignore=None, additional=None):
-        # TODO: Add the functionality related to the ignore/additional parameters.
+    def eval_parallel(self, goals, workers=None, chunk_size=None):
+        """
+        Evaluates one or more goal nodes splitting RiskProject.nsim across a pool of processes.
+        Each worker draws from its own stream, spawned from RiskProject.seed with numpy.random.SeedSequence,
+        so results are reproducible for a given seed and number of workers.
+        The project (including its subclass) must be picklable.
+
+        Parameters:
+            goals
+                Name of the node to be evaluated, or a tuple with the names of several nodes.
+            workers
+                Number of processes to use. Defaults to the number of CPUs.
+            chunk_size
+                If given, each worker runs RiskProject.eval_streaming with this chunk size and only the merged
+                accumulators are sent back (see RiskProject.eval_streaming).
+                Otherwise the goal arrays of every worker are concatenated and stored in the goal nodes.
+
+        Returns the value (or the stats, if chunk_size is given) of the goal, or a dictionary of them for several goals.
+        """
+        targets = goals if isinstance(goals, tuple) else (goals,)
+        workers = workers or os.cpu_count()
+        sizes = [
+            self.nsim // workers + (i < self.nsim % workers) for i in range(workers)
+        ]
+        streams = SeedSequence(self.seed).spawn(workers)
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(
+                executor.map(
+                    _simulate_worker,
+                    [self._worker_template()] * workers,
+                    streams,
+                    sizes,
+                    [targets] * workers,
+                    [chunk_size] * workers,
+                )
+            )
+
+        self.invalidate_values()
+        results = {}
+        for goal in targets:
+            if chunk_size is None:
+                value = _concatenate([part[goal] for part in parts])
+                self.nodes[goal]["value"] = value
+                results[goal] = value
+            else:
+                accumulators = parts[0][goal]
+                for part in parts[1:]:
+                    for key, accumulator in accumulators.items():
+                        accumulator.merge(part[goal][key])
+                results[goal] = self._store_accumulators(goal, accumulators)
+        return results if isinstance(goals, tuple) else results[goals]
+
+    def estimate_memory(self, nsim=None, goals=None, pilot=1000):
+        """
+        Estimates the peak memory (in bytes) of the node values held during RiskProject.eval of the goals,
+        taking the retention policies into account. The size per simulation of each node is measured
+        with a pilot run of a few simulations, which leaves the state of the project untouched.
+        Temporary arrays created inside operations are not counted.
+
+        Parameters:
+            nsim
+                Number of simulations to estimate for. Defaults to RiskProject.nsim.
+            goals
+                Name of the node to be evaluated, or a tuple with the names of several nodes. Defaults to every goal node.
+            pilot
+                Number of simulations of the pilot run.
+        """
+        nsim = nsim or self.nsim
+        if goals is None:
+            goals = tuple(
+                node for node in self.nodes if self.nodes[node]["node_type"] == "goal"
+            )
+        plan = self.plan
+        steps = plan.cone(goals)
+        state = self.rng.bit_generator.state
+        self._chunk_size = min(pilot, self.nsim)
+        try:
+            values = plan.table()
+            random_steps = [s for s in steps if s.kind == "random"]
+            for name, value in self._sample_random(random_steps).items():
+                values[plan.index[name]] = value
+            for step in steps:
+                if step.kind == "input":
+                    values[step.id] = step.attrs["value"]
+                elif step.kind != "random":
+                    values[step.id] = step.func(
+                        **{param: values[pred] for pred, param in step.inputs}
+                    )
+            sizes = plan.table()
+            for step in steps:
+                sizes[step.id] = nbytes(values[step.id]) * (
+                    1 if step.kind == "input" else nsim / self._chunk_size
+                )
+        finally:
+            self._chunk_size = None
+            self.rng.bit_generator.state = state
+
+        live = sum(sizes[s.id] for s in steps if s.kind in ("input", "random"))
+        peak = live
+        for step, released in zip(steps, plan.releases(goals)):
+            if step.kind not in ("input", "random"):
+                live += sizes[step.id]
+                peak = max(peak, live)
+            for pred in released:
+                if pred.attrs.get("retention", "keep") != "keep":
+                    live -= sizes[pred.id]
+        return int(peak)
+
+    def generate_stats(
+        self, node: str, ignore=None, additional=None, levels=None, percentiles=None
+    ):
         """
         Generates and adds to the node an attribute named "stats" from its eval-generated value attribute.
+        The moments are computed in a single blocked pass over the value, and the median (along with the
+        risk metrics, if requested) from a single partition of it. Nodes evaluated with
+        RiskProject.eval_streaming (which have no value) use their online accumulators instead,
+        in which case the quantiles are estimated from the quantile sketch.
 
         Parameters
             node
                 Name of the node whose statistics will be generated.
             ignore
                 List of names of the stats that you don't want to generate.
-                  additional
+            additional
                 List of tuples whose first value corresponds to the name of the statistics to be generated, and the second corresponds to the function used.
+                The function receives the value of the node, so additional stats are not available for streamed nodes.
+            levels
+                Confidence levels of the value at risk metrics to be added to the stats (see RiskProject.risk_metrics).
+            percentiles
+                Percentiles to be added to the stats (see RiskProject.risk_metrics).
         """
-        stats = {
-            "mean": np.mean(self.nodes[node]["value"], axis=0),
-            "max": np.max(self.nodes[node]["value"], axis=0),
-            "min": np.min(self.nodes[node]["value"], axis=0),
-            "std": np.std(self.nodes[node]["value"], axis=0),
-            "median": np.median(self.nodes[node]["value"], axis=0),
-            "skew": skew(self.nodes[node]["value"]),
-            "kurt": kurtosis(self.nodes[node]["value"]),
-        }
-        self.nodes[node]["stats"] = stats
+        attrs = self.nodes[node]
+        ignore = set(ignore or ())
+        value = attrs["value"]
+        if value is not None:
+            values = np.asarray(value, dtype=float)
+            moments = MomentAccumulator().update(values)
+        elif attrs.get("moments") is not None:
+            moments = attrs["moments"]
+        else:
+            raise ValueError(f"{node} has not been evaluated")
+
+        summary = moments.result()
+        stats = {name: summary[name] for name in ("mean", "max", "min", "std")}
+        data = values if value is not None else attrs["sketch"]
+        metrics = {}
+        if levels or percentiles:
+            percentiles = tuple(percentiles or ())
+            metrics = _risk_metrics(data, levels or (), percentiles + (50,))
+            median = metrics["p50"] if 50 in percentiles else metrics.pop("p50")
+        elif "median" in ignore:
+            median = None
+        elif value is not None:
+            median = partition_quantiles(values, (0.5,))[0][0]
+        else:
+            median = data.quantile(0.5)
+        stats["median"] = median
+        stats["skew"] = summary["skew"]
+        stats["kurt"] = summary["kurt"]
+        stats.update(metrics)
+        for name, func in additional or ():
+            if value is None:
+                raise ValueError(f"{node} has no value to compute {name} from")
+            stats[name] = func(value)
+        stats = {name: stat for name, stat in stats.items() if name not in ignore}
+        attrs["stats"] = stats
         return stats
 
-    def print_stats(self, node: str):
+    def standard_error(self, node):
+        """
+        Returns the standard error of the mean of a node (or a dictionary of them for a tuple of nodes),
+        taking into account the sampling strategy its random inputs were drawn with: antithetic pairs are
+        averaged, and the "lhs", "sobol" and "halton" strategies use the spread of the means of their
+        RiskProject.replicates independent blocks.
+
+        Parameters
+            node
+                Name of the evaluated node, or a tuple with the names of several nodes.
+        """
+        if isinstance(node, tuple):
+            return {name: self.standard_error(name) for name in node}
+        values = np.asarray(self.nodes[node]["value"], dtype=float).ravel()
+        if self.sampling == "random":
+            return values.std(ddof=1) / np.sqrt(values.size)
+        if self.sampling == "antithetic":
+            half = values.size // 2
+            pairs = (values[:half] + values[half : 2 * half]) / 2
+            return pairs.std(ddof=1) / np.sqrt(half)
+        sizes = block_sizes(values.size, min(self.replicates, values.size))
+        offsets = np.cumsum([0] + sizes[:-1])
+        means = np.add.reduceat(values, offsets) / sizes
+        return means.std(ddof=1) / np.sqrt(len(means))
+
+    def risk_metrics(
+        self,
+        node: str,
+        levels=(0.95, 0.99),
+        percentiles=(1, 5, 10, 25, 50, 75, 90, 95, 99),
+        threshold=0.0,
+        streaming=False,
+    ):
+        """
+        Generates and adds to the node an attribute named "metrics" with its percentiles, value at risk (var_),
+        conditional value at risk (cvar_) and probability of loss (prob_loss). Values are treated as gains,
+        so losses are the negative values and the value at risk is reported as a positive loss.
+        All the metrics are computed from a single partition of the node value.
+
+        Parameters
+            node
+                Name of the node whose metrics will be generated.
+            levels
+                Confidence levels (between 0 and 1) of the value at risk and conditional value at risk.
+            percentiles
+                Percentiles (between 0 and 100) to be reported.
+            threshold
+                Value below which an observation counts as a loss.
+            streaming
+                If True, the metrics are estimated from the quantile sketch of the node (see RiskProject.eval_streaming)
+                even when its value is available. Nodes without value always use their sketch.
+        """
+        attrs = self.nodes[node]
+        if streaming or attrs["value"] is None:
+            data = attrs.get("sketch")
+            if data is None:
+                if attrs["value"] is None:
+                    raise ValueError(f"{node} has not been evaluated")
+                data = QuantileSketch().update(attrs["value"])
+        else:
+            data = attrs["value"]
+        attrs["metrics"] = _risk_metrics(data, levels, percentiles, threshold)
+        return attrs["metrics"]
+
+    def sensitivity(self, goal: str, nodes=None):
+        """
+        Generates and adds to the goal an attribute named "sensitivity" measuring how much each random or input node
+        drives it, computed from the values of the last evaluation: the Spearman rank correlation of each node
+        with the goal, its standardized regression coefficient (src) and its contribution to variance
+        (see skrisk.sensitivity.sensitivity). Nothing is evaluated, so the goal and the measured nodes must hold
+        up to date values of the same run (see RiskProject.eval), otherwise a ValueError is raised. Goals evaluated
+        by RiskProject.eval_parallel or RiskProject.eval_streaming don't keep the samples of their drivers.
+
+        Parameters:
+            goal
+                Name of the node whose drivers are measured.
+            nodes
+                List with the names of the nodes to measure. Defaults to the random nodes the goal depends on
+                and the input nodes with one value per simulation, leaving out those with a constant value.
+                A ValueError is raised when there is no node to measure.
+
+        Returns a DataFrame with a row per node, sorted by the absolute value of their rank correlation.
+        The coefficient of determination of the regression is kept in its attrs["r_squared"].
+        """
+        import pandas as pd
+
+        if goal not in self._fresh:
+            raise ValueError(f"{goal} has no up to date value, evaluate it first")
+        output = self.nodes[goal]["value"]
+        if output is None or np.shape(output) != (self.nsim,):
+            raise ValueError(f"{goal} has no value with one observation per simulation")
+        default = nodes is None
+        if default:
+            nodes = [
+                step.name
+                for step in self.plan.cone(goal)
+                if step.kind in ("random", "input")
+            ]
+        for node in nodes:
+            attrs = self.nodes[node]
+            if attrs["node_type"] != "input" and node not in self._fresh:
+                raise ValueError(
+                    f"{node} has no up to date value, its retention policy must be keep"
+                )
+            if not default and np.shape(attrs["value"]) != (self.nsim,):
+                raise ValueError(
+                    f"{node} has no value with one observation per simulation"
+                )
+        if default:
+            nodes = [
+                node
+                for node in nodes
+                if np.shape(self.nodes[node]["value"]) == (self.nsim,)
+                and np.ptp(self.nodes[node]["value"]) > 0
+            ]
+        if not nodes:
+            raise ValueError(
+                f"There are no nodes varying across simulations to measure the sensitivity of {goal}"
+            )
+
+        results = _sensitivity([self.nodes[node]["value"] for node in nodes], output)
+        r_squared = results.pop("r_squared")
+        table = pd.DataFrame(results, index=pd.Index(nodes, name="node"))
+        table = table.iloc[np.argsort(-np.abs(table["rank_correlation"].values))]
+        table.attrs["r_squared"] = r_squared
+        self.nodes[goal]["sensitivity"] = table.to_dict("index")
+        return table
+
+    def print_stats(self, node: str, include=None):
         """
         Prints the stats attribute of a node inside a table.
 
         Parameters
             node
                 Name of the node whose stats will be printed.
+            include
+                List of names of the stats to be printed. If None, every stat is printed.
         """
         longesti = 0
         longestj = 0
@@ -349,15 +1836,121 @@ class RiskProject(nx.DiGraph):
         ""  # Variable where the location of the last generated graph is stored
     )
 
+    def output_manager(self, file_path=None):
+        """
+        Returns the OutputManager allocating the file names of a directory, which is created
+        and scanned only the first time it is used by this project.
+
+        Parameters:
+            file_path
+                Path of the directory. Defaults to RiskProject.output_directory.
+        """
+        file_path = file_path or self.output_directory
+        key = os.path.abspath(file_path)
+        if key not in self._outputs:
+            self._outputs[key] = OutputManager(file_path)
+        return self._outputs[key]
+
+    def new_run(self, name=None, file_path=None):
+        """
+        Creates a subdirectory for the charts of a new run and makes it RiskProject.output_directory.
+
+        Parameters:
+            name
+                Name of the subdirectory. Defaults to the current date and time.
+            file_path
+                Path of the parent directory. Defaults to RiskProject.output_directory.
+
+        Returns the path of the new directory.
+        """
+        manager = self.output_manager(file_path).new_run(name)
+        self._outputs[os.path.abspath(manager.directory)] = manager
+        self.output_directory = manager.directory
+        return manager.directory
+
+    def _cached(self, node, key, compute):
+        """Returns compute(value) for the current value of a node, computing it only once per value."""
+        attrs = self.nodes[node]
+        value = attrs["value"]
+        source, cache = attrs.get("bin_counts") or (None, {})
+        if source is None or source() is not value:
+            try:
+                source, cache = weakref.ref(value), {}
+            except TypeError:  # Python scalars and lists can't be referenced weakly
+                return compute(value)
+            attrs["bin_counts"] = (source, cache)
+        if key not in cache:
+            cache[key] = compute(value)
+        return cache[key]
+
+    def histogram(self, node, bins=10):
+        """
+        Returns the counts and edges of the histogram of a node. They are computed once per value of the node
+        (with numpy.histogram) and cached, so charts never need to go through the samples again.
+        Nodes evaluated by RiskProject.eval_streaming use their StreamingHistogram, merged across chunks and workers.
+
+        Parameters:
+            node
+                Name of the node.
+            bins
+                Number of bins, or any other bins argument accepted by numpy.histogram (such as "auto").
+        """
+        attrs = self.nodes[node]
+        if attrs["value"] is None:
+            if attrs.get("histogram") is None:
+                raise ValueError(f"{node} has not been evaluated")
+            accumulator = attrs["histogram"]
+            if not isinstance(bins, int):
+                bins = int(np.ceil(np.log2(max(accumulator.total, 1)))) + 1
+            return accumulator.to_bins(bins)
+
+        def compute(value):
+            data = np.asarray(value)
+            if data.dtype.kind not in "iuf":
+                data = data.astype(float)
+            if data.dtype.kind == "f":
+                finite = np.isfinite(data)
+                if not finite.all():
+                    data = data[finite]
+            return np.histogram(data, bins)
+
+        return self._cached(node, ("histogram", str(bins)), compute)
+
+    def value_counts(self, node):
+        """
+        Returns the distinct values of a node (as strings) and how many times each one appears,
+        computed once per value of the node with numpy.unique and cached.
+        Nodes evaluated by RiskProject.eval_streaming use their ValueCounts, merged across chunks and workers.
+
+        Parameters:
+            node
+                Name of the node.
+        """
+        attrs = self.nodes[node]
+        if attrs["value"] is None:
+            if attrs.get("counts") is None:
+                raise ValueError(f"{node} has not been evaluated")
+            if attrs["counts"].overflow:
+                raise ValueError(f"{node} has too many distinct values to be counted")
+            keys, counts = attrs["counts"].keys, attrs["counts"].counts
+        else:
+            keys, counts = self._cached(
+                node,
+                "value_counts",
+                lambda value: np.unique(np.asarray(value), return_counts=True),
+            )
+        return [str(key) for key in keys], counts
+
     def generate_histogram(
         self,
         node,
         title: str = "",
-        file_path="/tmp/skrisk/",
+        file_path=None,
+        bins="auto",
         **kwargs,
     ):
         """
-        Generates a histogram for a node.
+        Generates a histogram for a node, plotted from its cached bin counts (see RiskProject.histogram).
 
         Parameters:
             node
@@ -365,50 +1958,77 @@ class RiskProject(nx.DiGraph):
             title
                 Title for the histogram.
             file_path
-                Path where the histogram will be generated.
+                Path where the histogram will be generated. Defaults to RiskProject.output_directory.
+            bins
+                Number of bins, or any other bins argument accepted by numpy.histogram.
             **kwargs
                 Miscellaneous arguments for the seaborn.histplot() function.
         """
-        temp_file_path = check_path(file_path)
-        hist_png_filename = incremental_filename(node, temp_file_path)
-        sns.set_style(self.plot_style)
-        sns.set_palette(self.plot_palette)
-        sns.histplot(self.nodes[node]["value"], **kwargs).set(title=title)
-        plt.savefig(hist_png_filename)
+        output = self.output_manager(file_path)
+        hist_png_filename = output.reserve(node)
+        counts, edges = self.histogram(node, bins)
+        from .report import render_histogram
+
+        try:
+            render_histogram(
+                hist_png_filename,
+                counts,
+                edges,
+                title,
+                self.plot_palette,
+                self.plot_style,
+                **kwargs,
+            )
+        except BaseException:
+            output.release(hist_png_filename)
+            raise
         self.last_generated_graphic = hist_png_filename
         print(f"Plot saved in file: {hist_png_filename}")
-        plt.figure()
 
     def generate_piechart(
         self,
         node,
         title: str = "",
-        file_path="/tmp/skrisk/",
+        file_path=None,
         **kwargs,
     ):
         """
-        Generates a pie chart for a node.
+        Generates a pie chart for a node, plotted from its cached value counts (see RiskProject.value_counts).
         """
-        temp_file_path = check_path(file_path)
-        hist_png_filename = incremental_filename(node, temp_file_path)
-
-        sns.set_style(self.plot_style)
-        sns.set_palette(self.plot_palette)
-        palette = sns.color_palette(self.plot_palette)
-
-        data, keys = generate_repeats(self.nodes[node]["value"])
+        output = self.output_manager(file_path)
+        hist_png_filename = output.reserve(node)
+        keys, counts = self.value_counts(node)
+        from .report import render_piechart
 
-        plt.title(title)
-        plt.pie(data, labels=keys, colors=palette, autopct="%.0f%%", **kwargs)
-        plt.savefig(hist_png_filename)
+        try:
+            render_piechart(
+                hist_png_filename,
+                counts,
+                keys,
+                title,
+                self.plot_palette,
+                self.plot_style,
+                **kwargs,
+            )
+        except BaseException:
+            output.release(hist_png_filename)
+            raise
         self.last_generated_graphic = hist_png_filename
         print(f"Plot saved in file: {hist_png_filename}")
 
-        plt.figure()
-
-    def generate_report(self, file, skip=[], histogram_bins=10):
+    def generate_report(
+        self,
+        file,
+        skip=[],
+        histogram_bins=10,
+        images=True,
+        workers=1,
+        sensitivity=True,
+        file_path=None,
+    ):
         """
         Generates a Markdown report for the current network. Automatically appends the contents of markdown files with the same name as any of the network's nodes if there are any.
+        The charts of the nodes are rendered before the report is written, optionally by a pool of processes.
 
         Parameters:
             file
@@ -417,9 +2037,116 @@ class RiskProject(nx.DiGraph):
                 A tuple with the names of the nodes generate_report will skip.
             histogram_bins
                 Number of bins in histograms.
+            images
+                If False, no chart is rendered and the report only contains the stats and descriptions of the nodes.
+            workers
+                Number of processes rendering the charts. The default, 1, renders them in this process.
+                None uses the number of CPUs. With the "spawn" start method (the default on macOS and Windows)
+                a pool requires the calling script to be guarded by if __name__ == "__main__".
+            sensitivity
+                If True, the drivers of each goal node are measured (see RiskProject.sensitivity) and reported
+                along with a tornado chart of their rank correlations.
+            file_path
+                Path of the directory where the charts are saved. Defaults to RiskProject.output_directory.
+                The report links them by their path relative to its own directory.
         """
 
-        return skrisk_report(self, file, skip, histogram_bins)
+        from .report import skrisk_report
+
+        return skrisk_report(
+            self,
+            file,
+            skip,
+            histogram_bins,
+            images,
+            workers,
+            file_path=file_path,
+            sensitivity=sensitivity,
+        )
+
+    def save_results(self, directory: str, nodes=None):
+        """
+        Saves the values of the network in a directory: one .npy file per node and a JSON manifest
+        with the structure of the network, RiskProject.seed and RiskProject.nsim (see skrisk.store).
+
+        Parameters:
+            directory
+                Path of the directory (created if it doesn't exist).
+            nodes
+                List with the names of the nodes whose values are saved (usually the goal nodes).
+                Defaults to every node with a value.
+        """
+        return save_results(self, directory, nodes)
+
+    @classmethod
+    def load_results(cls, directory: str, mmap_mode="r"):
+        """
+        Rebuilds a network saved with RiskProject.save_results. Values are memory mapped rather than read,
+        so stats, charts and reports of large runs can be generated again without loading them into memory.
+        Call it on the subclass defining the operations of the network to be able to evaluate it again.
+
+        Parameters:
+            directory
+                Path of the directory.
+            mmap_mode
+                Mode passed to numpy.load. None reads the values into memory.
+        """
+        return load_results(cls, directory, mmap_mode)
 
     def run(self):
         pass
+
+
+def _sample_rows(distribution, rng, shape, **parameters):
+    """Draws one row of uniforms and transforms it with the (broadcast) parameters of every row of shape."""
+    return distribution.ppf(rng.random(shape[-1]), **parameters)
+
+
+def _simulate_worker(project, stream, nsim, targets, chunk_size):
+    """Evaluates the targets of a copy of the project with its own random stream, inside a worker process."""
+    project.rng = default_rng(stream)
+    project._stream_key = tuple(stream.spawn_key)
+    project.nsim = nsim
+    if chunk_size is None:
+        return {goal: project.eval(goal) for goal in targets}
+    project.eval_streaming(targets, chunk_size)
+    return {
+        goal: {key: project.nodes[goal][key] for key in _ACCUMULATORS}
+        for goal in targets
+    }
+
+
+def _scenario_worker(project, fresh, scenarios, options):
+    """Runs a batch of scenarios on a copy of the project, whose up to date values are given by fresh."""
+    project._fresh = fresh
+    return project._scenario_batch(scenarios, *options)
+
+
+def _same(a, b):
+    """Returns True if two override values are equal."""
+    try:
+        return a is b or bool(np.array_equal(a, b))
+    except TypeError:
+        return a == b
+
+
+def _new_accumulators(resolution):
+    """Returns the online accumulators kept for each goal node by the streaming evaluation."""
+    return {
+        "moments": MomentAccumulator(),
+        "sketch": QuantileSketch(),
+        "histogram": StreamingHistogram(resolution),
+        "counts": ValueCounts(),
+    }
+
+
+_ACCUMULATORS = tuple(_new_accumulators(2))
+
+
+def _concatenate(parts):
+    """Concatenates the per-worker values of a node, keeping pandas objects as such."""
+    # pandas is only loaded if the operations of the network use it
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(parts[0], (pd.Series, pd.DataFrame)):
+        return pd.concat(parts, ignore_index=True)
+    return np.concatenate([np.asarray(part) for part in parts])
@@ -0,0 +1,221 @@
+import hashlib
+import marshal
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .distributions import Distribution
+from .expressions import Expression
+
+
+CACHE_VERSION = 1
+
+
+def content_hash(*parts) -> str:
+    """
+    Returns a hex digest identifying the given parts by content. Numbers, strings, sequences, dictionaries
+    and NumPy arrays are hashed by value, any other object by its pickle.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_VERSION).encode())
+    for part in parts:
+        _feed(digest, part)
+    return digest.hexdigest()
+
+
+def _feed(digest, value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, complex, str)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, bytes):
+        digest.update(b"bytes:%d;" % len(value))
+        digest.update(value)
+    elif isinstance(value, (tuple, list)):
+        digest.update(b"seq:%d;" % len(value))
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, dict):
+        digest.update(b"dict:%d;" % len(value))
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, np.ndarray):
+        digest.update(f"array:{value.dtype.str}:{value.shape};".encode())
+        digest.update(np.ascontiguousarray(value).data)
+    else:
+        _feed(digest, pickle.dumps(value, protocol=4))
+
+
+def callable_identity(func):
+    """
+    Returns a hashable description of the operation or distribution of a node: the source of an expression,
+    the class of a registered distribution, or the name and compiled code of a method.
+    """
+    if func is None:
+        return None
+    if isinstance(func, Expression):
+        return ("expression", func.source)
+    if isinstance(func, Distribution):
+        return ("distribution", type(func).__module__, type(func).__qualname__)
+    code = getattr(func, "__code__", None)
+    return (
+        "function",
+        getattr(func, "__qualname__", repr(func)),
+        None if code is None else marshal.dumps(code),
+    )
+
+
+def name_key(names) -> tuple:
+    """
+    Returns a tuple of 32-bit integers derived from a set of node names, used as the spawn key of their random stream.
+
+    Parameters:
+        names
+            Iterable with the names of the nodes.
+    """
+    digest = hashlib.blake2b("\0".join(sorted(names)).encode(), digest_size=16)
+    return tuple(np.frombuffer(digest.digest(), dtype="<u4").tolist())
+
+
+class ResultCache:
+    """
+    On-disk cache of node values keyed by content hash (see RiskProject.node_hash), bounded in size.
+
+    NumPy arrays are saved as .npy files, loaded memory mapped, and any other value (RaggedArray, pandas objects,
+    streaming accumulators...) is pickled. The directory is scanned once, ordering the entries by modification time,
+    which is refreshed on every hit, so the least recently used entries are evicted first when the total size
+    exceeds max_bytes. Entries are written to a temporary file and renamed, so several processes can share a directory.
+
+    Parameters:
+        directory
+            Path of the directory (created if it doesn't exist).
+        max_bytes
+            Maximum total size of the cached files.
+        mmap_mode
+            Mode passed to numpy.load for the cached arrays. None reads them into memory.
+    """
+
+    EXTENSIONS = (".npy", ".pkl")
+
+    def __init__(self, directory: str, max_bytes=2**30, mmap_mode="r"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        found = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                key, extension = os.path.splitext(entry.name)
+                if extension in self.EXTENSIONS:
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, key, entry.path, stat.st_size))
+        for _, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+        self.nbytes = sum(size for _, size in self._entries.values())
+        self._shrink()
+
+    def __repr__(self):
+        return (
+            f"ResultCache({self.directory!r}, {len(self)} entries, {self.nbytes} bytes)"
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: str):
+        """
+        Returns the cached value with the given key, or None if it isn't in the cache.
+
+        Parameters:
+            key
+                Content hash of the value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = entry[0]
+            try:
+                os.utime(path)
+            except FileNotFoundError:  # Evicted by another process
+                self._forget(key)
+                return None
+            self._entries.move_to_end(key)
+        if path.endswith(".npy"):
+            return np.load(path, mmap_mode=self.mmap_mode)
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def put(self, key: str, value):
+        """
+        Saves a value in the cache, evicting the least recently used entries if needed.
+        Values larger than max_bytes are not saved.
+
+        Parameters:
+            key
+                Content hash of the value.
+            value
+                Value to be saved.
+        """
+        array = type(value) is np.ndarray or isinstance(value, np.memmap)
+        extension = ".npy" if array and value.dtype != object else ".pkl"
+        path = os.path.join(self.directory, key + extension)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                if extension == ".npy":
+                    np.save(file, np.ascontiguousarray(value))
+                else:
+                    pickle.dump(value, file, protocol=4)
+            size = os.path.getsize(temporary)
+            if size > self.max_bytes:
+                os.remove(temporary)
+                return
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        with self._lock:
+            previous = self._forget(key)
+            if previous is not None and previous[0] != path:
+                os.remove(previous[0])
+            self._entries[key] = (path, size)
+            self.nbytes += size
+            self._shrink()
+
+    def _shrink(self):
+        """Evicts the least recently used entries until the cache fits in max_bytes."""
+        while self.nbytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+        return entry
+
+    def _evict(self, key):
+        path, _ = self._forget(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
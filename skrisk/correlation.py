@@ -0,0 +1,70 @@
+import numpy as np
+
+
+CORRELATION_METHODS = ("iman-conover", "copula")
+
+
+def correlation_matrix(correlation, size: int):
+    """
+    Returns a validated (size, size) correlation matrix. A single number is taken as the correlation
+    between the two members of a pair.
+
+    Parameters:
+        correlation
+            Correlation matrix, or a number when size is 2.
+        size
+            Number of correlated variables.
+    """
+    matrix = np.asarray(correlation, dtype=float)
+    if matrix.ndim == 0 and size == 2:
+        matrix = np.array([[1.0, matrix], [matrix, 1.0]])
+    if matrix.shape != (size, size):
+        raise ValueError(f"The correlation matrix must have shape ({size}, {size})")
+    if not np.allclose(matrix, matrix.T) or not np.allclose(np.diag(matrix), 1):
+        raise ValueError(
+            "The correlation matrix must be symmetric with a unit diagonal"
+        )
+    np.linalg.cholesky(matrix)
+    return matrix
+
+
+def gaussian_copula(probabilities, matrix):
+    """
+    Correlates in place the rows of a (variables, size) array of probabilities through a Gaussian copula:
+    rows are mapped to normal scores, mixed with the Cholesky factor of the matrix and mapped back.
+    Marginal distributions (and the stratification of each row, approximately) are preserved.
+
+    Parameters:
+        probabilities
+            (variables, size) array of probabilities in (0, 1).
+        matrix
+            (variables, variables) target correlation matrix of the normal scores.
+    """
+    from scipy.special import ndtr, ndtri
+
+    scores = np.linalg.cholesky(matrix) @ ndtri(probabilities)
+    ndtr(scores, out=probabilities)
+    return probabilities
+
+
+def iman_conover(samples, matrix, rng):
+    """
+    Reorders in place the given samples so that their rank correlation approximates the matrix
+    (Iman and Conover, 1982). Marginal samples are left untouched, only their order changes.
+    Correlated normal scores are drawn (corrected for their own sample correlation) and each sample
+    is sorted and written back following the ranks of its scores, one variable at a time.
+
+    Parameters:
+        samples
+            List of writable 1-D arrays of the same size, one per variable.
+        matrix
+            (variables, variables) target correlation matrix.
+        rng
+            numpy.random.Generator used to draw the scores.
+    """
+    scores = rng.standard_normal((len(samples), samples[0].size))
+    observed = np.linalg.cholesky(np.corrcoef(scores))
+    scores = np.linalg.cholesky(matrix) @ np.linalg.solve(observed, scores)
+    for sample, score in zip(samples, scores):
+        sample[np.argsort(score)] = np.sort(sample)
+    return samples
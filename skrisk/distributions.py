@@ -0,0 +1,371 @@
+import numpy as np
+
+
+class Distribution:
+    """
+    Base class of the distributions that random nodes can be drawn from.
+
+    Subclasses list their parameter names (and default values, if any) and implement sample.
+    Distributions that can be sampled by inverse transform also implement ppf (the inverse of the CDF).
+
+    Attributes:
+        params
+            Tuple with the names of the parameters of the distribution.
+        defaults
+            Dictionary with default values for some of the parameters.
+    """
+
+    params = ()
+    defaults = {}
+
+    def sample(self, rng, size, **parameters):
+        """
+        Returns an array of the given size (int or shape) with samples of the distribution.
+
+        Parameters:
+            rng
+                numpy.random.Generator used to draw the samples.
+            size
+                Size or shape of the returned array. Parameters are broadcast against it.
+            **parameters
+                Parameters of the distribution.
+        """
+        raise NotImplementedError
+
+    def ppf(self, u, **parameters):
+        """
+        Returns the quantiles of the distribution for the probabilities in u (inverse transform sampling).
+
+        Parameters:
+            u
+                Array of probabilities, between 0 and 1. Parameters are broadcast against it.
+            **parameters
+                Parameters of the distribution.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support inverse transform sampling"
+        )
+
+    def stack_parameters(self, parameters):
+        """
+        Returns a dictionary with the parameters of several nodes stacked as (nodes, 1) columns.
+
+        Parameters:
+            parameters
+                List with the parameter dictionaries of the nodes.
+        """
+        return {
+            name: np.array(
+                [node.get(name, self.defaults.get(name)) for node in parameters]
+            )[:, None]
+            for name in self.params
+        }
+
+    def sample_batch(self, rng, size, parameters):
+        """
+        Returns a (nodes, size) array with the samples of several nodes drawn in a single call,
+        broadcasting the stacked parameters of the nodes as columns.
+
+        Parameters:
+            rng
+                numpy.random.Generator used to draw the samples.
+            size
+                Number of samples per node.
+            parameters
+                List with the parameter dictionaries of the nodes.
+        """
+        return self.sample(
+            rng, (len(parameters), size), **self.stack_parameters(parameters)
+        )
+
+    def ppf_batch(self, u, parameters):
+        """
+        Returns the quantiles of several nodes for the probabilities in the rows of u,
+        broadcasting the stacked parameters of the nodes as columns.
+
+        Parameters:
+            u
+                (nodes, size) array of probabilities.
+            parameters
+                List with the parameter dictionaries of the nodes.
+        """
+        return self.ppf(u, **self.stack_parameters(parameters))
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class Normal(Distribution):
+    params = ("loc", "scale")
+    defaults = {"loc": 0.0, "scale": 1.0}
+
+    def sample(self, rng, size, loc=0.0, scale=1.0):
+        out = rng.standard_normal(size)
+        out *= scale
+        out += loc
+        return out
+
+    def ppf(self, u, loc=0.0, scale=1.0):
+        from scipy.special import ndtri
+
+        return loc + scale * ndtri(u)
+
+
+class LogNormal(Distribution):
+    params = ("mean", "sigma")
+    defaults = {"mean": 0.0, "sigma": 1.0}
+
+    def sample(self, rng, size, mean=0.0, sigma=1.0):
+        return rng.lognormal(mean, sigma, size)
+
+    def ppf(self, u, mean=0.0, sigma=1.0):
+        from scipy.special import ndtri
+
+        return np.exp(mean + sigma * ndtri(u))
+
+
+class Uniform(Distribution):
+    params = ("low", "high")
+    defaults = {"low": 0.0, "high": 1.0}
+
+    def sample(self, rng, size, low=0.0, high=1.0):
+        out = rng.random(size)
+        out *= np.subtract(high, low)
+        out += low
+        return out
+
+    def ppf(self, u, low=0.0, high=1.0):
+        return low + u * np.subtract(high, low)
+
+
+class Triangular(Distribution):
+    params = ("left", "mode", "right")
+
+    def sample(self, rng, size, left, mode, right):
+        return rng.triangular(left, mode, right, size)
+
+    def ppf(self, u, left, mode, right):
+        width = np.subtract(right, left)
+        cut = np.subtract(mode, left) / width
+        return np.where(
+            u < cut,
+            left + np.sqrt(u * width * np.subtract(mode, left)),
+            right - np.sqrt((1 - u) * width * np.subtract(right, mode)),
+        )
+
+
+class PERT(Distribution):
+    """
+    Beta-PERT distribution between minimum and maximum with the given mode.
+    lamb controls the weight of the mode (4 in the classic PERT).
+    """
+
+    params = ("minimum", "mode", "maximum", "lamb")
+    defaults = {"lamb": 4.0}
+
+    @staticmethod
+    def _shape(minimum, mode, maximum, lamb):
+        width = np.subtract(maximum, minimum)
+        alpha = 1 + lamb * np.subtract(mode, minimum) / width
+        beta = 1 + lamb * np.subtract(maximum, mode) / width
+        return alpha, beta, width
+
+    def sample(self, rng, size, minimum, mode, maximum, lamb=4.0):
+        alpha, beta, width = self._shape(minimum, mode, maximum, lamb)
+        out = rng.beta(alpha, beta, size)
+        out *= width
+        out += minimum
+        return out
+
+    def ppf(self, u, minimum, mode, maximum, lamb=4.0):
+        from scipy.special import betaincinv
+
+        alpha, beta, width = self._shape(minimum, mode, maximum, lamb)
+        return minimum + width * betaincinv(alpha, beta, u)
+
+
+class Beta(Distribution):
+    params = ("a", "b")
+
+    def sample(self, rng, size, a, b):
+        return rng.beta(a, b, size)
+
+    def ppf(self, u, a, b):
+        from scipy.special import betaincinv
+
+        return betaincinv(a, b, u)
+
+
+class Gamma(Distribution):
+    params = ("shape", "scale")
+    defaults = {"scale": 1.0}
+
+    def sample(self, rng, size, shape, scale=1.0):
+        return rng.gamma(shape, scale, size)
+
+    def ppf(self, u, shape, scale=1.0):
+        from scipy.special import gammaincinv
+
+        return scale * gammaincinv(shape, u)
+
+
+class Exponential(Distribution):
+    params = ("scale",)
+    defaults = {"scale": 1.0}
+
+    def sample(self, rng, size, scale=1.0):
+        out = rng.standard_exponential(size)
+        out *= scale
+        return out
+
+    def ppf(self, u, scale=1.0):
+        return -scale * np.log1p(-u)
+
+
+class Binomial(Distribution):
+    params = ("n", "p")
+
+    def sample(self, rng, size, n, p):
+        return rng.binomial(n, p, size)
+
+    def ppf(self, u, n, p):
+        from scipy.stats import binom
+
+        return binom.ppf(u, n, p).astype(np.int64)
+
+
+class Poisson(Distribution):
+    params = ("lam",)
+
+    def sample(self, rng, size, lam):
+        return rng.poisson(lam, size)
+
+    def ppf(self, u, lam):
+        from scipy.stats import poisson
+
+        return poisson.ppf(u, lam).astype(np.int64)
+
+
+class Discrete(Distribution):
+    """
+    Distribution over a finite set of values with the given probabilities (equally likely if omitted).
+    """
+
+    params = ("values", "probabilities")
+    defaults = {"probabilities": None}
+
+    def sample(self, rng, size, values, probabilities=None):
+        return rng.choice(np.asarray(values), size, p=probabilities)
+
+    def ppf(self, u, values, probabilities=None):
+        values = np.asarray(values)
+        if probabilities is None:
+            probabilities = np.full(values.size, 1 / values.size)
+        cdf = np.cumsum(probabilities)
+        return values[
+            np.minimum(np.searchsorted(cdf, u, side="right"), values.size - 1)
+        ]
+
+    def sample_batch(self, rng, size, parameters):
+        return np.stack([self.sample(rng, size, **node) for node in parameters])
+
+    def ppf_batch(self, u, parameters):
+        return np.stack([self.ppf(row, **node) for row, node in zip(u, parameters)])
+
+
+class Empirical(Discrete):
+    """
+    Bootstrap distribution: resamples with replacement the observed data.
+    """
+
+    params = ("data",)
+    defaults = {}
+
+    def sample(self, rng, size, data):
+        return rng.choice(np.asarray(data), size)
+
+    def ppf(self, u, data):
+        return np.quantile(np.asarray(data), u, method="inverted_cdf")
+
+
+DISTRIBUTIONS = {
+    "normal": Normal(),
+    "lognormal": LogNormal(),
+    "uniform": Uniform(),
+    "triangular": Triangular(),
+    "pert": PERT(),
+    "beta": Beta(),
+    "gamma": Gamma(),
+    "exponential": Exponential(),
+    "binomial": Binomial(),
+    "poisson": Poisson(),
+    "discrete": Discrete(),
+    "empirical": Empirical(),
+}
+
+
+SAMPLING_STRATEGIES = ("random", "lhs", "sobol", "halton", "antithetic")
+
+
+def block_sizes(size, blocks):
+    """Returns the sizes of the given number of nearly equal consecutive blocks of size elements."""
+    return [size // blocks + (i < size % blocks) for i in range(blocks)]
+
+
+def uniform_matrix(strategy: str, rng, dims: int, size: int, replicates=8):
+    """
+    Returns a (dims, size) array of probabilities in (0, 1) laid out according to a sampling strategy.
+    Each row drives one random node through the ppf of its distribution.
+
+    Parameters:
+        strategy
+            "random" (plain pseudo-random numbers), "lhs" (Latin hypercube), "sobol" or "halton"
+            (scrambled quasi-Monte Carlo sequences) or "antithetic" (the second half of the columns
+            mirrors the first one, u and 1 - u).
+        rng
+            numpy.random.Generator used to draw (or scramble) the numbers.
+        dims
+            Number of rows (random nodes).
+        size
+            Number of columns (simulations).
+        replicates
+            Number of independent consecutive blocks the columns are split in for the "lhs", "sobol"
+            and "halton" strategies, so that their standard error can be estimated. Sobol points are
+            balanced in sets of a power of two: the first points of each block are drawn as the largest
+            such set, and the rest continue the same sequence. Sizes that are replicates times a power
+            of two get the full benefit of the sequence.
+    """
+    if strategy == "random":
+        return rng.random((dims, size))
+    if strategy == "antithetic":
+        half = rng.random((dims, size // 2))
+        return np.concatenate((half, 1 - half, rng.random((dims, size % 2))), axis=1)
+    if strategy not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {strategy}")
+
+    from scipy.stats import qmc
+
+    sizes = block_sizes(size, min(replicates, size))
+    if strategy == "sobol":
+        blocks = []
+        for block in sizes:
+            engine = qmc.Sobol(dims, seed=rng)
+            head = 1 << (block.bit_length() - 1)
+            blocks += [engine.random(head).T, engine.random(block - head).T]
+    else:
+        engine = {"lhs": qmc.LatinHypercube, "halton": qmc.Halton}[strategy]
+        blocks = [engine(dims, seed=rng).random(block).T for block in sizes]
+    return np.concatenate(blocks, axis=1)
+
+
+def register_distribution(name: str, distribution: Distribution):
+    """
+    Makes a distribution available to the random nodes of every RiskProject under the given name.
+
+    Parameters:
+        name
+            Name used in the distribution argument of RiskProject.add_random.
+        distribution
+            Instance of a Distribution subclass.
+    """
+    DISTRIBUTIONS[name] = distribution
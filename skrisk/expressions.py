@@ -0,0 +1,250 @@
+import ast
+import copy
+import operator
+
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:  # numexpr is optional, expressions fall back to in-place ufuncs
+    numexpr = None
+
+
+BINARY = {
+    ast.Add: (np.add, operator.add),
+    ast.Sub: (np.subtract, operator.sub),
+    ast.Mult: (np.multiply, operator.mul),
+    ast.Div: (np.true_divide, operator.truediv),
+    ast.FloorDiv: (np.floor_divide, operator.floordiv),
+    ast.Mod: (np.remainder, operator.mod),
+    ast.Pow: (np.power, operator.pow),
+    ast.BitAnd: (np.bitwise_and, operator.and_),
+    ast.BitOr: (np.bitwise_or, operator.or_),
+}
+
+UNARY = {
+    ast.USub: (np.negative, operator.neg),
+    ast.UAdd: (np.positive, operator.pos),
+    ast.Invert: (np.invert, operator.invert),
+    ast.Not: (np.logical_not, np.logical_not),
+}
+
+COMPARE = {
+    ast.Lt: (np.less, operator.lt),
+    ast.LtE: (np.less_equal, operator.le),
+    ast.Gt: (np.greater, operator.gt),
+    ast.GtE: (np.greater_equal, operator.ge),
+    ast.Eq: (np.equal, operator.eq),
+    ast.NotEq: (np.not_equal, operator.ne),
+}
+
+BOOLEAN = {ast.And: np.logical_and, ast.Or: np.logical_or}
+
+FUNCTIONS = {
+    "where": np.where,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "clip": np.clip,
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+}
+
+NUMEXPR_FUNCTIONS = {"where", "exp", "log", "sqrt", "abs"}
+
+
+def is_expression(operation):
+    """Returns True if the operation of a node is an expression rather than the name of a RiskProject method."""
+    return not (isinstance(operation, str) and operation.isidentifier())
+
+
+class Expression:
+    """
+    An arithmetic expression over the values of other nodes, usable as the operation of a node.
+
+    Only arithmetic, comparison and boolean operators, numeric constants and the functions in FUNCTIONS are allowed.
+    Expressions over NumPy arrays are evaluated by numexpr when it is installed, or otherwise as a sequence of ufuncs
+    writing into the temporaries of previous steps (out=), so a whole expression allocates about one array.
+    Other values (pandas objects, RaggedArray...) are evaluated with the regular Python operators.
+
+    Parameters:
+        source
+            String with the expression (e.g. "win_contract * (my_bid - project_cost) - bid_cost") or its ast tree.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, str):
+            try:
+                self.tree = ast.parse(source.strip(), mode="eval")
+            except SyntaxError as error:
+                raise ValueError(f"Invalid expression: {source!r}") from error
+        elif isinstance(source, ast.Expression):
+            self.tree = source
+        else:
+            self.tree = ast.Expression(source)
+        self.source = ast.unparse(self.tree)
+        self._numexpr = numexpr is not None
+        for node in ast.walk(self.tree):
+            self._validate(node)
+        self.names = tuple(
+            dict.fromkeys(
+                node.id
+                for node in ast.walk(self.tree)
+                if isinstance(node, ast.Name) and node.id not in FUNCTIONS
+            )
+        )
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+    def _validate(self, node):
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise ValueError(
+                    f"Unsupported function in expression: {ast.unparse(node)}"
+                )
+            if node.keywords:
+                raise ValueError("Keyword arguments are not supported in expressions")
+            self._numexpr &= node.func.id in NUMEXPR_FUNCTIONS
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, bool)):
+                raise ValueError(f"Unsupported constant in expression: {node.value!r}")
+        elif isinstance(node, (ast.BoolOp, ast.FloorDiv, ast.Not, ast.UAdd)):
+            self._numexpr = False
+        elif isinstance(node, ast.Compare) and len(node.ops) > 1:
+            raise ValueError("Chained comparisons are not supported in expressions")
+        elif not isinstance(
+            node,
+            (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Load)
+            + tuple(BINARY)
+            + tuple(UNARY)
+            + tuple(COMPARE)
+            + tuple(BOOLEAN),
+        ):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+    def substitute(self, name: str, other):
+        """
+        Returns a new Expression where the given name is replaced by another expression.
+
+        Parameters:
+            name
+                Name to be replaced.
+            other
+                Expression inserted in place of the name.
+        """
+
+        class Substitute(ast.NodeTransformer):
+            def visit_Name(self, node):
+                if node.id == name:
+                    return copy.deepcopy(other.tree.body)
+                return node
+
+        return Expression(Substitute().visit(copy.deepcopy(self.tree)))
+
+    def rename(self, mapping: dict):
+        """
+        Returns a new Expression with its names replaced according to the mapping.
+
+        Parameters:
+            mapping
+                Dictionary with the old names as keys and the new names as values.
+        """
+
+        class Rename(ast.NodeTransformer):
+            def visit_Name(self, node):
+                return ast.Name(id=mapping.get(node.id, node.id), ctx=node.ctx)
+
+        return Expression(Rename().visit(copy.deepcopy(self.tree)))
+
+    def __call__(self, **values):
+        if all(
+            isinstance(value, np.ndarray) or np.isscalar(value)
+            for value in values.values()
+        ):
+            if self._numexpr:
+                try:
+                    return numexpr.evaluate(self.source, local_dict=values)
+                except Exception:
+                    self._numexpr = False
+            return _evaluate_fused(self.tree.body, values)[0]
+        return _evaluate(self.tree.body, values)
+
+
+def _result_dtype(ufunc, args):
+    """Returns the dtype the ufunc produces for the arguments, evaluating it on a single element."""
+    return ufunc(
+        *[arg.ravel()[:1] if isinstance(arg, np.ndarray) else arg for arg in args]
+    ).dtype
+
+
+def _apply_ufunc(ufunc, args, temporaries):
+    """Applies the ufunc writing into one of the temporary arguments when its shape and dtype match the result."""
+    shape = np.broadcast_shapes(*[np.shape(arg) for arg in args])
+    for arg, temporary in zip(args, temporaries):
+        if temporary and arg.shape == shape and arg.dtype == _result_dtype(ufunc, args):
+            return ufunc(*args, out=arg), True
+    return ufunc(*args), True
+
+
+def _evaluate_fused(node, values):
+    """Evaluates an ast node over arrays, returning the result and whether it is a temporary of this evaluation."""
+    if isinstance(node, ast.Name):
+        return values[node.id], False
+    if isinstance(node, ast.Constant):
+        return node.value, False
+    if isinstance(node, ast.BinOp):
+        ufunc, operands = BINARY[type(node.op)][0], (node.left, node.right)
+    elif isinstance(node, ast.UnaryOp):
+        ufunc, operands = UNARY[type(node.op)][0], (node.operand,)
+    elif isinstance(node, ast.Compare):
+        ufunc, operands = COMPARE[type(node.ops[0])][0], (
+            node.left,
+            node.comparators[0],
+        )
+    elif isinstance(node, ast.BoolOp):
+        ufunc = BOOLEAN[type(node.op)]
+        result, temporary = _evaluate_fused(node.values[0], values)
+        for operand in node.values[1:]:
+            other, other_temporary = _evaluate_fused(operand, values)
+            result, temporary = _apply_ufunc(
+                ufunc, (result, other), (temporary, other_temporary)
+            )
+        return result, temporary
+    else:
+        function = FUNCTIONS[node.func.id]
+        operands = node.args
+        if not isinstance(function, np.ufunc):
+            return (
+                function(*[_evaluate_fused(arg, values)[0] for arg in operands]),
+                True,
+            )
+        ufunc = function
+    evaluated = [_evaluate_fused(operand, values) for operand in operands]
+    args = tuple(np.asarray(arg) if temporary else arg for arg, temporary in evaluated)
+    return _apply_ufunc(ufunc, args, [temporary for _, temporary in evaluated])
+
+
+def _evaluate(node, values):
+    """Evaluates an ast node with the regular Python operators, for values that are not NumPy arrays."""
+    if isinstance(node, ast.Name):
+        return values[node.id]
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.BinOp):
+        return BINARY[type(node.op)][1](
+            _evaluate(node.left, values), _evaluate(node.right, values)
+        )
+    if isinstance(node, ast.UnaryOp):
+        return UNARY[type(node.op)][1](_evaluate(node.operand, values))
+    if isinstance(node, ast.Compare):
+        return COMPARE[type(node.ops[0])][1](
+            _evaluate(node.left, values), _evaluate(node.comparators[0], values)
+        )
+    if isinstance(node, ast.BoolOp):
+        result = _evaluate(node.values[0], values)
+        for operand in node.values[1:]:
+            result = BOOLEAN[type(node.op)](result, _evaluate(operand, values))
+        return result
+    return FUNCTIONS[node.func.id](*[_evaluate(arg, values) for arg in node.args])
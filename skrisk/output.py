@@ -0,0 +1,96 @@
+import os
+import re
+import threading
+from datetime import datetime
+
+
+class OutputManager:
+    """
+    Allocates the file names of the charts saved in a directory.
+
+    The directory is created and scanned once: the highest number of every "<node>_<kind>_<n>.<ext>" file is kept
+    in an index, so each new name is found without probing the filesystem. Names are reserved atomically by creating
+    the file with O_EXCL, so several processes (or threads) writing in the same directory never get the same name.
+
+    Parameters:
+        directory
+            Path of the directory (created if it doesn't exist).
+    """
+
+    PATTERN = re.compile(r"^(?P<stem>.+_[A-Za-z]+)_(?P<number>\d+)\.[^.]+$")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                match = self.PATTERN.match(entry.name)
+                if match:
+                    stem, number = match["stem"], int(match["number"])
+                    self._counters[stem] = max(self._counters.get(stem, 0), number)
+
+    def __repr__(self):
+        return f"OutputManager({self.directory!r})"
+
+    def reserve(self, node: str, kind="histogram", extension="png") -> str:
+        """
+        Returns the path of a new "<node>_<kind>_<n>.<extension>" file, with n one more than the highest one
+        in the directory. The (empty) file is created, so the name can't be taken by anyone else.
+
+        Parameters:
+            node
+                Name of the node.
+            kind
+                Kind of chart.
+            extension
+                Extension of the file.
+        """
+        stem = f"{node}_{kind}"
+        with self._lock:
+            number = self._counters.get(stem, 0)
+            while True:
+                number += 1
+                path = os.path.join(self.directory, f"{stem}_{number}.{extension}")
+                try:
+                    os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                except FileExistsError:  # Written by someone else since the scan
+                    continue
+                self._counters[stem] = number
+                return path
+
+    @staticmethod
+    def release(path: str):
+        """
+        Removes a reserved file that is still empty, e.g. because rendering its chart failed.
+
+        Parameters:
+            path
+                Path returned by OutputManager.reserve.
+        """
+        try:
+            if os.path.getsize(path) == 0:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def new_run(self, name=None):
+        """
+        Creates a subdirectory for the outputs of a run and returns its OutputManager.
+
+        Parameters:
+            name
+                Name of the subdirectory. Defaults to the current date and time.
+                A numeric suffix is added if the directory already exists.
+        """
+        name = name or datetime.now().strftime("run_%Y%m%d_%H%M%S")
+        path, suffix = os.path.join(self.directory, name), 1
+        while True:
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                suffix += 1
+                path = os.path.join(self.directory, f"{name}_{suffix}")
+                continue
+            return OutputManager(path)
@@ -0,0 +1,227 @@
+import networkx as nx
+import numpy as np
+
+from .expressions import Expression, is_expression
+
+
+class PlanStep:
+    """
+    A single node of a compiled evaluation plan.
+
+    Attributes:
+        name
+            Name of the node.
+        kind
+            The node_type of the node ("input", "random", "operation", "goal"...).
+        func
+            Bound method or Expression used to evaluate the node, or the Distribution of a random node
+            (None for input nodes and nodes without an operation).
+        args
+            Tuple of (predecessor, parameter name) pairs used to build the call arguments.
+        id
+            Position of the node in the topological order of the plan, used to index value tables.
+        attrs
+            Attribute dictionary of the node in the project.
+        inputs
+            Tuple of (predecessor id, parameter name) pairs, the integer form of args.
+    """
+
+    __slots__ = ("name", "kind", "func", "args", "id", "attrs", "inputs")
+
+    def __init__(self, name, kind, func, args, id=None, attrs=None):
+        self.name = name
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.id = id
+        self.attrs = attrs
+        self.inputs = ()
+
+    def __repr__(self):
+        return f"PlanStep({self.name!r}, {self.kind!r})"
+
+
+class EvaluationPlan:
+    """
+    A topological ordering of a RiskProject with every node's callable and argument map resolved.
+
+    The plan is built once and reused by every evaluation until the structure of the project changes,
+    so that each node is visited exactly once per run.
+    Expression nodes added with fuse=True are inlined into their only successor when it is an expression
+    too, so a chain of them is evaluated as a single kernel without storing the intermediate values.
+
+    Besides the steps by name, the plan keeps a compact integer form of the network that evaluation runs on:
+    node ids follow the topological order, by_id holds the PlanStep of each id, indptr/indices the predecessor
+    ids in CSR layout (those of node i are indices[indptr[i]:indptr[i + 1]]), which the cone and pruning passes
+    run on, and value tables are plain lists indexed by id (see EvaluationPlan.table).
+
+    Parameters:
+        project
+            RiskProject (or any nx.DiGraph with the same node attributes) to compile.
+    """
+
+    def __init__(self, project):
+        self.order = list(nx.topological_sort(project))
+        self.index = {node: i for i, node in enumerate(self.order)}
+        self.steps = {node: self._compile_step(project, node) for node in self.order}
+        self.successors = {node: tuple(project.successors(node)) for node in self.order}
+        for node in self.order:
+            for pred, param in self.steps[node].args:
+                if project.nodes[pred].get("fuse"):
+                    self._fuse(node, pred, param)
+
+        self.by_id = [self.steps[node] for node in self.order]
+        for i, step in enumerate(self.by_id):
+            step.id = i
+            step.inputs = tuple((self.index[pred], param) for pred, param in step.args)
+        self.indptr = np.zeros(len(self.by_id) + 1, dtype=np.int64)
+        np.cumsum([len(step.inputs) for step in self.by_id], out=self.indptr[1:])
+        self.indices = np.array(
+            [pred for step in self.by_id for pred, _ in step.inputs], dtype=np.int64
+        )
+        self._cones = {}
+        self._releases = {}
+        self._downstream = {}
+
+    @staticmethod
+    def _compile_step(project, node):
+        attrs = project.nodes[node]
+        kind = attrs["node_type"]
+        if kind == "input":
+            return PlanStep(node, kind, None, (), attrs=attrs)
+        if kind == "random":
+            func = project._resolve_distribution(attrs["distribution"])
+            return PlanStep(node, kind, func, (), attrs=attrs)
+        args = tuple(
+            (pred, project.get_edge_data(pred, node).get("param") or pred)
+            for pred in project.predecessors(node)
+        )
+        operation = attrs.get("operation")
+        if operation is None:
+            func = None
+        elif is_expression(operation):
+            func = Expression(operation)
+        else:
+            func = getattr(project, operation)
+        return PlanStep(node, kind, func, args, attrs=attrs)
+
+    def _fuse(self, node, pred, param):
+        """Inlines the expression of pred into the expression of node, if both are expressions and pred has no other successor."""
+        step, inner = self.steps[node], self.steps[pred]
+        if not isinstance(step.func, Expression) or not isinstance(
+            inner.func, Expression
+        ):
+            return
+        if self.successors[pred] != (node,):
+            return
+        args = {name: source for source, name in step.args if source != pred}
+        for source, _ in inner.args:
+            if args.setdefault(source, source) != source:
+                return
+        renamed = inner.func.rename({name: source for source, name in inner.args})
+        step.func = step.func.substitute(param, renamed)
+        step.args = tuple((source, name) for name, source in args.items())
+
+    def table(self):
+        """Returns an empty value table: a list with a slot for the value of each node id."""
+        return [None] * len(self.by_id)
+
+    def cone(self, targets):
+        """
+        Returns the steps needed to evaluate the target node(s), in topological order.
+        The needed nodes are marked by a breadth-first pass over the predecessor arrays.
+
+        Parameters:
+            targets
+                Name of a node, or a tuple with the names of several nodes.
+        """
+        key = targets if isinstance(targets, tuple) else (targets,)
+        if key not in self._cones:
+            needed = self._mark([self.index[node] for node in key])
+            self._cones[key] = [self.by_id[i] for i in np.flatnonzero(needed)]
+        return self._cones[key]
+
+    def _mark(self, ids, available=()):
+        """
+        Returns a boolean array marking the given ids and everything upstream of them, not going past
+        the available ids. Each pass gathers the predecessors of a whole frontier from the CSR arrays.
+        """
+        needed = np.zeros(len(self.by_id), dtype=bool)
+        blocked = np.zeros(len(self.by_id), dtype=bool)
+        blocked[list(available)] = True
+        frontier = np.unique(np.asarray(ids, dtype=np.int64))
+        needed[frontier] = True
+        while frontier.size:
+            frontier = frontier[~blocked[frontier]]
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            preds = self.indices[offsets + np.arange(offsets.size)]
+            frontier = np.unique(preds[~needed[preds]])
+            needed[frontier] = True
+        return needed
+
+    def releases(self, targets):
+        """
+        Returns a list aligned with the cone of the target node(s) holding, for each step, the steps whose
+        last consumer is that step, so that their values can be released once it has been evaluated.
+        Targets and input nodes are never released.
+
+        Parameters:
+            targets
+                Name of a node, or a tuple with the names of several nodes.
+        """
+        key = targets if isinstance(targets, tuple) else (targets,)
+        if key not in self._releases:
+            self._releases[key] = self._last_uses(self.cone(key), key)
+        return self._releases[key]
+
+    def _last_uses(self, steps, key, available=()):
+        last_use = {}
+        for i, step in enumerate(steps):
+            if step.id not in available:
+                for pred, _ in step.inputs:
+                    last_use[pred] = i
+        release = [[] for _ in steps]
+        for pred, i in last_use.items():
+            step = self.by_id[pred]
+            if step.name not in key and step.kind != "input":
+                release[i].append(step)
+        return release
+
+    def prune(self, targets, available):
+        """
+        Returns the steps needed to evaluate the target node(s) when some nodes already have a value,
+        so their own inputs are not needed, along with their releases (see EvaluationPlan.releases).
+        Unlike the cone, the pruned steps are not cached.
+
+        Parameters:
+            targets
+                Name of a node, or a tuple with the names of several nodes.
+            available
+                Set with the ids of the nodes whose value is available.
+        """
+        key = targets if isinstance(targets, tuple) else (targets,)
+        cone = self.cone(key)
+        needed = self._mark([self.index[node] for node in key], available)
+        steps = [step for step in cone if needed[step.id]]
+        return steps, self._last_uses(steps, key, available)
+
+    def downstream(self, node):
+        """
+        Returns a frozenset with the node and every node that depends on it, directly or indirectly.
+
+        Parameters:
+            node
+                Name of the node.
+        """
+        if node not in self._downstream:
+            reached = {node}
+            stack = [node]
+            while stack:
+                for succ in self.successors[stack.pop()]:
+                    if succ not in reached:
+                        reached.add(succ)
+                        stack.append(succ)
+            self._downstream[node] = frozenset(reached)
+        return self._downstream[node]
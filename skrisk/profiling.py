@@ -0,0 +1,96 @@
+from time import perf_counter
+
+from .utils import nbytes
+
+
+class Profiler:
+    """
+    Records, for each node, how many times it is evaluated, the wall time spent on it (split into the time
+    spent drawing random numbers through RiskProject.sample and the rest of the operation code)
+    and the bytes of the values it produced.
+
+    The time of random nodes drawn together in a single batch is split evenly among them.
+    Random numbers drawn directly from RiskProject.rng inside operations count as operation time.
+
+    Parameters:
+        callback
+            Function called with a dictionary (node, kind, wall_time, rng_time, bytes) after each evaluation
+            of a node, e.g. to export the measures to a monitoring system.
+    """
+
+    COLUMNS = ("evaluations", "wall_time", "rng_time", "operation_time", "bytes")
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.records = {}
+        self.current = None
+        self._rng_time = 0.0
+
+    def _record(self, node, kind, wall_time, rng_time, value):
+        record = self.records.setdefault(node, dict.fromkeys(self.COLUMNS, 0))
+        size = nbytes(value)
+        record["evaluations"] += 1
+        record["wall_time"] += wall_time
+        record["rng_time"] += rng_time
+        record["operation_time"] += wall_time - rng_time
+        record["bytes"] += size
+        if self.callback is not None:
+            self.callback(
+                {
+                    "node": node,
+                    "kind": kind,
+                    "wall_time": wall_time,
+                    "rng_time": rng_time,
+                    "bytes": size,
+                }
+            )
+
+    def call(self, node, func, kwargs):
+        """Evaluates the operation of a node, recording it."""
+        self.current, self._rng_time = node, 0.0
+        start = perf_counter()
+        try:
+            value = func(**kwargs)
+        finally:
+            self.current = None
+        self._record(node, "operation", perf_counter() - start, self._rng_time, value)
+        return value
+
+    async def call_async(self, node, func, kwargs):
+        """Awaits the coroutine operation of a node, recording it."""
+        self.current, self._rng_time = node, 0.0
+        start = perf_counter()
+        try:
+            value = await func(**kwargs)
+        finally:
+            self.current = None
+        self._record(node, "operation", perf_counter() - start, self._rng_time, value)
+        return value
+
+    def draw(self, sample, steps):
+        """Draws the given random plan steps with the sample function, recording them."""
+        start = perf_counter()
+        values = sample(steps)
+        elapsed = (perf_counter() - start) / max(len(values), 1)
+        for node, value in values.items():
+            self._record(node, "random", elapsed, elapsed, value)
+        return values
+
+    def rng(self, sample, *args, **kwargs):
+        """Calls a sampling function, adding its time to the RNG time of the node being evaluated."""
+        start = perf_counter()
+        try:
+            return sample(*args, **kwargs)
+        finally:
+            if self.current is not None:
+                self._rng_time += perf_counter() - start
+
+    def table(self):
+        """Returns a DataFrame with the records of every node, slowest first."""
+        import pandas as pd
+
+        table = pd.DataFrame.from_dict(
+            self.records, orient="index", columns=list(self.COLUMNS)
+        )
+        table.index.name = "node"
+        return table.sort_values("wall_time", ascending=False)
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class RaggedArray:
+    """
+    A variable number of values for each simulation, stored as one flat array plus segment offsets.
+
+    The values of simulation i are values[offsets[i]:offsets[i + 1]]. Reductions per simulation run
+    as a single ufunc.reduceat call, and arithmetic with scalars or with per-simulation arrays
+    (broadcast to every value of their segment) is applied to the flat array at once.
+    Converting a RaggedArray to a NumPy array returns its flat values.
+
+    Parameters:
+        values
+            Flat array with the values of every simulation, one segment after the other.
+        counts
+            Number of values of each simulation. Reductions return arrays with the shape of counts
+            (e.g. (points, simulations) for the nodes downstream of an input swept by RiskProject.sweep).
+    """
+
+    # Makes NumPy arrays defer their arithmetic operators to the reflected ones of RaggedArray
+    __array_priority__ = 1000
+
+    def __init__(self, values, counts):
+        self.values = np.asarray(values)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.offsets = np.zeros(self.counts.size + 1, dtype=np.int64)
+        np.cumsum(self.counts.ravel(), out=self.offsets[1:])
+        if self.offsets[-1] != self.values.size:
+            raise ValueError("The counts do not add up to the number of values")
+
+    def __len__(self):
+        return self.counts.size
+
+    def __repr__(self):
+        return f"RaggedArray({len(self)} segments, {self.values.size} values)"
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.counts.nbytes + self.offsets.nbytes
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def expand(self, per_segment):
+        """
+        Returns a flat array repeating each per-simulation value once for every value of its segment.
+
+        Parameters:
+            per_segment
+                Array with one value per simulation, broadcastable to the shape of the counts.
+        """
+        return np.repeat(
+            np.broadcast_to(per_segment, self.counts.shape).ravel(), self.counts.ravel()
+        )
+
+    def reduce(self, ufunc, empty):
+        """
+        Returns an array with the reduction of each segment by a binary NumPy ufunc (e.g. np.minimum).
+
+        Parameters:
+            ufunc
+                Binary ufunc used for the reduction.
+            empty
+                Value returned for the simulations without values.
+        """
+        nonempty = self.counts > 0
+        result = ufunc.reduceat(self.values, self.offsets[:-1][nonempty.ravel()])
+        out = np.full(self.counts.shape, empty, dtype=np.result_type(result, empty))
+        out[nonempty] = result
+        return out
+
+    def min(self, empty=np.inf):
+        return self.reduce(np.minimum, empty)
+
+    def max(self, empty=-np.inf):
+        return self.reduce(np.maximum, empty)
+
+    def sum(self, empty=0):
+        return self.reduce(np.add, empty)
+
+    def any(self):
+        return self.reduce(np.logical_or, False)
+
+    def all(self):
+        return self.reduce(np.logical_and, True)
+
+    def mean(self, empty=np.nan):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.counts > 0, self.sum() / self.counts, empty)
+
+    def _apply(self, ufunc, other, reflected=False):
+        if isinstance(other, RaggedArray):
+            other = other.values
+        elif np.ndim(other) and np.shape(other)[-1:] == self.counts.shape[-1:]:
+            other = self.expand(other)
+        args = (other, self.values) if reflected else (self.values, other)
+        return RaggedArray(ufunc(*args), self.counts)
+
+    def __add__(self, other):
+        return self._apply(np.add, other)
+
+    def __radd__(self, other):
+        return self._apply(np.add, other, True)
+
+    def __sub__(self, other):
+        return self._apply(np.subtract, other)
+
+    def __rsub__(self, other):
+        return self._apply(np.subtract, other, True)
+
+    def __mul__(self, other):
+        return self._apply(np.multiply, other)
+
+    def __rmul__(self, other):
+        return self._apply(np.multiply, other, True)
+
+    def __truediv__(self, other):
+        return self._apply(np.true_divide, other)
+
+    def __rtruediv__(self, other):
+        return self._apply(np.true_divide, other, True)
+
+    def __neg__(self):
+        return RaggedArray(-self.values, self.counts)
+
+    def __lt__(self, other):
+        return self._apply(np.less, other)
+
+    def __le__(self, other):
+        return self._apply(np.less_equal, other)
+
+    def __gt__(self, other):
+        return self._apply(np.greater, other)
+
+    def __ge__(self, other):
+        return self._apply(np.greater_equal, other)
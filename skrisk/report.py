@@ -1,56 +1,281 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import seaborn as sns
 import snakemd
+from matplotlib.figure import Figure
+
+from .utils import DEFAULT_PLOT_PALETTE, DEFAULT_PLOT_STYLE, node_title
+
+
+def render_histogram(
+    file: str, counts, edges, title="", palette=None, style=None, **kwargs
+):
+    """
+    Saves a histogram, given its bin counts and edges, in a PNG file. The chart is drawn on its own
+    matplotlib Figure (Agg canvas, no pyplot global state), so several charts can be rendered concurrently.
+
+    Parameters:
+        file
+            Path of the PNG file.
+        counts
+            Number of observations in each bin.
+        edges
+            Edges of the bins (one more than counts).
+        title
+            Title for the histogram.
+        palette
+            List of colors used by seaborn.
+        style
+            Name of the seaborn style.
+        **kwargs
+            Miscellaneous arguments for the seaborn.histplot() function.
+    """
+    with sns.axes_style(style), sns.color_palette(palette):
+        figure = Figure()
+        try:
+            sns.histplot(
+                x=edges[:-1],
+                weights=counts,
+                bins=list(edges),
+                ax=figure.subplots(),
+                **kwargs,
+            ).set(title=title)
+            figure.savefig(file)
+        finally:
+            figure.clear()
+    return file
+
+
+def render_piechart(
+    file: str, counts, keys, title="", palette=None, style=None, **kwargs
+):
+    """
+    Saves a pie chart with the given counts of each key in a PNG file (see render_histogram).
+
+    Parameters:
+        file
+            Path of the PNG file.
+        counts
+            Number of observations of each key.
+        keys
+            Labels of the slices.
+        title
+            Title for the pie chart.
+        palette
+            List of colors used by seaborn.
+        style
+            Name of the seaborn style.
+        **kwargs
+            Miscellaneous arguments for the matplotlib pie() function.
+    """
+    with sns.axes_style(style):
+        figure = Figure()
+        try:
+            axes = figure.subplots()
+            axes.set_title(title)
+            axes.pie(
+                counts,
+                labels=keys,
+                colors=sns.color_palette(palette),
+                autopct="%.0f%%",
+                **kwargs,
+            )
+            figure.savefig(file)
+        finally:
+            figure.clear()
+    return file
+
 
-from .utils import node_title
+def render_tornado(
+    file: str,
+    labels,
+    values,
+    title="",
+    palette=None,
+    style=None,
+    xlabel="Rank correlation",
+    **kwargs,
+):
+    """
+    Saves a tornado chart, with a horizontal bar for each driver of a node, in a PNG file (see render_histogram).
+    The largest absolute values are drawn on top, positive and negative ones with the first two colors of the palette.
 
+    Parameters:
+        file
+            Path of the PNG file.
+        labels
+            Names of the drivers.
+        values
+            Sensitivity of the node to each driver (e.g. rank correlations, between -1 and 1).
+        title
+            Title for the tornado chart.
+        palette
+            List of colors used by seaborn.
+        style
+            Name of the seaborn style.
+        xlabel
+            Label of the horizontal axis.
+        **kwargs
+            Miscellaneous arguments for the matplotlib barh() function.
+    """
+    order = np.argsort(np.abs(values))
+    colors = sns.color_palette(palette)
+    with sns.axes_style(style):
+        figure = Figure()
+        try:
+            axes = figure.subplots()
+            axes.barh(
+                [labels[i] for i in order],
+                [values[i] for i in order],
+                color=[colors[0] if values[i] >= 0 else colors[1] for i in order],
+                **kwargs,
+            )
+            axes.axvline(0, color="black", linewidth=0.8)
+            axes.set_xlim(-1, 1)
+            axes.set(title=title, xlabel=xlabel)
+            figure.tight_layout()
+            figure.savefig(file)
+        finally:
+            figure.clear()
+    return file
 
-DEFAULT_PLOT_PALETTE = [
-    "#30a2da",
-    "#fc4f30",
-    "#e5ae38",
-    "#6d904f",
-    "#8b8b8b",
-]
 
-DEFAULT_PLOT_STYLE = "darkgrid"
+RENDERERS = {
+    "histogram": render_histogram,
+    "pie": render_piechart,
+    "tornado": render_tornado,
+}
 
 
-def skrisk_report(risk_project, file: str, skip: list, histogram_bins: int):
+def _render(job):
+    graphtype, file, data, kwargs = job
+    return RENDERERS[graphtype](file, *data, **kwargs)
+
+
+def _image(chart, directory):
+    """Returns an inline image linking a chart by its path relative to the directory of the report."""
+    url = os.path.relpath(chart, directory).replace(os.sep, "/")
+    return snakemd.InlineText("", url=url, image=True)
+
+
+def skrisk_report(
+    risk_project,
+    file: str,
+    skip: list,
+    histogram_bins: int,
+    images=True,
+    workers=1,
+    file_path=None,
+    sensitivity=True,
+):
+    nodes = [
+        node
+        for node in risk_project.nodes()
+        if node not in skip and risk_project.nodes[node]["node_type"] != "input"
+    ]
+
+    drivers = {}
+    if sensitivity:
+        for node in nodes:
+            attrs = risk_project.nodes[node]
+            if attrs["node_type"] != "goal":
+                continue
+            try:
+                table = risk_project.sensitivity(node)
+            except ValueError:  # No samples of the goal and its drivers from one run
+                continue
+            if len(table):
+                drivers[node] = table
+
+    charts = {}
+    tornados = {}
+    if images:
+        output = risk_project.output_manager(file_path)
+        jobs = []
+        for node in nodes:
+            attrs = risk_project.nodes[node]
+            if attrs["graphtype"] not in RENDERERS:
+                continue
+            if attrs["value"] is None and attrs.get("histogram") is None:
+                continue
+            kwargs = {
+                "title": node_title(node),
+                "palette": risk_project.plot_palette,
+                "style": risk_project.plot_style,
+            }
+            # Only the bin counts are sent to the workers, never the samples
+            if attrs["graphtype"] == "histogram":
+                data = risk_project.histogram(node, histogram_bins)
+                kwargs.update(legend=True)
+            else:
+                data = risk_project.value_counts(node)[::-1]
+            charts[node] = output.reserve(node)
+            jobs.append((attrs["graphtype"], charts[node], data, kwargs))
+        for node, table in drivers.items():
+            labels = [node_title(driver) for driver in table.index]
+            tornados[node] = output.reserve(node, kind="tornado")
+            kwargs = {
+                "title": f"{node_title(node)} Sensitivity",
+                "palette": risk_project.plot_palette,
+                "style": risk_project.plot_style,
+            }
+            data = (labels, table["rank_correlation"].tolist())
+            jobs.append(("tornado", tornados[node], data, kwargs))
+        try:
+            if workers == 1 or len(jobs) < 2:
+                rendered = list(map(_render, jobs))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    rendered = list(executor.map(_render, jobs))
+        except BaseException:
+            for _, chart, _, _ in jobs:
+                output.release(chart)
+            raise
+        for chart in rendered:
+            print(f"Plot saved in file: {chart}")
+            risk_project.last_generated_graphic = chart
+
     report = snakemd.new_doc(file)
-    for node in risk_project.nodes():
-        if node not in skip and risk_project.nodes[node]["node_type"] != "input":
-            report.add_header(node_title(node))
-            if os.path.exists("./" + node + ".md"):
-                node_info = open(node + ".md", "r")
+    report_directory = os.path.dirname(os.path.abspath(file))
+    for node in nodes:
+        report.add_header(node_title(node))
+        if os.path.exists("./" + node + ".md"):
+            with open(node + ".md", "r") as node_info:
                 report.add_paragraph(node_info.read())
 
-            if risk_project.nodes[node]["graphtype"] == "histogram":
-                risk_project.generate_histogram(
-                    node,
-                    title=node_title(node),
-                    file_path="./",
-                    bins=histogram_bins,
-                    legend=True,
-                )
-            elif risk_project.nodes[node]["graphtype"] == "pie":
-                risk_project.generate_piechart(
-                    node, title=node_title(node), file_path="./"
-                )
-
-            print(risk_project.last_generated_graphic)
-            img = [
-                snakemd.InlineText(
-                    "", url=risk_project.last_generated_graphic, image=True
-                )
-            ]
+        if node in charts:
+            img = [_image(charts[node], report_directory)]
             report.add_element(snakemd.Paragraph(img))
 
-            if risk_project.nodes[node]["stats"] is not None:
-                report.add_table(
-                    ["Stats", "Values"],
-                    [[i, j] for i, j in risk_project.nodes[node]["stats"].items()],
-                )
+        stats = {
+            **(risk_project.nodes[node]["stats"] or {}),
+            **risk_project.nodes[node].get("metrics", {}),
+        }
+        if stats:
+            report.add_table(
+                ["Stats", "Values"],
+                [[i, j] for i, j in stats.items()],
+            )
+
+        if node in drivers:
+            if node in tornados:
+                img = [_image(tornados[node], report_directory)]
+                report.add_element(snakemd.Paragraph(img))
+            report.add_table(
+                ["Driver", "Rank correlation", "SRC", "Contribution to variance"],
+                [
+                    [
+                        driver,
+                        f"{row.rank_correlation:.3f}",
+                        f"{row.src:.3f}",
+                        f"{row.contribution_to_variance:.1%}",
+                    ]
+                    for driver, row in drivers[node].iterrows()
+                ],
+            )
 
-            report.add_paragraph(risk_project.nodes[node]["description"])
+        report.add_paragraph(risk_project.nodes[node]["description"])
     report.output_page()
     return report
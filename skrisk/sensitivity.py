@@ -0,0 +1,58 @@
+import numpy as np
+
+
+def _standardize(rows):
+    """Returns the rows of a matrix centered and scaled to unit variance (rows with no variance become zeros)."""
+    centered = rows - rows.mean(axis=-1, keepdims=True)
+    std = centered.std(axis=-1, keepdims=True)
+    return np.divide(centered, std, out=np.zeros_like(centered), where=std > 0)
+
+
+def sensitivity(samples, output):
+    """
+    Returns the sensitivity of an output to each row of a (drivers x simulations) sample matrix,
+    computed with a few matrix operations over the whole stack:
+
+    - rank_correlation: Spearman rank correlation of each driver with the output.
+    - src: standardized regression coefficient of each driver in a linear regression of the output
+      on every driver at once (in standard deviations of the output per standard deviation of the driver).
+    - contribution_to_variance: squared rank correlation of each driver, normalized to add up to 1.
+    - r_squared: coefficient of determination of the regression, telling how well the SRCs describe the output.
+
+    Parameters:
+        samples
+            (drivers, simulations) array with the values of each driver in every simulation.
+        output
+            Array with the values of the output in every simulation.
+    """
+    from scipy.stats import rankdata
+
+    output = np.asarray(output, dtype=float).ravel()
+    nsim = output.size
+    if not len(samples):
+        raise ValueError("At least one driver is needed to measure the sensitivity")
+    samples = np.atleast_2d(np.asarray(samples, dtype=float))
+    if samples.shape[1] != nsim:
+        raise ValueError(
+            f"The drivers have {samples.shape[1]} simulations and the output {nsim}"
+        )
+
+    ranks = _standardize(rankdata(np.vstack((samples, output)), axis=1))
+    rank_correlation = ranks[:-1] @ ranks[-1] / nsim
+
+    z_samples, z_output = _standardize(samples), _standardize(output)
+    src, *_ = np.linalg.lstsq(z_samples.T, z_output, rcond=None)
+    residuals = z_output - src @ z_samples
+    r_squared = 1 - residuals @ residuals / max(
+        z_output @ z_output, np.finfo(float).tiny
+    )
+
+    squares = rank_correlation**2
+    total = squares.sum()
+    contribution = squares / total if total > 0 else squares
+    return {
+        "rank_correlation": rank_correlation,
+        "src": src,
+        "contribution_to_variance": contribution,
+        "r_squared": float(r_squared),
+    }
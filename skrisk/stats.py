@@ -0,0 +1,475 @@
+import math
+
+import numpy as np
+
+
+BLOCK_SIZE = 1 << 16
+
+
+class MomentAccumulator:
+    """
+    Accumulates count, extremes and the first four central moments of a stream of chunks.
+
+    Chunks are combined with the pairwise update formulas of Chan et al. and Pébay, so two
+    accumulators filled independently (e.g. by different workers) can be merged exactly.
+    Large chunks are processed in cache-sized blocks, so each update reads the data from memory once.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """
+        Adds a chunk of observations to the accumulator.
+
+        Parameters:
+            values
+                Array-like with the observations of the chunk.
+        """
+        x = np.asarray(values, dtype=float).ravel()
+        for start in range(0, x.size, BLOCK_SIZE):
+            self._update_block(x[start : start + BLOCK_SIZE])
+        return self
+
+    def _update_block(self, x):
+        other = MomentAccumulator()
+        other.n = x.size
+        other.mean = x.mean()
+        d = x - other.mean
+        d2 = d * d
+        other.m2 = d2.sum()
+        other.m3 = (d2 * d).sum()
+        other.m4 = (d2 * d2).sum()
+        other.min = x.min()
+        other.max = x.max()
+        return self.merge(other)
+
+    def merge(self, other):
+        """
+        Combines the observations of another MomentAccumulator into this one.
+
+        Parameters:
+            other
+                MomentAccumulator to be merged.
+        """
+        na, nb = self.n, other.n
+        if not nb:
+            return self
+        if not na:
+            self.__dict__.update(other.__dict__)
+            return self
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+        m3 = (
+            self.m3
+            + other.m3
+            + delta * delta_n**2 * na * nb * (na - nb)
+            + 3 * delta_n * (na * other.m2 - nb * self.m2)
+        )
+        m4 = (
+            self.m4
+            + other.m4
+            + delta * delta_n**3 * na * nb * (na * na - na * nb + nb * nb)
+            + 6 * delta_n**2 * (na * na * other.m2 + nb * nb * self.m2)
+            + 4 * delta_n * (na * other.m3 - nb * self.m3)
+        )
+        self.mean += delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def result(self):
+        """
+        Returns a dictionary with the mean, max, min, std, skew and kurt of the accumulated observations,
+        using the same (biased, Fisher) definitions as RiskProject.generate_stats.
+        """
+        n = self.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = self.m2 / n if n else np.nan
+            skew = math.sqrt(n) * self.m3 / self.m2**1.5 if self.m2 else np.nan
+            kurt = n * self.m4 / self.m2**2 - 3 if self.m2 else np.nan
+        return {
+            "mean": self.mean if n else np.nan,
+            "max": self.max,
+            "min": self.min,
+            "std": math.sqrt(variance),
+            "skew": skew,
+            "kurt": kurt,
+        }
+
+
+class StreamingHistogram:
+    """
+    Histogram of a stream of chunks on a fixed number of fine bins whose range grows as needed.
+
+    Bin widths are powers of two and bin edges are multiples of the width, so widening the range
+    (or merging two histograms) only adds up neighbouring bins and never redistributes counts.
+    Non-finite observations are counted apart in the nonfinite attribute.
+
+    Parameters:
+        resolution
+            Number of fine bins kept by the histogram.
+    """
+
+    def __init__(self, resolution=2048):
+        self.resolution = resolution
+        self.counts = np.zeros(resolution, dtype=np.int64)
+        self.lo = 0.0
+        self.width = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.nonfinite = 0
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def edges(self):
+        return self.lo + self.width * np.arange(self.resolution + 1)
+
+    def _fit(self, lo, hi, width):
+        """Returns the smallest (lo, width) grid, with width >= the given one, covering [lo, hi]."""
+        if not width:
+            span = hi - lo or max(abs(lo), 1.0)
+            width = 2.0 ** math.ceil(math.log2(span / (self.resolution - 1)))
+        while math.floor(lo / width) * width + self.resolution * width <= hi:
+            width *= 2
+        return math.floor(lo / width) * width, width
+
+    def _rebin(self, counts, lo, width, new_lo, new_width):
+        """Maps counts laid on the (lo, width) grid onto the coarser (new_lo, new_width) grid."""
+        offset = round((lo - new_lo) / width)
+        ratio = round(new_width / width)
+        index = (offset + np.arange(counts.size)) // ratio
+        keep = counts > 0
+        return np.bincount(
+            index[keep], weights=counts[keep], minlength=self.resolution
+        )[: self.resolution].astype(np.int64)
+
+    def _extend(self, lo, hi, width=0.0):
+        width = max(width, self.width)
+        new_lo, new_width = self._fit(min(lo, self.min), max(hi, self.max), width)
+        if self.total and (new_lo, new_width) != (self.lo, self.width):
+            self.counts = self._rebin(
+                self.counts, self.lo, self.width, new_lo, new_width
+            )
+        self.lo, self.width = new_lo, new_width
+
+    def update(self, values):
+        """
+        Adds a chunk of observations to the histogram.
+
+        Parameters:
+            values
+                Array-like with the observations of the chunk.
+        """
+        x = np.asarray(values, dtype=float).ravel()
+        finite = np.isfinite(x)
+        if not finite.all():
+            self.nonfinite += int(x.size - finite.sum())
+            x = x[finite]
+        if not x.size:
+            return self
+        lo, hi = x.min(), x.max()
+        self._extend(lo, hi)
+        index = ((x - self.lo) // self.width).astype(np.int64)
+        np.clip(index, 0, self.resolution - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.resolution)
+        self.min, self.max = min(self.min, lo), max(self.max, hi)
+        return self
+
+    def merge(self, other):
+        """
+        Combines the counts of another StreamingHistogram with the same resolution into this one.
+
+        Parameters:
+            other
+                StreamingHistogram to be merged.
+        """
+        self.nonfinite += other.nonfinite
+        if not other.total:
+            return self
+        self._extend(other.min, other.max, other.width)
+        self.counts += self._rebin(
+            other.counts, other.lo, other.width, self.lo, self.width
+        )
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    def to_bins(self, bins=10):
+        """
+        Returns the counts and edges of an equal-width histogram with the given number of bins over the observed range.
+        Each fine bin is assigned as a whole to the coarse bin containing its center.
+
+        Parameters:
+            bins
+                Number of bins of the returned histogram.
+        """
+        lo, hi = self.min, self.max
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        edges = np.linspace(lo, hi, bins + 1)
+        centers = self.lo + self.width * (np.arange(self.resolution) + 0.5)
+        index = np.clip(np.searchsorted(edges, centers, side="right") - 1, 0, bins - 1)
+        counts = np.bincount(index, weights=self.counts, minlength=bins)
+        return counts.astype(np.int64), edges
+
+
+class ValueCounts:
+    """
+    Counts of the distinct values of a stream of chunks, used to chart discrete nodes.
+
+    Counts of different chunks (or workers) are merged by key. Counting stops once more than
+    limit distinct values have been seen (continuous data), in which case keys is None.
+
+    Parameters:
+        limit
+            Maximum number of distinct values counted.
+    """
+
+    def __init__(self, limit=256):
+        self.limit = limit
+        self.keys = np.zeros(0)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.overflow = False
+
+    def _add(self, keys, counts):
+        if self.overflow:
+            return self
+        if self.counts.size:
+            keys = np.concatenate((self.keys, keys))
+            counts = np.concatenate((self.counts, counts))
+        self.keys, index = np.unique(keys, return_inverse=True)
+        self.counts = np.bincount(index, weights=counts).astype(np.int64)
+        if self.keys.size > self.limit:
+            return self._stop()
+        return self
+
+    def _stop(self):
+        self.keys, self.counts, self.overflow = None, None, True
+        return self
+
+    def update(self, values):
+        """
+        Adds a chunk of observations to the counts.
+
+        Parameters:
+            values
+                Array-like with the observations of the chunk.
+        """
+        x = np.asarray(values).ravel()
+        if self.overflow or not x.size:
+            return self
+        # A prefix with too many distinct values is enough to give up without sorting the chunk
+        if np.unique(x[: 4 * self.limit + 1]).size > self.limit:
+            return self._stop()
+        return self._add(*np.unique(x, return_counts=True))
+
+    def merge(self, other):
+        """
+        Combines the counts of another ValueCounts into this one.
+
+        Parameters:
+            other
+                ValueCounts to be merged.
+        """
+        if other.overflow:
+            return self._stop()
+        return self._add(other.keys, other.counts) if other.counts.size else self
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch in the style of the merging t-digest.
+
+    Observations are summarized by at most about compression / 2 weighted centroids. Centroids are
+    small near the tails (arcsine scale function), so extreme quantiles are estimated accurately.
+    Updating and merging are vectorized: values are sorted together with the current centroids,
+    assigned to clusters by the scale function and reduced with np.bincount.
+    Non-finite observations are ignored.
+
+    Parameters:
+        compression
+            Accuracy parameter of the sketch; higher values keep more centroids.
+    """
+
+    def __init__(self, compression=400):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def total(self):
+        return self.weights.sum()
+
+    def _compress(self, means, weights):
+        """Clusters centroids (sorted by mean) so each cluster spans at most one unit of the scale function."""
+        cum = np.cumsum(weights)
+        q = (cum - weights / 2) / cum[-1]
+        k = self.compression / (2 * np.pi) * (np.arcsin(2 * q - 1) + np.pi / 2)
+        cluster = np.floor(k).astype(np.int64)
+        self.weights = np.bincount(cluster, weights=weights)
+        sums = np.bincount(cluster, weights=means * weights)
+        keep = self.weights > 0
+        self.weights = self.weights[keep]
+        self.means = sums[keep] / self.weights
+
+    def update(self, values):
+        """
+        Adds a chunk of observations to the sketch.
+
+        Parameters:
+            values
+                Array-like with the observations of the chunk.
+        """
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[np.isfinite(x)]
+        if not x.size:
+            return self
+        self.min, self.max = min(self.min, x.min()), max(self.max, x.max())
+        x = np.sort(x)
+        position = np.searchsorted(x, self.means)
+        self._compress(
+            np.insert(x, position, self.means),
+            np.insert(np.ones(x.size), position, self.weights),
+        )
+        return self
+
+    def merge(self, other):
+        """
+        Combines the centroids of another QuantileSketch into this one.
+
+        Parameters:
+            other
+                QuantileSketch to be merged.
+        """
+        if other.weights.size:
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+            means = np.concatenate((self.means, other.means))
+            weights = np.concatenate((self.weights, other.weights))
+            order = np.argsort(means, kind="stable")
+            self._compress(means[order], weights[order])
+        return self
+
+    def quantile(self, q):
+        """
+        Returns the estimated quantile(s) of the observations.
+
+        Parameters:
+            q
+                Probability or array of probabilities, between 0 and 1.
+        """
+        if not self.weights.size:
+            return np.full(np.shape(q), np.nan)[()]
+        cum = np.cumsum(self.weights)
+        centers = np.concatenate(([0.0], cum - self.weights / 2, [cum[-1]]))
+        means = np.concatenate(([self.min], self.means, [self.max]))
+        return np.interp(np.asarray(q) * cum[-1], centers, means)[()]
+
+    def cdf(self, x):
+        """
+        Returns the estimated fraction of observations below x.
+
+        Parameters:
+            x
+                Value or array of values.
+        """
+        if not self.weights.size:
+            return np.full(np.shape(x), np.nan)[()]
+        cum = np.cumsum(self.weights)
+        centers = np.concatenate(([0.0], cum - self.weights / 2, [cum[-1]]))
+        means = np.concatenate(([self.min], self.means, [self.max]))
+        return (np.interp(x, means, centers) / cum[-1])[()]
+
+    def tail_mean(self, q):
+        """
+        Returns the estimated mean of the observations below the q quantile(s).
+
+        Parameters:
+            q
+                Probability or array of probabilities, between 0 and 1.
+        """
+        cum = np.cumsum(self.weights)
+        target = np.atleast_1d(q)[:, None] * cum[-1]
+        taken = np.clip(target - (cum - self.weights), 0, self.weights)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return ((taken * self.means).sum(axis=1) / target[:, 0]).reshape(
+                np.shape(q)
+            )[()]
+
+
+def partition_quantiles(values, probs, tails=()):
+    """
+    Returns the quantiles of the values for the given probabilities (with the linear interpolation of
+    np.quantile), and the mean of the lowest fraction of the values for each of the given tails,
+    using a single np.partition of a copy of the values.
+
+    Parameters:
+        values
+            Array-like with the observations.
+        probs
+            Probabilities of the quantiles, between 0 and 1.
+        tails
+            Fractions of the observations (between 0 and 1) whose lower-tail mean is returned.
+    """
+    x = np.array(values, dtype=float).ravel()
+    n = x.size
+    position = np.asarray(probs, dtype=float) * (n - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    counts = np.clip(np.ceil(np.asarray(tails, dtype=float) * n), 1, n).astype(np.int64)
+    x.partition(np.unique(np.concatenate((lower, upper, counts - 1))))
+    quantiles = x[lower] + (x[upper] - x[lower]) * (position - lower)
+    if not counts.size:
+        return quantiles, np.empty(0)
+    tail_sums = np.cumsum(x[: counts.max()])
+    return quantiles, tail_sums[counts - 1] / counts
+
+
+def risk_metrics(data, levels=(0.95, 0.99), percentiles=(), threshold=0.0):
+    """
+    Returns a dictionary with percentiles, value at risk, conditional value at risk and probability
+    of loss of a sample of gains (e.g. profits), where losses are the negative values.
+    For an array all the quantiles and tail means come from a single partition (see partition_quantiles),
+    for a QuantileSketch they are estimated from its centroids.
+
+    Parameters:
+        data
+            Array-like with the observations, or a QuantileSketch summarizing them.
+        levels
+            Confidence levels (between 0 and 1) of the "var_" and "cvar_" metrics.
+        percentiles
+            Percentiles (between 0 and 100) reported as "p" metrics.
+        threshold
+            Value below which an observation counts as a loss for the "prob_loss" metric.
+    """
+    tails = 1 - np.asarray(levels, dtype=float)
+    probs = np.concatenate((np.asarray(percentiles, dtype=float) / 100, tails))
+    if isinstance(data, QuantileSketch):
+        quantiles = data.quantile(probs)
+        tail_means = data.tail_mean(tails)
+        prob_loss = data.cdf(threshold)
+    else:
+        x = np.asarray(data, dtype=float).ravel()
+        quantiles, tail_means = partition_quantiles(x, probs, tails)
+        prob_loss = np.count_nonzero(x < threshold) / x.size
+
+    metrics = {f"p{p:g}": q for p, q in zip(percentiles, quantiles)}
+    for level, q, tail_mean in zip(levels, quantiles[len(percentiles) :], tail_means):
+        metrics[f"var_{100 * level:g}"] = -q
+        metrics[f"cvar_{100 * level:g}"] = -tail_mean
+    metrics["prob_loss"] = prob_loss
+    return metrics
@@ -0,0 +1,146 @@
+import ast
+import json
+import os
+
+import numpy as np
+
+from .ragged import RaggedArray
+from .utils import check_path
+
+
+MANIFEST = "manifest.json"
+
+FORMAT_VERSION = 1
+
+# Node attributes that hold run-time objects rather than a description of the node
+TRANSIENT_ATTRIBUTES = (
+    "value",
+    "moments",
+    "sketch",
+    "histogram",
+    "counts",
+    "bin_counts",
+    "spill_path",
+)
+
+
+def _to_json(value):
+    """Converts the NumPy objects found in node attributes to JSON types."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, ast.AST):
+        return ast.unparse(value)
+    raise TypeError(f"Cannot save an object of type {type(value).__name__}")
+
+
+def save_results(project, directory: str, nodes=None):
+    """
+    Saves the values of a RiskProject in a directory, one .npy file per node, along with a JSON manifest
+    with the structure of the network (nodes, attributes, edges and correlations), the seed, nsim and the sampling settings.
+    Each value is written as a single contiguous column, so it can be memory mapped when loaded.
+
+    Parameters:
+        project
+            RiskProject whose values are saved.
+        directory
+            Path of the directory (created if it doesn't exist).
+        nodes
+            List with the names of the nodes whose values are saved. Defaults to every node with a value.
+            The structure of the whole network, including the values of the input nodes, is always saved.
+    """
+    check_path(directory)
+    saved = set(project.nodes if nodes is None else nodes)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "seed": project.seed,
+        "nsim": project.nsim,
+        "sampling": project.sampling,
+        "replicates": project.replicates,
+        "streams": project.streams,
+        "correlations": [
+            {**group, "nodes": list(group["nodes"])} for group in project._correlations
+        ],
+        "nodes": {},
+        "edges": [[u, v, data.get("param")] for u, v, data in project.edges(data=True)],
+    }
+    for i, (node, attrs) in enumerate(project.nodes(data=True)):
+        entry = {
+            key: value
+            for key, value in attrs.items()
+            if key not in TRANSIENT_ATTRIBUTES
+        }
+        value = attrs.get("value")
+        if attrs["node_type"] == "input" and np.ndim(value) == 0:
+            entry["value"] = value
+        elif value is None or (node not in saved and attrs["node_type"] != "input"):
+            entry["value"] = None
+        else:
+            entry["value"] = _save_array(directory, f"node-{i}", value)
+        manifest["nodes"][node] = entry
+    with open(os.path.join(directory, MANIFEST), "w") as file:
+        json.dump(manifest, file, indent=1, default=_to_json)
+    return directory
+
+
+def _save_array(directory, stem, value):
+    """Saves an array (or the flat values and counts of a RaggedArray) returning its manifest entry."""
+    if isinstance(value, RaggedArray):
+        np.save(os.path.join(directory, f"{stem}.npy"), value.values)
+        np.save(os.path.join(directory, f"{stem}-counts.npy"), value.counts)
+        return {"file": f"{stem}.npy", "counts": f"{stem}-counts.npy"}
+    np.save(os.path.join(directory, f"{stem}.npy"), np.ascontiguousarray(value))
+    return {"file": f"{stem}.npy"}
+
+
+def load_results(cls, directory: str, mmap_mode="r"):
+    """
+    Rebuilds a project saved with save_results. The saved values are memory mapped (not read into memory)
+    and marked as up to date, so stats, reports and charts can be generated from them directly.
+
+    Parameters:
+        cls
+            RiskProject subclass to instantiate. It must define the methods named by the operation nodes
+            for the project to be evaluated again, but not to use the saved values.
+        directory
+            Path of the directory.
+        mmap_mode
+            Mode passed to numpy.load. None reads the values into memory.
+    """
+    with open(os.path.join(directory, MANIFEST)) as file:
+        manifest = json.load(file)
+    if manifest.get("format", FORMAT_VERSION) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported result store format: {manifest['format']}")
+
+    project = cls(seed=manifest["seed"], nsim=manifest["nsim"])
+    project.sampling = manifest.get("sampling", "random")
+    project.replicates = manifest.get("replicates", project.replicates)
+    project.streams = manifest.get("streams", "shared")
+    for node, attrs in manifest["nodes"].items():
+        value = attrs.pop("value")
+        if isinstance(value, dict) and "file" in value:  # Not a dictionary input
+            value = _load_array(directory, value, mmap_mode)
+        project.add_node(node, value=value, **attrs)
+    for u, v, param in manifest["edges"]:
+        if param is None:
+            project.add_edge(u, v)
+        else:
+            project.add_edge(u, v, param=param)
+    project._correlations = [
+        {**group, "nodes": tuple(group["nodes"]), "matrix": np.array(group["matrix"])}
+        for group in manifest.get("correlations", [])
+    ]
+    project._fresh.update(
+        node for node in project.nodes if project.nodes[node]["value"] is not None
+    )
+    return project
+
+
+def _load_array(directory, entry, mmap_mode):
+    values = np.load(os.path.join(directory, entry["file"]), mmap_mode=mmap_mode)
+    if "counts" in entry:
+        return RaggedArray(values, np.load(os.path.join(directory, entry["counts"])))
+    return values
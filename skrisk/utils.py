@@ -1,22 +1,31 @@
 import os
-import collections
+
+import numpy as np
+
+
+DEFAULT_PLOT_PALETTE = [
+    "#30a2da",
+    "#fc4f30",
+    "#e5ae38",
+    "#6d904f",
+    "#8b8b8b",
+]
+
+DEFAULT_PLOT_STYLE = "darkgrid"
 
 
 def generate_repeats(arr: list):
     """Generates the amount of repetitions and names of values in an array in two arrays with matching indexes."""
-    c = collections.Counter(arr)
-    data_values = [c[i] for i in c]
-    data_keys = [str(i) for i in c]
+    keys, counts = np.unique(np.asarray(arr), return_counts=True)
+    data_values = counts.tolist()
+    data_keys = [str(i) for i in keys]
     return data_values, data_keys
 
 
-def incremental_filename(node, temporal_path: str) -> str:
-    i = 1
-    hist_png_filename = f"{temporal_path}{node}_histogram_{i}.png"
-    while os.path.exists(hist_png_filename):
-        i += 1
-        hist_png_filename = f"{temporal_path}{node}_histogram_{i}.png"
-    return hist_png_filename
+def nbytes(value) -> int:
+    """Returns the memory used by the value of a node."""
+    size = getattr(value, "nbytes", None)
+    return np.asarray(value).nbytes if size is None else size
 
 
 def check_path(path: str) -> str:
@@ -0,0 +1,45 @@
+import pytest
+
+from skrisk import RiskProject
+
+
+class Bidding(RiskProject):
+    """Contract-bidding model whose method operations count how many times they are computed."""
+
+    def __init__(self, seed=42, nsim=1000):
+        super().__init__(seed=seed, nsim=nsim)
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def margin(self, my_bid, project_cost):
+        self._count("margin")
+        return my_bid - project_cost
+
+    def profit(self, win_contract, margin, bid_cost):
+        self._count("profit")
+        return win_contract * margin - bid_cost
+
+
+def build_bidding(seed=42, nsim=1000, cls=Bidding):
+    project = cls(seed=seed, nsim=nsim)
+    project.add_input("my_bid", 10500)
+    project.add_input("bid_cost", 350)
+    project.add_random(
+        "project_cost", "triangular", {"left": 9000, "mode": 10000, "right": 15000}
+    )
+    project.add_random("competitor", "uniform", {"low": 9000, "high": 14000})
+    project.add_operation("win_contract", "my_bid < competitor")
+    project.add_operation("margin", "margin", ("my_bid", "project_cost"))
+    project.add_goal("profit", "profit", ("win_contract", "margin", "bid_cost"))
+    return project
+
+
+@pytest.fixture
+def bidding():
+    """
+    Returns a function building the contract-bidding model, bidding(seed=42, nsim=1000, cls=Bidding),
+    whose goal is "profit".
+    """
+    return build_bidding
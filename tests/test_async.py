@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+
+
+class Service(RiskProject):
+    """Branches whose operations wait for a (simulated) service, recording how many run at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    async def fetch(self, x):
+        self._enter()
+        await asyncio.sleep(0.05)
+        self._exit()
+        return x + 1
+
+    def compute(self, x):
+        self._enter()
+        time.sleep(0.05)
+        self._exit()
+        return x * 2
+
+    def total(self, **branches):
+        return sum(branches.values())
+
+
+def branches(operation, count=4):
+    project = Service(seed=1, nsim=100)
+    project.add_random("x", "normal", {"loc": 0, "scale": 1})
+    for i in range(count):
+        project.add_operation(f"b{i}", operation, {"x": "x"})
+    project.add_goal("total", "total", tuple(f"b{i}" for i in range(count)))
+    return project
+
+
+@pytest.mark.parametrize("operation", ["fetch", "compute"])
+def test_branches_overlap(operation):
+    project = branches(operation)
+    start = time.perf_counter()
+    value = asyncio.run(project.eval_async("total"))
+
+    assert project.peak == 4
+    assert time.perf_counter() - start < 4 * 0.05
+    factor = {"fetch": lambda x: x + 1, "compute": lambda x: x * 2}[operation]
+    np.testing.assert_allclose(value, 4 * factor(project.nodes["x"]["value"]))
+
+
+@pytest.mark.parametrize("operation", ["fetch", "compute"])
+def test_max_concurrency_bounds_branches(operation):
+    project = branches(operation, count=6)
+    asyncio.run(project.eval_async("total", max_concurrency=2))
+    assert project.peak == 2
+
+
+@pytest.mark.parametrize("streams", ["shared", "node"])
+def test_values_equal_eval(bidding, streams):
+    expected = bidding()
+    expected.streams = streams
+    project = bidding()
+    project.streams = streams
+
+    values = asyncio.run(project.eval_async(("profit", "margin")))
+    np.testing.assert_array_equal(values["profit"], expected.eval("profit"))
+    np.testing.assert_array_equal(values["margin"], expected.nodes["margin"]["value"])
+    assert project.calls == {"margin": 1, "profit": 1}
+    # Fresh values are reused by both evaluation methods
+    assert asyncio.run(project.eval_async("profit")) is values["profit"]
+    assert project.eval("profit") is values["profit"]
+
+
+def test_eval_rejects_coroutine_operations():
+    project = branches("fetch", count=1)
+    with pytest.raises(TypeError, match="eval_async"):
+        project.eval("total")
+    assert "b0" not in project._fresh
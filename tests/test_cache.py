@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from conftest import Bidding
+
+
+def cached(bidding, directory, seed=42):
+    project = bidding(seed=seed)
+    project.enable_cache(str(directory))
+    return project
+
+
+def test_cache_round_trip(bidding, tmp_path):
+    first = cached(bidding, tmp_path)
+    expected = np.array(first.eval("profit"))
+    assert first.calls == {"margin": 1, "profit": 1}
+    assert len(first._cache)
+
+    second = cached(bidding, tmp_path)
+    np.testing.assert_array_equal(second.eval("profit"), expected)
+    assert second.calls == {}
+    assert second.node_hash("profit") == first.node_hash("profit")
+
+
+def test_cache_invalidated_by_changes(bidding, tmp_path):
+    project = cached(bidding, tmp_path)
+    project.eval("profit")
+    hashes = {node: project.node_hash(node) for node in ("project_cost", "profit")}
+
+    project.update_input("my_bid", 11000)
+    project.eval("profit")
+    assert project.calls == {"margin": 2, "profit": 2}
+    assert project.node_hash("project_cost") == hashes["project_cost"]
+    assert project.node_hash("profit") != hashes["profit"]
+
+    other = cached(bidding, tmp_path)
+    other.nodes["project_cost"]["parameters"] = {
+        "left": 9000,
+        "mode": 11000,
+        "right": 15000,
+    }
+    other.invalidate_values("project_cost")
+    assert other.node_hash("project_cost") != hashes["project_cost"]
+    other.eval("profit")
+    assert other.calls == {"margin": 1, "profit": 1}
+
+    reseeded = cached(bidding, tmp_path, seed=8)
+    assert reseeded.node_hash("project_cost") != hashes["project_cost"]
+
+
+def test_cache_requires_node_streams(bidding, tmp_path):
+    project = cached(bidding, tmp_path)
+    assert project.streams == "node"
+    with pytest.raises(ValueError):
+        project.streams = "shared"
+    project.disable_cache()
+    project.streams = "shared"
+
+
+class Hidden(Bidding):
+    def margin(self, my_bid, project_cost):
+        # Reads the value of a node that isn't upstream of margin: the hash can't see it
+        return my_bid - project_cost - self.nodes["bid_cost"]["value"]
+
+
+def test_hidden_dependencies_are_not_hashed(bidding):
+    project = bidding(cls=Hidden)
+    before = project.node_hash("margin")
+    project.update_input("bid_cost", 400)
+    assert project.node_hash("margin") == before  # Documented in enable_cache
+
+    project.update_input("my_bid", 11000)
+    assert project.node_hash("margin") != before
+
+
+def test_contract_bidding_cost_estimate_invalidates_cache(tmp_path):
+    from benchmarks.models import contract_bidding
+
+    project = contract_bidding()
+    project.enable_cache(str(tmp_path))
+    project.eval("profit")
+    bids = np.array(project.nodes["competing_bids"]["value"])
+
+    changed = contract_bidding()
+    changed.enable_cache(str(tmp_path))
+    changed.update_input("estimated_cost", 11000)
+    changed.eval("profit")
+    np.testing.assert_allclose(
+        np.asarray(changed.nodes["competing_bids"]["value"]), bids * 1.1
+    )
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from scipy.stats import spearmanr
+
+from skrisk import RiskProject
+from skrisk.correlation import correlation_matrix, gaussian_copula, iman_conover
+
+TARGET = np.array([[1, 0.7, -0.4], [0.7, 1, 0], [-0.4, 0, 1]])
+
+
+class Correlated(RiskProject):
+    def double(self, cost):
+        return 2 * cost
+
+
+def correlated(method, sampling="random", nsim=20_000):
+    project = Correlated(seed=3, nsim=nsim)
+    project.sampling = sampling
+    project.add_random("cost", "lognormal", {"mean": 0, "sigma": 0.5})
+    project.add_random("delay", "triangular", {"left": 0, "mode": 2, "right": 10})
+    project.add_random("price", "uniform", {"low": 5, "high": 6})
+    project.add_operation("doubled", "double", ("cost",))
+    project.correlate(("cost", "delay", "price"), TARGET, method=method)
+    return project
+
+
+def expected(method):
+    # The Gaussian copula correlates the normal scores, whose rank correlation is smaller
+    return TARGET if method == "iman-conover" else 6 / np.pi * np.arcsin(TARGET / 2)
+
+
+def rank_correlation(project, nodes=("cost", "delay", "price")):
+    return spearmanr(
+        np.stack([project.nodes[node]["value"] for node in nodes]), axis=1
+    )[0]
+
+
+def test_iman_conover_keeps_marginals():
+    rng = np.random.default_rng(0)
+    samples = [rng.lognormal(size=5000), rng.binomial(10, 0.5, 5000).astype(float)]
+    before = [np.sort(sample) for sample in samples]
+    iman_conover(samples, correlation_matrix(0.8, 2), rng)
+
+    for sample, ordered in zip(samples, before):
+        np.testing.assert_array_equal(np.sort(sample), ordered)
+    assert spearmanr(*samples)[0] == pytest.approx(0.8, abs=0.03)
+
+
+def test_copula_keeps_uniform_marginals():
+    u = np.random.default_rng(0).random((3, 20_000))
+    gaussian_copula(u, TARGET)
+
+    for row in u:
+        np.testing.assert_allclose(
+            np.quantile(row, [0.1, 0.5, 0.9]), [0.1, 0.5, 0.9], atol=0.01
+        )
+    np.testing.assert_allclose(spearmanr(u, axis=1)[0], expected("copula"), atol=0.02)
+
+
+@pytest.mark.parametrize("method", ["iman-conover", "copula"])
+@pytest.mark.parametrize("sampling", ["random", "lhs"])
+def test_correlate_achieves_rank_correlation(method, sampling):
+    project = correlated(method, sampling)
+    project.eval("doubled")
+
+    np.testing.assert_allclose(rank_correlation(project), expected(method), atol=0.03)
+    # The marginals are those of the distributions
+    delay = project.nodes["delay"]["value"]
+    assert delay.min() >= 0 and delay.max() <= 10
+    assert delay.mean() == pytest.approx(4, abs=0.05)
+    price = project.nodes["price"]["value"]
+    np.testing.assert_allclose(
+        np.quantile(price, [0.25, 0.75]), [5.25, 5.75], atol=0.01
+    )
+
+
+@pytest.mark.parametrize("method", ["iman-conover", "copula"])
+def test_drawing_a_member_redraws_its_group(method):
+    project = correlated(method, nsim=5000)
+    project.eval("doubled")
+    cost = project.nodes["cost"]["value"]
+
+    project.invalidate_values("delay")
+    assert "doubled" in project._fresh
+    project.eval("delay")
+
+    # cost was drawn again with delay, so what was computed from it is outdated
+    assert project.nodes["cost"]["value"] is not cost
+    assert "doubled" not in project._fresh
+    np.testing.assert_allclose(
+        rank_correlation(project)[0, 1],
+        expected(method)[0, 1],
+        atol=0.04,
+    )
+    np.testing.assert_array_equal(
+        project.eval("doubled"), 2 * project.nodes["cost"]["value"]
+    )
+
+
+def test_correlate_rejects_invalid_groups():
+    project = correlated("iman-conover")
+    with pytest.raises(ValueError):
+        project.correlate(("cost", "doubled"), 0.5)
+    with pytest.raises(ValueError):
+        project.correlate(("cost", "delay"), 0.5)
+    with pytest.raises(ValueError):
+        correlation_matrix([[1, 0.5], [0.4, 1]], 2)
+    with pytest.raises(ValueError):
+        project.correlate(("cost", "delay", "price"), TARGET, method="kendall")
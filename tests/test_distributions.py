@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+from skrisk.distributions import DISTRIBUTIONS
+
+# Two nodes of every registered family, with different parameters
+PARAMETERS = {
+    "normal": [{"loc": 1, "scale": 2}, {}],
+    "lognormal": [{"mean": 0.5, "sigma": 0.3}, {"sigma": 0.8}],
+    "uniform": [{"low": -2, "high": 3}, {}],
+    "triangular": [
+        {"left": 0, "mode": 1, "right": 5},
+        {"left": 9000, "mode": 10000, "right": 15000},
+    ],
+    "pert": [
+        {"minimum": 0, "mode": 1, "maximum": 5},
+        {"minimum": 2, "mode": 8, "maximum": 9, "lamb": 2},
+    ],
+    "beta": [{"a": 2, "b": 5}, {"a": 0.5, "b": 0.5}],
+    "gamma": [{"shape": 2, "scale": 3}, {"shape": 0.7}],
+    "exponential": [{"scale": 4}, {}],
+    "binomial": [{"n": 10, "p": 0.3}, {"n": 4, "p": 0.9}],
+    "poisson": [{"lam": 3}, {"lam": 0.5}],
+    "discrete": [
+        {"values": [1, 5, 9], "probabilities": [0.2, 0.5, 0.3]},
+        {"values": [-1, 1]},
+    ],
+    "empirical": [{"data": [3, 1, 4, 1, 5, 9, 2, 6]}, {"data": [10, 20]}],
+}
+
+
+def test_every_family_is_tested():
+    assert PARAMETERS.keys() == DISTRIBUTIONS.keys()
+
+
+@pytest.mark.parametrize("name", PARAMETERS)
+def test_sample_batch_matches_single_nodes(name):
+    distribution, parameters = DISTRIBUTIONS[name], PARAMETERS[name]
+    size = 200_000
+    batch = distribution.sample_batch(np.random.default_rng(0), size, parameters)
+
+    assert batch.shape == (2, size)
+    rng = np.random.default_rng(1)
+    for row, node in zip(batch, parameters):
+        single = distribution.sample(rng, size, **node)
+        error = 5 * single.std() / np.sqrt(size)
+        assert row.mean() == pytest.approx(single.mean(), abs=error)
+        assert row.std() == pytest.approx(single.std(), rel=0.02)
+
+
+@pytest.mark.parametrize("name", PARAMETERS)
+def test_ppf_inverts_the_sampled_distribution(name):
+    distribution, parameters = DISTRIBUTIONS[name], PARAMETERS[name]
+    # Away from the jumps of the discrete CDFs, where sampling noise decides the quantile
+    probs = np.arange(0.03, 0.97, 0.05)
+    u = np.tile(probs, (2, 1))
+    quantiles = distribution.ppf_batch(u, parameters)
+
+    rng = np.random.default_rng(2)
+    for row, node in zip(quantiles, parameters):
+        single = distribution.sample(rng, 200_000, **node)
+        np.testing.assert_array_equal(row, distribution.ppf(probs, **node))
+        assert (np.diff(row) >= 0).all()
+        expected = np.quantile(single, probs, method="inverted_cdf")
+        np.testing.assert_allclose(row, expected, atol=0.02 * single.std())
+
+
+def test_ppf_is_the_inverse_cdf():
+    from scipy import stats
+
+    u = np.linspace(0.01, 0.99, 99)
+    distributions = {
+        "normal": ({"loc": 1, "scale": 2}, stats.norm(1, 2)),
+        "lognormal": (
+            {"mean": 0.5, "sigma": 0.3},
+            stats.lognorm(0.3, scale=np.exp(0.5)),
+        ),
+        "uniform": ({"low": -2, "high": 3}, stats.uniform(-2, 5)),
+        "triangular": ({"left": 0, "mode": 1, "right": 5}, stats.triang(0.2, 0, 5)),
+        "pert": ({"minimum": 0, "mode": 1, "maximum": 5}, stats.beta(1.8, 4.2, 0, 5)),
+        "beta": ({"a": 2, "b": 5}, stats.beta(2, 5)),
+        "gamma": ({"shape": 2, "scale": 3}, stats.gamma(2, scale=3)),
+        "exponential": ({"scale": 4}, stats.expon(scale=4)),
+    }
+    for name, (parameters, reference) in distributions.items():
+        quantiles = DISTRIBUTIONS[name].ppf(u, **parameters)
+        np.testing.assert_allclose(reference.cdf(quantiles), u, atol=1e-9, err_msg=name)
+
+
+class Shadowing(RiskProject):
+    def normal(self, loc, scale):
+        return np.full(self.sample_size, float(loc))
+
+
+def test_subclass_method_shadows_registered_distribution():
+    project = Shadowing(seed=1, nsim=100)
+    assert project._resolve_distribution("normal") == project.normal
+    assert project._resolve_distribution("uniform") is DISTRIBUTIONS["uniform"]
+    project.add_random("x", "normal", {"loc": 3, "scale": 1})
+    np.testing.assert_array_equal(project.eval("x"), np.full(100, 3.0))
+
+    plain = RiskProject(seed=1, nsim=100)
+    assert plain._resolve_distribution("normal") is DISTRIBUTIONS["normal"]
+    plain.add_random("x", "normal", {"loc": 3, "scale": 1})
+    assert plain.eval("x").std() > 0.5
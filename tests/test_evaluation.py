@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+
+
+class Diamonds(RiskProject):
+    """Chain of diamonds whose operations count how many times they are computed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def left(self, x):
+        self._count("left")
+        return x + 1
+
+    def right(self, x):
+        self._count("right")
+        return x * 2
+
+    def join(self, a, b):
+        self._count("join")
+        return a + b
+
+
+def test_update_input_recomputes_downstream_only(bidding):
+    project = bidding()
+    before = project.eval("profit").copy()
+    cost = project.nodes["project_cost"]["value"]
+    project.update_input("my_bid", 11000)
+    after = project.eval("profit")
+
+    assert project.calls == {"margin": 2, "profit": 2}
+    assert project.nodes["project_cost"]["value"] is cost
+    won = project.nodes["win_contract"]["value"]
+    assert won.sum() < before.size
+    np.testing.assert_allclose(after[won], before[won] + 500)
+
+
+def test_eval_reuses_fresh_values(bidding):
+    project = bidding()
+    value = project.eval("profit")
+    assert project.eval("profit") is value
+    assert project.calls == {"margin": 1, "profit": 1}
+
+
+def test_update_input_rejects_other_nodes(bidding):
+    project = bidding()
+    with pytest.raises(ValueError):
+        project.update_input("project_cost", 1)
+
+
+def test_diamonds_evaluate_each_node_once():
+    project = Diamonds(seed=1, nsim=100)
+    project.add_random("x", "normal", {"loc": 0, "scale": 1})
+    previous = "x"
+    for i in range(20):
+        project.add_operation(f"a{i}", "left", {"x": previous})
+        project.add_operation(f"b{i}", "right", {"x": previous})
+        project.add_operation(f"c{i}", "join", {"a": f"a{i}", "b": f"b{i}"})
+        previous = f"c{i}"
+    project.eval(previous)
+
+    assert project.calls == {"left": 20, "right": 20, "join": 20}
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+from skrisk.expressions import Expression
+
+
+def chain(fuse):
+    project = RiskProject(seed=5, nsim=1000)
+    project.add_random("a", "normal", {"loc": 10, "scale": 2})
+    project.add_random("b", "uniform", {"low": 0, "high": 1})
+    project.add_random("n", "binomial", {"n": 10, "p": 0.5})
+    project.add_operation("c", "a * 2 + b", fuse=fuse)
+    project.add_operation("d", "where(c > 20, c - n, -c)", fuse=fuse)
+    project.add_goal("e", "d * d / (n + 1) + exp(b) - a")
+    return project
+
+
+def test_fused_chain_equals_unfused():
+    fused, unfused = chain(True), chain(False)
+    expected = unfused.eval("e")
+    np.testing.assert_allclose(fused.eval("e"), expected, rtol=1e-12)
+
+    step = fused.plan.steps["e"]
+    assert {source for source, _ in step.args} == {"a", "b", "n"}
+    assert fused.nodes["c"]["value"] is None and fused.nodes["d"]["value"] is None
+    assert unfused.nodes["d"]["value"] is not None
+
+
+def test_fused_operation_with_other_successors_is_kept():
+    project = chain(True)
+    project.add_goal("f", "c + 1")
+    project.eval("e")
+
+    assert project.nodes["c"]["value"] is not None
+    np.testing.assert_array_equal(project.eval("f"), project.nodes["c"]["value"] + 1)
+    np.testing.assert_allclose(project.nodes["e"]["value"], chain(False).eval("e"))
+
+
+def test_evaluation_never_writes_into_node_values():
+    project = chain(False)
+    project.eval("d")
+    arrays = {node: project.nodes[node]["value"] for node in ("a", "b", "n", "c", "d")}
+    copies = {node: array.copy() for node, array in arrays.items()}
+    project.eval("e")
+
+    for node, array in arrays.items():
+        np.testing.assert_array_equal(array, copies[node])
+
+
+def test_temporaries_are_reused_without_touching_arguments():
+    a = np.arange(5.0)
+    b = np.arange(5)
+    flags = np.array([True, False, True, False, True])
+    copies = a.copy(), b.copy(), flags.copy()
+    expression = Expression(
+        "-(a * 2 + b) / (b + 1) + (flags & (a > 1)) + minimum(a, b) ** 2"
+    )
+
+    result = expression(a=a, b=b, flags=flags)
+    expected = -(a * 2 + b) / (b + 1) + (flags & (a > 1)) + np.minimum(a, b) ** 2
+    np.testing.assert_allclose(result, expected)
+    for argument, copy in zip((a, b, flags), copies):
+        np.testing.assert_array_equal(argument, copy)
+    assert result is not a
+    # Integer temporaries don't receive float results
+    np.testing.assert_array_equal(Expression("(b + 1) / 2")(b=b), (b + 1) / 2)
+    np.testing.assert_array_equal(
+        Expression("b + a")(b=b[:, None], a=a), b[:, None] + a
+    )
+
+
+def test_expressions_on_other_values():
+    from skrisk.ragged import RaggedArray
+
+    ragged = RaggedArray([1.0, 2.0, 3.0], [2, 0, 1])
+    result = Expression("x * 2 - y")(x=ragged, y=np.array([1.0, 2.0, 3.0]))
+    assert isinstance(result, RaggedArray)
+    np.testing.assert_array_equal(np.asarray(result), [1, 3, 3])
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "a +",
+        "a b",
+        "a.real",
+        "a[0]",
+        "open(a)",
+        "__import__('os')",
+        "a(1)",
+        "minimum(a, b=1)",
+        "'text' + a",
+        "a < b < c",
+        "a if b else c",
+        "lambda: a",
+        "[a, b]",
+    ],
+)
+def test_invalid_expressions_raise_value_error(source):
+    with pytest.raises(ValueError):
+        Expression(source)
+    with pytest.raises(ValueError):
+        RiskProject().add_operation("x", source)
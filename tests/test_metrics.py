@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from skrisk.stats import QuantileSketch, partition_quantiles, risk_metrics
+
+
+@pytest.fixture
+def gains():
+    return np.random.default_rng(0).normal(100, 400, 100_001)
+
+
+def sorted_cvar(values, level):
+    count = int(np.ceil((1 - level) * values.size))
+    return -np.sort(values)[:count].mean()
+
+
+def test_partition_quantiles_match_numpy(gains):
+    probs = [0, 0.001, 0.05, 0.3333, 0.5, 0.99, 1]
+    quantiles, tail_means = partition_quantiles(gains, probs, [0.01, 0.05])
+
+    np.testing.assert_allclose(quantiles, np.quantile(gains, probs), rtol=1e-12)
+    np.testing.assert_allclose(
+        tail_means, [-sorted_cvar(gains, 0.99), -sorted_cvar(gains, 0.95)]
+    )
+
+
+def test_partition_quantiles_leaves_values_untouched(gains):
+    copy = gains.copy()
+    quantiles, tail_means = partition_quantiles(gains, [0.5])
+    np.testing.assert_array_equal(gains, copy)
+    assert tail_means.size == 0
+
+
+def test_risk_metrics_sign_convention(gains):
+    metrics = risk_metrics(gains, levels=(0.95, 0.99), percentiles=(5, 50))
+
+    # Losses are the negative gains, so the value at risk is a positive loss
+    assert metrics["var_95"] == pytest.approx(-np.quantile(gains, 0.05))
+    assert metrics["var_95"] > 0 and metrics["var_99"] > metrics["var_95"]
+    assert metrics["p5"] == pytest.approx(-metrics["var_95"])
+    assert metrics["p50"] == pytest.approx(np.median(gains))
+    for level in (0.95, 0.99):
+        cvar = metrics[f"cvar_{100 * level:g}"]
+        assert cvar == pytest.approx(sorted_cvar(gains, level))
+        assert cvar >= metrics[f"var_{100 * level:g}"]
+    assert metrics["prob_loss"] == np.mean(gains < 0)
+    assert risk_metrics(gains, threshold=100)["prob_loss"] == np.mean(gains < 100)
+
+
+def test_risk_metrics_from_sketch(gains):
+    exact = risk_metrics(gains, percentiles=(1, 50, 99))
+    estimated = risk_metrics(QuantileSketch().update(gains), percentiles=(1, 50, 99))
+
+    assert estimated.keys() == exact.keys()
+    for key, value in exact.items():
+        assert estimated[key] == pytest.approx(value, rel=0.01, abs=2), key
+
+
+def test_project_risk_metrics(bidding):
+    project = bidding()
+    profit = project.eval("profit")
+    metrics = project.risk_metrics("profit", percentiles=(50,))
+
+    assert project.nodes["profit"]["metrics"] is metrics
+    assert metrics["cvar_95"] == pytest.approx(sorted_cvar(profit, 0.95))
+    streaming = project.risk_metrics("profit", percentiles=(50,), streaming=True)
+    assert streaming["prob_loss"] == pytest.approx(metrics["prob_loss"], abs=0.01)
@@ -0,0 +1,75 @@
+import os
+import threading
+
+from skrisk.output import OutputManager
+
+
+def test_reserve_numbers_after_existing_files(tmp_path):
+    for name in (
+        "profit_histogram_3.png",
+        "profit_histogram_10.png",
+        "profit_tornado_1.png",
+        "notes.txt",
+    ):
+        (tmp_path / name).write_bytes(b"chart")
+    output = OutputManager(str(tmp_path))
+
+    assert output.reserve("profit") == str(tmp_path / "profit_histogram_11.png")
+    assert output.reserve("profit") == str(tmp_path / "profit_histogram_12.png")
+    assert output.reserve("profit", kind="tornado") == str(
+        tmp_path / "profit_tornado_2.png"
+    )
+    assert output.reserve("win_contract") == str(
+        tmp_path / "win_contract_histogram_1.png"
+    )
+    # Node names containing underscores and numbers don't mix with each other
+    assert output.reserve("cost_2") == str(tmp_path / "cost_2_histogram_1.png")
+    assert os.path.getsize(tmp_path / "profit_histogram_12.png") == 0
+
+
+def test_reserve_skips_names_taken_since_the_scan(tmp_path):
+    output = OutputManager(str(tmp_path))
+    other = OutputManager(str(tmp_path))
+    (tmp_path / "profit_histogram_2.png").write_bytes(b"")
+
+    assert other.reserve("profit") == str(tmp_path / "profit_histogram_1.png")
+    assert output.reserve("profit") == str(tmp_path / "profit_histogram_3.png")
+
+
+def test_concurrent_reservations_are_unique(tmp_path):
+    managers = [OutputManager(str(tmp_path)) for _ in range(4)]
+    paths = []
+
+    def reserve(output):
+        for _ in range(25):
+            paths.append(output.reserve("profit"))
+
+    threads = [threading.Thread(target=reserve, args=(output,)) for output in managers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(paths)) == 100
+    assert len(os.listdir(tmp_path)) == 100
+
+
+def test_release_removes_only_empty_files(tmp_path):
+    output = OutputManager(str(tmp_path))
+    empty, written = output.reserve("profit"), output.reserve("profit")
+    with open(written, "wb") as file:
+        file.write(b"chart")
+
+    OutputManager.release(empty)
+    OutputManager.release(written)
+    OutputManager.release(empty)  # Already removed
+    assert not os.path.exists(empty)
+    assert os.path.exists(written)
+
+
+def test_new_run_directories(tmp_path):
+    output = OutputManager(str(tmp_path / "charts"))
+    first, second = output.new_run("run"), output.new_run("run")
+
+    assert first.directory == str(tmp_path / "charts" / "run")
+    assert second.directory == str(tmp_path / "charts" / "run_2")
+    assert first.reserve("profit").startswith(first.directory)
@@ -0,0 +1,28 @@
+import numpy as np
+
+
+def test_eval_parallel_is_reproducible(bidding):
+    first = bidding(nsim=2000).eval_parallel("profit", workers=2)
+    second = bidding(nsim=2000).eval_parallel("profit", workers=2)
+    other = bidding(seed=4, nsim=2000).eval_parallel("profit", workers=2)
+
+    assert first.shape == (2000,)
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+
+def test_eval_parallel_stores_the_goal(bidding):
+    project = bidding(nsim=2000)
+    value = project.eval_parallel(("profit", "margin"), workers=2)
+
+    assert project.nodes["profit"]["value"] is value["profit"]
+    assert value["margin"].shape == (2000,)
+    assert project.generate_stats("profit")["min"] >= -15000 - 350
+
+
+def test_eval_parallel_streaming_is_reproducible(bidding):
+    first = bidding(nsim=2000).eval_parallel("profit", workers=2, chunk_size=300)
+    second = bidding(nsim=2000).eval_parallel("profit", workers=2, chunk_size=300)
+
+    assert first == second
+    assert first["min"] >= -15000 - 350
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+from skrisk.ragged import RaggedArray
+
+
+@pytest.fixture
+def ragged():
+    # Empty segments at the start, in the middle and at the end
+    return RaggedArray([4.0, 2.0, 7.0, 1.0, 3.0, 5.0], [0, 3, 0, 1, 2, 0])
+
+
+def segments(array):
+    return np.split(np.asarray(array), array.offsets[1:-1])
+
+
+def test_reductions_with_empty_segments(ragged):
+    np.testing.assert_array_equal(ragged.min(), [np.inf, 2, np.inf, 1, 3, np.inf])
+    np.testing.assert_array_equal(ragged.max(empty=0), [0, 7, 0, 1, 5, 0])
+    np.testing.assert_array_equal(ragged.sum(), [0, 13, 0, 1, 8, 0])
+    np.testing.assert_array_equal(ragged.mean(), [np.nan, 13 / 3, np.nan, 1, 4, np.nan])
+    for segment, low, total in zip(segments(ragged), ragged.min(), ragged.sum()):
+        assert low == (segment.min() if segment.size else np.inf)
+        assert total == segment.sum()
+    np.testing.assert_array_equal((ragged > 3).any(), [0, 1, 0, 0, 1, 0])
+    np.testing.assert_array_equal((ragged > 3).all(), [1, 0, 1, 0, 0, 1])
+
+
+def test_reductions_of_all_empty_segments():
+    ragged = RaggedArray(np.zeros(0), np.zeros(4, dtype=np.int64))
+    np.testing.assert_array_equal(ragged.min(), np.full(4, np.inf))
+    np.testing.assert_array_equal(ragged.sum(), np.zeros(4))
+    assert np.isnan(ragged.mean()).all()
+    assert ragged.mean(empty=0).tolist() == [0, 0, 0, 0]
+
+
+def test_counts_must_add_up():
+    with pytest.raises(ValueError):
+        RaggedArray([1.0, 2.0], [1, 2])
+
+
+def test_broadcasts_per_simulation_arrays(ragged):
+    per_simulation = np.arange(6) * 10.0
+    shifted = ragged + per_simulation
+
+    assert isinstance(shifted, RaggedArray)
+    np.testing.assert_array_equal(shifted.counts, ragged.counts)
+    np.testing.assert_array_equal(np.asarray(shifted), [14, 12, 17, 31, 43, 45])
+    np.testing.assert_array_equal(
+        np.asarray(per_simulation - ragged), -np.asarray(shifted - 2 * per_simulation)
+    )
+    np.testing.assert_array_equal(np.asarray(ragged * 2), [8, 4, 14, 2, 6, 10])
+    np.testing.assert_array_equal((ragged < np.full(6, 3.5)).sum(), [0, 1, 0, 1, 1, 0])
+    np.testing.assert_array_equal(np.asarray(ragged + ragged), 2 * ragged.values)
+
+
+class Competitors(RiskProject):
+    def competing_bids(self, competitors, estimated_cost):
+        counts = self.binomial(competitors, 0.5)
+        return self.sample_segments(
+            "uniform", counts, low=0.9 * estimated_cost, high=1.2 * estimated_cost
+        )
+
+    def lowest_bid(self, competing_bids):
+        return competing_bids.min()
+
+
+def test_counts_of_swept_nodes():
+    project = Competitors(seed=1, nsim=1000)
+    project.add_input("competitors", 4)
+    project.add_input("estimated_cost", 10000)
+    project.add_operation(
+        "competing_bids", "competing_bids", ("competitors", "estimated_cost")
+    )
+    project.add_operation("lowest_bid", "lowest_bid", ("competing_bids",))
+    swept = project.sweep(
+        ("competing_bids", "lowest_bid"), {"estimated_cost": [9000, 10000, 11000]}
+    )
+
+    bids, lowest = swept["competing_bids"], swept["lowest_bid"]
+    assert bids.counts.shape == lowest.shape == (3, 1000)
+    # Common random numbers: the same number of competitors at every point
+    np.testing.assert_array_equal(bids.counts[0], bids.counts[2])
+    none = bids.counts == 0
+    assert none.any() and np.isinf(lowest[none]).all()
+    for row, cost in zip(lowest, [9000, 10000, 11000]):
+        assert (row[~none[0]] >= 0.9 * cost).all()
+    np.testing.assert_allclose(lowest[2][~none[0]], lowest[0][~none[0]] * 11 / 9)
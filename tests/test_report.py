@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from skrisk import report
+
+
+@pytest.fixture
+def evaluated(bidding, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = bidding()
+    project.output_directory = str(tmp_path / "charts")
+    project.eval("profit")
+    for node in ("project_cost", "margin", "profit"):
+        project.generate_stats(node)
+    return project
+
+
+def charts(project):
+    return sorted(os.listdir(project.output_directory))
+
+
+def test_report_without_images(evaluated, tmp_path):
+    evaluated.generate_report("report", images=False)
+
+    text = (tmp_path / "report.md").read_text()
+    assert "Profit" in text and "Project Cost" in text
+    assert "My Bid" not in text  # Input nodes aren't reported
+    assert "Rank correlation" in text
+    assert "![" not in text
+    assert not os.path.exists(evaluated.output_directory)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_report_with_images(evaluated, tmp_path, workers):
+    evaluated.generate_report("report", workers=workers)
+
+    names = charts(evaluated)
+    assert "profit_histogram_1.png" in names
+    assert "win_contract_histogram_1.png" in names
+    assert "profit_tornado_1.png" in names
+    for name in names:
+        assert os.path.getsize(os.path.join(evaluated.output_directory, name)) > 0
+    text = (tmp_path / "report.md").read_text()
+    assert "(charts/profit_histogram_1.png)" in text
+
+    # A second report numbers its charts after the first one
+    evaluated.generate_report("report", workers=workers)
+    assert "profit_histogram_2.png" in charts(evaluated)
+
+
+def test_report_releases_charts_on_failure(evaluated, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("rendering failed")
+
+    monkeypatch.setitem(report.RENDERERS, "tornado", fail)
+    with pytest.raises(RuntimeError):
+        evaluated.generate_report("report")
+    # The charts rendered before the failure are kept, the empty reserved files are removed
+    assert "profit_tornado_1.png" not in charts(evaluated)
+    for name in charts(evaluated):
+        assert os.path.getsize(os.path.join(evaluated.output_directory, name)) > 0
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pytest
+
+
+def test_dropped_nodes_are_not_redrawn_for_fresh_goals(bidding):
+    project = bidding()
+    project.set_retention("drop")
+    value = project.eval("profit")
+
+    assert project.nodes["project_cost"]["value"] is None
+    assert project.eval("profit") is value
+    assert project.calls == {"margin": 1, "profit": 1}
+
+
+def test_dropped_nodes_are_redrawn_when_needed(bidding):
+    project = bidding()
+    project.set_retention("drop", ["project_cost"])
+    project.eval("profit")
+    margin = project.eval("margin")
+
+    assert project.calls == {"margin": 1, "profit": 1}
+    np.testing.assert_array_equal(margin, project.nodes["margin"]["value"])
+
+
+def test_disk_retention_maps_spilled_values(bidding, tmp_path):
+    expected = bidding().eval("profit")
+    project = bidding()
+    project.spill_directory = str(tmp_path)
+    project.set_retention("disk", ["project_cost", "margin"])
+    np.testing.assert_array_equal(project.eval("profit"), expected)
+
+    for node in ("project_cost", "margin"):
+        value = project.nodes[node]["value"]
+        assert isinstance(value, np.memmap) and not value.flags.writeable
+        assert os.path.dirname(project.nodes[node]["spill_path"]) == str(tmp_path)
+    assert len(os.listdir(tmp_path)) == 2
+
+    # Spilling a node again replaces its file
+    path = project.nodes["project_cost"]["spill_path"]
+    project.invalidate_values("project_cost")
+    project.eval("profit")
+    assert project.nodes["project_cost"]["spill_path"] != path
+    assert not os.path.exists(path)
+    assert len(os.listdir(tmp_path)) == 2
+    np.testing.assert_array_equal(
+        project.nodes["margin"]["value"],
+        project.eval("my_bid") - project.nodes["project_cost"]["value"],
+    )
+
+
+def test_stats_retention_keeps_accumulators(bidding):
+    expected = bidding()
+    expected.eval("profit")
+    margin = expected.nodes["margin"]["value"]
+
+    project = bidding()
+    project.set_retention("stats", "margin")
+    project.eval("profit")
+    assert project.nodes["margin"]["value"] is None
+    assert "margin" not in project._fresh
+    stats = project.nodes["margin"]["stats"]
+    assert stats["mean"] == pytest.approx(margin.mean())
+    assert (stats["min"], stats["max"]) == (margin.min(), margin.max())
+    assert project.histogram("margin")[0].sum() == margin.size
+    np.testing.assert_array_equal(
+        project.nodes["profit"]["value"], expected.nodes["profit"]["value"]
+    )
+
+
+def test_estimate_memory(bidding):
+    project = bidding()
+    nsim = 10**6
+    inputs = 2 * 8
+    # Four float64 nodes and a boolean one, all held at once
+    assert project.estimate_memory(nsim) == inputs + 4 * 8 * nsim + nsim
+
+    # margin is computed while both random nodes are held, and project_cost is released after it
+    project.set_retention("drop")
+    assert project.estimate_memory(nsim) == inputs + 3 * 8 * nsim
+    assert project.estimate_memory(nsim, goals="margin") == 8 + 2 * 8 * nsim
+    # The pilot run leaves the project untouched
+    assert project.nodes["profit"]["value"] is None
+    np.testing.assert_array_equal(project.eval("profit"), bidding().eval("profit"))
+
+
+def test_unknown_retention_policy(bidding):
+    with pytest.raises(ValueError):
+        bidding().set_retention("compress")
@@ -0,0 +1,87 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+from skrisk.distributions import block_sizes, uniform_matrix
+
+
+def blocks(values, replicates):
+    sizes = block_sizes(values.shape[-1], replicates)
+    return np.split(values, np.cumsum(sizes)[:-1], axis=-1)
+
+
+def test_block_sizes():
+    assert block_sizes(1000, 8) == [125] * 8
+    assert block_sizes(10, 4) == [3, 3, 2, 2]
+    assert sum(block_sizes(1001, 7)) == 1001
+
+
+@pytest.mark.parametrize("size", [1000, 1003])
+def test_lhs_stratifies_every_row_of_every_block(size):
+    u = uniform_matrix("lhs", np.random.default_rng(0), 3, size, replicates=8)
+
+    assert u.shape == (3, size)
+    for block in blocks(u, 8):
+        # One point in each of the block.shape[1] equal strata of every row
+        strata = np.sort(np.floor(block * block.shape[1]), axis=1)
+        np.testing.assert_array_equal(
+            strata, np.tile(np.arange(block.shape[1]), (3, 1))
+        )
+
+
+@pytest.mark.parametrize("size", [1000, 1001])
+def test_antithetic_columns_mirror_each_other(size):
+    u = uniform_matrix("antithetic", np.random.default_rng(0), 3, size)
+    half = size // 2
+
+    assert u.shape == (3, size)
+    np.testing.assert_array_equal(u[:, half : 2 * half], 1 - u[:, :half])
+    assert ((u > 0) & (u < 1)).all()
+
+
+@pytest.mark.parametrize("strategy", ["random", "lhs", "sobol", "halton", "antithetic"])
+def test_no_warnings_at_usual_sizes(strategy):
+    project = RiskProject(seed=1, nsim=1000)
+    project.sampling = strategy
+    project.add_random("x", "normal", {"loc": 0, "scale": 1})
+    project.add_random("y", "uniform", {"low": 0, "high": 1})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        project.eval("x")
+        project.eval("y")
+        assert np.isfinite(project.standard_error("x"))
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        uniform_matrix("stratified", np.random.default_rng(0), 1, 10)
+    with pytest.raises(ValueError):
+        RiskProject().sampling = "stratified"
+
+
+def test_standard_error_uses_the_replicate_blocks():
+    project = RiskProject(seed=1, nsim=1000)
+    project.sampling = "lhs"
+    project.replicates = 8
+    project.add_random("x", "uniform", {"low": 0, "high": 1})
+    x = project.eval("x")
+
+    means = [block.mean() for block in blocks(x, 8)]
+    # Each block is a Latin hypercube on its own: its mean is almost exactly 1 / 2
+    np.testing.assert_allclose(means, 0.5, atol=1 / 125)
+    assert project.standard_error("x") == pytest.approx(
+        np.std(means, ddof=1) / np.sqrt(8)
+    )
+    assert project.standard_error("x") < x.std() / np.sqrt(x.size) / 10
+
+
+def test_standard_error_pairs_antithetic_draws():
+    project = RiskProject(seed=1, nsim=1000)
+    project.sampling = "antithetic"
+    project.add_random("x", "uniform", {"low": 0, "high": 1})
+    x = project.eval("x")
+
+    np.testing.assert_allclose(x[:500] + x[500:], 1)
+    assert project.standard_error("x") == pytest.approx(0, abs=1e-12)
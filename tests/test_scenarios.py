@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+SCENARIOS = {
+    "base": {},
+    "low": {"my_bid": 10000},
+    "costly": {"project_cost.mode": 11000},
+    "both": {"my_bid": 11000, "project_cost.mode": 11000},
+}
+
+
+def node_streams(bidding):
+    project = bidding()
+    project.streams = "node"
+    return project
+
+
+def test_workers_give_the_same_results(bidding):
+    single = node_streams(bidding).run_scenarios(SCENARIOS, "profit")
+    split = node_streams(bidding).run_scenarios(SCENARIOS, "profit", workers=2)
+
+    assert list(single["scenario"]) == list(SCENARIOS)
+    pd.testing.assert_frame_equal(single, split)
+
+
+def test_scenarios_match_separate_evaluations(bidding):
+    results = node_streams(bidding).run_scenarios(SCENARIOS, ("profit", "margin"))
+
+    for name, overrides in SCENARIOS.items():
+        project = node_streams(bidding)
+        for column, value in overrides.items():
+            if column == "my_bid":
+                project.update_input(column, value)
+            else:
+                project.nodes["project_cost"]["parameters"]["mode"] = value
+        for goal in ("profit", "margin"):
+            row = results[(results["scenario"] == name) & (results["goal"] == goal)]
+            assert row["mean"].item() == pytest.approx(project.eval(goal).mean())
+    # Common random numbers: a higher bid never loses money on average
+    profit = results[results["goal"] == "profit"].set_index("scenario")["mean"]
+    assert profit["both"] > profit["costly"]
+
+
+def test_project_is_restored(bidding):
+    project = node_streams(bidding)
+    profit = project.eval("profit")
+    cost = project.nodes["project_cost"]["value"]
+    parameters = dict(project.nodes["project_cost"]["parameters"])
+    project.run_scenarios(SCENARIOS, "profit")
+
+    assert project.nodes["my_bid"]["value"] == 10500
+    assert project.nodes["project_cost"]["parameters"] == parameters
+    assert project.nodes["project_cost"]["value"] is cost
+    np.testing.assert_array_equal(project.eval("profit"), profit)
+
+
+def test_missing_values_are_dropped(bidding):
+    table = pd.DataFrame(
+        {"my_bid": [np.nan, 10000.0], "project_cost.mode": [11000.0, np.nan]},
+        index=["costly", "low"],
+    )
+    from_table = node_streams(bidding).run_scenarios(table, "profit")
+    expected = node_streams(bidding).run_scenarios(
+        {name: SCENARIOS[name] for name in ("costly", "low")}, "profit"
+    )
+
+    assert from_table.loc[0, "my_bid"] == 10500
+    assert from_table.loc[1, "project_cost.mode"] == 10000
+    np.testing.assert_allclose(from_table["mean"], expected["mean"])
+
+
+def test_invalid_scenarios(bidding):
+    with pytest.raises(ValueError):
+        bidding().run_scenarios({"a": {"my_bid": 1}, "b": {"my_bid": 2}}, workers=2)
+    with pytest.raises(ValueError):
+        node_streams(bidding).run_scenarios({"a": {"margin": 1}})
+    with pytest.raises(ValueError):
+        node_streams(bidding).run_scenarios({"a": {"bid_cost.scale": 1}})
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+from skrisk.sensitivity import sensitivity
+
+
+def linear(nsim=20_000, noise=0.0):
+    project = RiskProject(seed=4, nsim=nsim)
+    project.add_input("slope", 3)
+    project.add_random("x1", "normal", {"loc": 1, "scale": 1})
+    project.add_random("x2", "normal", {"loc": 0, "scale": 2})
+    project.add_random("x3", "uniform", {"low": 0, "high": 1})
+    project.add_random("e", "normal", {"loc": 0, "scale": noise})
+    project.add_goal("y", "slope * x1 - x2 + 0 * x3 + e")
+    project.eval("y")
+    return project
+
+
+# Coefficient and standard deviation of each driver: sd(y) = sqrt(9 + 4)
+DRIVERS = {"x1": (3, 1), "x2": (-1, 2), "x3": (0, 1 / np.sqrt(12))}
+
+
+def test_linear_model_coefficients():
+    project = linear()
+    table = project.sensitivity("y")
+
+    assert list(table.index) == ["x1", "x2", "x3"]
+    y = project.nodes["y"]["value"]
+    for node, (coefficient, scale) in DRIVERS.items():
+        # Coefficients in standard deviations of y per standard deviation of the node
+        src = coefficient * project.nodes[node]["value"].std() / y.std()
+        assert table.loc[node, "src"] == pytest.approx(src, abs=1e-9)
+        # Rank correlation of jointly normal variables
+        rank = 6 / np.pi * np.arcsin(coefficient * scale / np.sqrt(13) / 2)
+        assert table.loc[node, "rank_correlation"] == pytest.approx(rank, abs=0.01)
+    assert table.attrs["r_squared"] == pytest.approx(1)
+    assert table["contribution_to_variance"].sum() == pytest.approx(1)
+
+
+def test_noise_lowers_r_squared():
+    project = linear(noise=np.sqrt(13))
+    table = project.sensitivity("y", nodes=["x1", "x2", "x3"])
+
+    assert table.attrs["r_squared"] == pytest.approx(0.5, abs=0.02)
+    assert table.loc["x1", "src"] == pytest.approx(3 / np.sqrt(26), abs=0.02)
+    assert table["contribution_to_variance"].sum() == pytest.approx(1)
+    assert project.nodes["y"]["sensitivity"]["x1"]["src"] == table.loc["x1", "src"]
+
+
+def test_given_nodes():
+    project = linear()
+    table = project.sensitivity("y", nodes=["x2"])
+    assert list(table.index) == ["x2"]
+    assert table.loc["x2", "contribution_to_variance"] == 1
+    with pytest.raises(ValueError):
+        project.sensitivity("y", nodes=["slope"])
+
+
+def test_empty_driver_list():
+    with pytest.raises(ValueError, match="driver"):
+        sensitivity([], np.arange(10.0))
+    with pytest.raises(ValueError, match="simulations"):
+        sensitivity(np.ones((2, 5)), np.arange(10.0))
+
+    project = RiskProject(seed=4, nsim=100)
+    project.add_input("base", 1)
+    project.add_random("x", "normal", {"loc": 2, "scale": 0})
+    project.add_goal("y", "base + x * 2")
+    project.eval("y")
+    with pytest.raises(ValueError, match="no nodes"):
+        project.sensitivity("y")
+    with pytest.raises(ValueError, match="no nodes"):
+        project.sensitivity("y", nodes=[])
+
+
+def test_requires_up_to_date_values():
+    project = linear(nsim=100)
+    project.update_input("slope", 2)
+    with pytest.raises(ValueError):
+        project.sensitivity("y")
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from skrisk.stats import (
+    MomentAccumulator,
+    QuantileSketch,
+    StreamingHistogram,
+    ValueCounts,
+)
+
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).lognormal(size=200_000)
+
+
+def split(values, parts=5):
+    return np.array_split(
+        values, np.sort(np.random.default_rng(1).choice(values.size, parts))
+    )
+
+
+def merged(cls, values, **kwargs):
+    accumulator = cls(**kwargs)
+    for chunk in split(values):
+        accumulator.merge(cls(**kwargs).update(chunk))
+    return accumulator
+
+
+def test_moments_merge_equals_single_pass(data):
+    single = MomentAccumulator().update(data).result()
+    chunks = merged(MomentAccumulator, data).result()
+
+    assert chunks == pytest.approx(single, rel=1e-9)
+    assert single["mean"] == pytest.approx(data.mean())
+    assert single["std"] == pytest.approx(data.std())
+
+
+def test_histogram_merge_equals_single_pass(data):
+    single = StreamingHistogram().update(data)
+    chunks = merged(StreamingHistogram, data)
+
+    assert (chunks.lo, chunks.width) == (single.lo, single.width)
+    np.testing.assert_array_equal(chunks.counts, single.counts)
+    assert chunks.total == data.size
+    assert (chunks.min, chunks.max) == (data.min(), data.max())
+
+
+def test_histogram_bins_match_numpy(data):
+    counts, edges = StreamingHistogram().update(data).to_bins(10)
+    expected, _ = np.histogram(data, edges)
+
+    # Fine bins straddling an edge are assigned as a whole to one side
+    assert counts.sum() == data.size
+    assert np.abs(counts - expected).sum() < 0.001 * data.size
+
+
+def test_value_counts_merge_equals_single_pass():
+    data = np.random.default_rng(0).binomial(10, 0.3, 100_000)
+    single = ValueCounts().update(data)
+    chunks = merged(ValueCounts, data)
+
+    keys, counts = np.unique(data, return_counts=True)
+    for accumulator in (single, chunks):
+        np.testing.assert_array_equal(accumulator.keys, keys)
+        np.testing.assert_array_equal(accumulator.counts, counts)
+
+
+def test_value_counts_overflow_survives_merge(data):
+    counts = merged(ValueCounts, data, limit=16)
+    assert counts.overflow and counts.keys is None
+
+
+def test_project_histogram_is_cached(bidding):
+    project = bidding()
+    values = project.eval("profit")
+    counts, edges = project.histogram("profit", bins=20)
+    expected, expected_edges = np.histogram(values, 20)
+
+    np.testing.assert_array_equal(counts, expected)
+    np.testing.assert_allclose(edges, expected_edges)
+    assert project.histogram("profit", bins=20)[0] is counts
+
+    keys, counts = project.value_counts("win_contract")
+    assert keys == ["False", "True"]
+    assert counts.sum() == values.size
+
+
+def test_sketch_merge_matches_quantiles(data):
+    probs = [0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999]
+    single = QuantileSketch().update(data)
+    chunks = merged(QuantileSketch, data)
+    ordered = np.sort(data)
+
+    assert chunks.total == single.total == data.size
+    assert (chunks.min, chunks.max) == (data.min(), data.max())
+    for sketch in (single, chunks):
+        # Rank error of the estimated quantiles
+        ranks = np.searchsorted(ordered, sketch.quantile(probs)) / data.size
+        np.testing.assert_allclose(ranks, probs, atol=0.0005)
+    assert chunks.cdf(np.median(data)) == pytest.approx(0.5, abs=0.005)
+
+
+def test_generate_stats_single_pass(bidding):
+    project = bidding()
+    values = project.eval("profit")
+    stats = project.generate_stats("profit")
+
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["std"] == pytest.approx(values.std())
+    assert stats["median"] == np.median(values)
+    assert (stats["min"], stats["max"]) == (values.min(), values.max())
+    centered = values - values.mean()
+    assert stats["skew"] == pytest.approx((centered**3).mean() / values.std() ** 3)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from conftest import Bidding
+
+
+def test_reloaded_run_is_not_simulated_again(bidding, tmp_path):
+    project = bidding()
+    project.eval("profit")
+    project.invalidate_values()
+    saved = np.array(project.eval("profit"))
+    project.save_results(str(tmp_path), nodes=["profit"])
+
+    loaded = Bidding.load_results(str(tmp_path))
+    assert isinstance(loaded.nodes["profit"]["value"], np.memmap)
+    assert loaded.nodes["project_cost"]["value"] is None
+    np.testing.assert_array_equal(loaded.eval("profit"), saved)
+    assert loaded.calls == {}
+
+
+def test_save_load_round_trip(bidding, tmp_path):
+    project = bidding()
+    project.sampling = "lhs"
+    project.replicates = 4
+    project.eval("profit")
+    project.save_results(str(tmp_path))
+
+    loaded = Bidding.load_results(str(tmp_path))
+    assert (loaded.seed, loaded.nsim, loaded.sampling, loaded.replicates) == (
+        42,
+        1000,
+        "lhs",
+        4,
+    )
+    for node in ("project_cost", "win_contract", "profit"):
+        np.testing.assert_array_equal(
+            loaded.nodes[node]["value"], project.nodes[node]["value"]
+        )
+    assert loaded.standard_error("profit") == project.standard_error("profit")
+
+    loaded.update_input("my_bid", 11000)
+    project.update_input("my_bid", 11000)
+    np.testing.assert_array_equal(loaded.eval("profit"), project.eval("profit"))
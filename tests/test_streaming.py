@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from conftest import Bidding
+
+
+class Failing(Bidding):
+    fail = True
+
+    def margin(self, my_bid, project_cost):
+        if self.fail and self.calls.get("margin"):
+            raise RuntimeError("second chunk")
+        return super().margin(my_bid, project_cost)
+
+
+def test_streaming_stats_match_eval(bidding):
+    project = bidding(nsim=50_000)
+    project.eval("profit")
+    expected = project.generate_stats("profit")
+    stats = bidding(nsim=50_000).eval_streaming("profit", chunk_size=8000)
+
+    assert stats.keys() == expected.keys()
+    standard_error = expected["std"] / np.sqrt(50_000)
+    assert stats["mean"] == pytest.approx(expected["mean"], abs=5 * standard_error)
+    assert stats["std"] == pytest.approx(expected["std"], rel=0.02)
+    assert stats["skew"] == pytest.approx(expected["skew"], abs=0.05)
+    assert stats["median"] == expected["median"] == -350
+    assert -15000 < stats["min"] < stats["max"] < 14000 - 9000
+
+
+def test_streaming_replaces_the_goal_by_accumulators(bidding):
+    project = bidding(nsim=5000)
+    project.eval_streaming("profit", chunk_size=1200)
+    attrs = project.nodes["profit"]
+
+    assert attrs["value"] is None
+    assert attrs["moments"].n == attrs["histogram"].total == 5000
+    assert project.calls == {"margin": 5, "profit": 5}
+
+
+def test_streaming_restores_the_project_after_errors(bidding):
+    project = bidding(nsim=5000, cls=Failing)
+    project.streams = "node"
+    with pytest.raises(RuntimeError):
+        project.eval_streaming("profit", chunk_size=1000)
+
+    assert project._chunk_size is None
+    assert project._stream_key == ()
+    assert project.sample_size == 5000
+    project.fail = False
+    assert project.eval("profit").shape == (5000,)
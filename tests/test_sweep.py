@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from skrisk import RiskProject
+
+
+class Competitors(RiskProject):
+    def competing_bids(self, probability):
+        return self.binomial(4, probability)
+
+
+def test_sweep_matches_separate_evaluations(bidding):
+    bids = [10000, 10500, 11000]
+    swept = bidding().sweep("profit", {"my_bid": bids})
+
+    assert swept.shape == (3, 1000)
+    for row, bid in zip(swept, bids):
+        project = bidding()
+        project.update_input("my_bid", bid)
+        np.testing.assert_allclose(row, project.eval("profit"))
+
+
+def test_sweep_product_grid_as_frame(bidding):
+    frame = bidding().sweep(
+        ("profit", "margin"),
+        {"my_bid": [10000, 11000], "bid_cost": [300, 350, 400]},
+        product=True,
+        as_frame=True,
+    )
+    assert frame["profit"].shape == (6, 1000)
+    assert list(frame["profit"].index.names) == ["my_bid", "bid_cost"]
+    # margin doesn't depend on bid_cost
+    margin = frame["margin"].to_numpy()
+    np.testing.assert_array_equal(margin[0], margin[2])
+
+
+def test_sweep_rejects_other_nodes(bidding):
+    with pytest.raises(ValueError):
+        bidding().sweep("profit", {"project_cost": [1, 2]})
+    with pytest.raises(ValueError):
+        bidding().sweep("profit", {"my_bid": [1, 2], "bid_cost": [1]})
+
+
+def test_sweep_broadcasts_operations_drawing_samples():
+    project = Competitors(seed=1, nsim=1000)
+    project.add_input("probability", 0.5)
+    project.add_operation("bids", "competing_bids", ("probability",))
+    swept = project.sweep("bids", {"probability": [0.3, 0.5, 0.7]})
+
+    assert swept.shape == (3, 1000)
+    # Common random numbers: more bids in every simulation as the probability grows
+    assert (np.diff(swept, axis=0) >= 0).all()
+    np.testing.assert_allclose(swept.mean(axis=1), [1.2, 2, 2.8], atol=0.15)